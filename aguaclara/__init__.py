@@ -4,6 +4,7 @@ from aguaclara.core.head_loss import *  # noqa: F401, F403
 from aguaclara.core.materials import *  # noqa: F401, F403
 from aguaclara.core.physchem import *  # noqa: F401, F403
 from aguaclara.core.pipes import *  # noqa: F401, F403
+from aguaclara.core.solvers import *  # noqa: F401, F403
 from aguaclara.core.units import *  # noqa: F401, F403
 from aguaclara.core.utility import *  # noqa: F401, F403
 from aguaclara.core.onshape_parser import *  # noqa: F401, F403
@@ -17,6 +18,7 @@ from aguaclara.design.floc import Flocculator  # noqa: F401
 import aguaclara.design.human_access as ha  # noqa: F401
 from aguaclara.design.lfom import LFOM  # noqa: F401
 from aguaclara.design.plant import Plant  # noqa: F401
+from aguaclara.design.profiler import profile  # noqa: F401
 from aguaclara.design.sed_chan import SedimentationChannel  # noqa: F401
 from aguaclara.design.sed_tank import SedimentationTank  # noqa: F401
 from aguaclara.design.sed import Sedimentor  # noqa: F401
@@ -0,0 +1,404 @@
+"""Array-native hydraulics of rectangular and general open or closed channels.
+
+The channel functions in :mod:`aguaclara.core.physchem` evaluate one channel
+per call and are wrapped with :func:`aguaclara.core.utility.list_handler`, so
+evaluating thousands of candidate widths means thousands of calls. The
+functions in this module take arrays (or scalars) of flow rate, width, depth
+and the other inputs, broadcast them against each other with NumPy's rules and
+evaluate every channel in one pass. ``OpenChannel`` may also be an array,
+which acts as a mask of open (True) and closed (False) channels.
+
+The results equal those of the physchem functions of the same names, which
+remain the reference implementations. Because the names are shared, this
+module is not star-imported into :mod:`aguaclara`; import it as a module
+instead.
+
+Example:
+    >>> import numpy as np
+    >>> from aguaclara.core.units import u
+    >>> from aguaclara.core import channels
+    >>> hydraulics = channels.hydraulics_rect(
+    ...     FlowRate=20 * u.L / u.s, Width=np.array([10, 20, 40]) * u.cm,
+    ...     Depth=0.5 * u.m, Length=10 * u.m, KMinor=2,
+    ...     Nu=1e-6 * u.m**2 / u.s, Roughness=0.1 * u.mm, OpenChannel=True
+    ... )
+    >>> hydraulics.headloss.to(u.cm).round(3)
+    <Quantity([2.597 0.535 0.121], 'centimeter')>
+"""
+
+from aguaclara.core.units import u
+
+from collections import namedtuple
+
+import numpy as np
+
+#: Reynolds number of the laminar/turbulent transition, as in physchem
+RE_TRANSITION_PIPE = 2100
+
+GRAVITY = (1 * u.gravity).to(u.m / u.s**2).magnitude
+
+ChannelHydraulics = namedtuple(
+    "ChannelHydraulics",
+    ["radius_hydraulic", "re", "fric", "headloss_major", "headloss_minor", "headloss"],
+)
+ChannelHydraulics.__doc__ = """Hydraulics of an array of channels.
+
+Every field is an array with the broadcast shape of the inputs: the hydraulic
+radius (u.m), Reynolds number, friction factor, major head loss (u.m), minor
+head loss (u.m) and total head loss (u.m)."""
+
+
+def _magnitude(value, units):
+    """Return ``value`` in ``units`` as a float array."""
+    if isinstance(value, u.Quantity):
+        return np.asarray(value.m_as(units), dtype=float)
+    return np.asarray(value, dtype=float)
+
+
+def _check(values, check, name):
+    """Vectorized counterpart of :func:`aguaclara.core.utility.check_range`
+    for ``">0"`` and ``">=0"``, raising the same errors.
+    """
+    bad = values <= 0 if check == ">0" else values < 0
+    if np.any(bad):
+        value = values[bad].flat[0] if np.ndim(values) else values
+        if check == ">0":
+            raise ValueError(
+                "{1} is {0} but must be greater than 0.".format(value, name)
+            )
+        raise ValueError("{1} is {0} but must be 0 or greater.".format(value, name))
+
+
+###############################
+# Unit-free kernels, in SI units
+###############################
+
+
+def _radius_hydraulic_rect(width, depth, open_channel):
+    return np.where(
+        open_channel,
+        width * depth / (width + 2 * depth),
+        width * depth / (2 * (width + depth)),
+    )
+
+
+def _fric(re, radius, roughness):
+    """Return the friction factor for Reynolds numbers ``re`` in channels of
+    hydraulic radius ``radius``, using the Swamee-Jain equation with
+    Diam = 4 * R_h for turbulent flow and 64/Re for laminar flow.
+    """
+    turbulent = re >= RE_TRANSITION_PIPE
+    # Evaluate each branch only where it applies to avoid spurious warnings.
+    re_turbulent = np.where(turbulent, re, RE_TRANSITION_PIPE)
+    f_turbulent = (
+        0.25 / np.log10(roughness / (3.7 * 4 * radius) + 5.74 / re_turbulent**0.9) ** 2
+    )
+    return np.where(turbulent, f_turbulent, 64 / np.where(turbulent, 1, re))
+
+
+def _hydraulics(q, area, radius, length, k_minor, nu, roughness):
+    """Return the unit-free fields of :class:`ChannelHydraulics`."""
+    vel = q / area
+    re = 4 * radius * vel / nu
+    f = _fric(re, radius, roughness)
+    velocity_head = vel**2 / (2 * GRAVITY)
+    major = f * length / (4 * radius) * velocity_head
+    minor = k_minor * velocity_head
+    return radius, re, f, major, minor, major + minor
+
+
+def _unit_free_rect(FlowRate, Width, Depth, Nu, Roughness, OpenChannel):
+    q, w, d, nu, eps, open_channel = np.broadcast_arrays(
+        _magnitude(FlowRate, u.m**3 / u.s),
+        _magnitude(Width, u.m),
+        _magnitude(Depth, u.m),
+        _magnitude(Nu, u.m**2 / u.s),
+        _magnitude(Roughness, u.m),
+        np.asarray(OpenChannel, dtype=bool),
+    )
+    _check(q, ">0", "Flow rate")
+    _check(w, ">0", "Width")
+    _check(d, ">0", "Depth")
+    _check(nu, ">0", "Nu")
+    _check(eps, ">=0", "Pipe roughness")
+    return q, w, d, nu, eps, open_channel
+
+
+#################
+# Public interface
+#################
+
+
+def radius_hydraulic_rect(Width, Depth, OpenChannel):
+    """Return the hydraulic radius of rectangular channels.
+
+    :param Width: width of channel
+    :type Width: u.m
+    :param Depth: depth of water in channel
+    :type Depth: u.m
+    :param OpenChannel: true if channel is open, false if closed
+    :type OpenChannel: boolean or boolean array
+
+    :return: hydraulic radius of rectangular channel
+    :rtype: u.m
+    """
+    w, d, open_channel = np.broadcast_arrays(
+        _magnitude(Width, u.m), _magnitude(Depth, u.m), np.asarray(OpenChannel, bool)
+    )
+    _check(w, ">0", "Width")
+    _check(d, ">0", "Depth")
+    return _radius_hydraulic_rect(w, d, open_channel) * u.m
+
+
+def re_rect(FlowRate, Width, Depth, Nu, OpenChannel):
+    """Return the Reynolds number of flow through rectangular channels.
+
+    :param FlowRate: flow rate through channel
+    :type FlowRate: u.m**3/u.s
+    :param Width: width of channel
+    :type Width: u.m
+    :param Depth: depth of water in channel
+    :type Depth: u.m
+    :param Nu: kinematic viscosity of fluid
+    :type Nu: u.m**2/u.s
+    :param OpenChannel: true if channel is open, false if closed
+    :type OpenChannel: boolean or boolean array
+
+    :return: Reynolds number of flow through rectangular channel
+    :rtype: u.dimensionless
+    """
+    return hydraulics_rect(
+        FlowRate, Width, Depth, 1 * u.m, 0, Nu, 0 * u.m, OpenChannel
+    ).re
+
+
+def fric_rect(FlowRate, Width, Depth, Nu, Roughness, OpenChannel):
+    """Return the friction factor of rectangular channels.
+
+    :param FlowRate: flow rate through channel
+    :type FlowRate: u.m**3/u.s
+    :param Width: width of channel
+    :type Width: u.m
+    :param Depth: depth of water in channel
+    :type Depth: u.m
+    :param Nu: kinematic viscosity of fluid
+    :type Nu: u.m**2/u.s
+    :param Roughness: roughness of channel
+    :type Roughness: u.m
+    :param OpenChannel: true if channel is open, false if closed
+    :type OpenChannel: boolean or boolean array
+
+    :return: friction factor of flow through rectangular channel
+    :rtype: u.dimensionless
+    """
+    return hydraulics_rect(
+        FlowRate, Width, Depth, 1 * u.m, 0, Nu, Roughness, OpenChannel
+    ).fric
+
+
+def headloss_major_rect(FlowRate, Width, Depth, Length, Nu, Roughness, OpenChannel):
+    """Return the major head loss due to wall shear in rectangular channels.
+
+    :param FlowRate: flow rate through channel
+    :type FlowRate: u.m**3/u.s
+    :param Width: width of channel
+    :type Width: u.m
+    :param Depth: depth of water in channel
+    :type Depth: u.m
+    :param Length: length of channel
+    :type Length: u.m
+    :param Nu: kinematic viscosity of fluid
+    :type Nu: u.m**2/u.s
+    :param Roughness: roughness of channel
+    :type Roughness: u.m
+    :param OpenChannel: true if channel is open, false if closed
+    :type OpenChannel: boolean or boolean array
+
+    :return: major head loss in rectangular channel
+    :rtype: u.m
+    """
+    return hydraulics_rect(
+        FlowRate, Width, Depth, Length, 0, Nu, Roughness, OpenChannel
+    ).headloss_major
+
+
+def headloss_minor_rect(FlowRate, Width, Depth, KMinor):
+    """Return the minor head loss due to expansion in rectangular channels.
+
+    :param FlowRate: flow rate through channel
+    :type FlowRate: u.m**3/u.s
+    :param Width: width of channel
+    :type Width: u.m
+    :param Depth: depth of water in channel
+    :type Depth: u.m
+    :param KMinor: minor loss coefficient
+    :type KMinor: u.dimensionless or unitless
+
+    :return: minor head loss in rectangular channel
+    :rtype: u.m
+    """
+    q, w, d, k = np.broadcast_arrays(
+        _magnitude(FlowRate, u.m**3 / u.s),
+        _magnitude(Width, u.m),
+        _magnitude(Depth, u.m),
+        _magnitude(KMinor, u.dimensionless),
+    )
+    _check(q, ">0", "Flow rate")
+    _check(w, ">0", "Width")
+    _check(d, ">0", "Depth")
+    _check(k, ">=0", "K minor")
+    return k * (q / (w * d)) ** 2 / (2 * GRAVITY) * u.m
+
+
+def headloss_rect(FlowRate, Width, Depth, Length, KMinor, Nu, Roughness, OpenChannel):
+    """Return the total head loss from major and minor losses in rectangular
+    channels.
+
+    :param FlowRate: flow rate through channel
+    :type FlowRate: u.m**3/u.s
+    :param Width: width of channel
+    :type Width: u.m
+    :param Depth: depth of water in channel
+    :type Depth: u.m
+    :param Length: length of channel
+    :type Length: u.m
+    :param KMinor: minor loss coefficient
+    :type KMinor: u.dimensionless or unitless
+    :param Nu: kinematic viscosity of fluid
+    :type Nu: u.m**2/u.s
+    :param Roughness: roughness of channel
+    :type Roughness: u.m
+    :param OpenChannel: true if channel is open, false if closed
+    :type OpenChannel: boolean or boolean array
+
+    :return: total head loss in rectangular channel
+    :rtype: u.m
+    """
+    return hydraulics_rect(
+        FlowRate, Width, Depth, Length, KMinor, Nu, Roughness, OpenChannel
+    ).headloss
+
+
+def hydraulics_rect(FlowRate, Width, Depth, Length, KMinor, Nu, Roughness, OpenChannel):
+    """Return the hydraulic radius, Reynolds number, friction factor and head
+    losses of rectangular channels in one pass.
+
+    All inputs are broadcast against each other, so passing
+    ``Width[:, np.newaxis]`` and ``FlowRate[np.newaxis, :]`` evaluates every
+    combination of width and flow.
+
+    :param FlowRate: flow rate through channel
+    :type FlowRate: u.m**3/u.s
+    :param Width: width of channel
+    :type Width: u.m
+    :param Depth: depth of water in channel
+    :type Depth: u.m
+    :param Length: length of channel
+    :type Length: u.m
+    :param KMinor: minor loss coefficient
+    :type KMinor: u.dimensionless or unitless
+    :param Nu: kinematic viscosity of fluid
+    :type Nu: u.m**2/u.s
+    :param Roughness: roughness of channel
+    :type Roughness: u.m
+    :param OpenChannel: true if channel is open, false if closed
+    :type OpenChannel: boolean or boolean array
+
+    :return: hydraulics of the channels
+    :rtype: ChannelHydraulics
+    """
+    q, w, d, nu, eps, open_channel = _unit_free_rect(
+        FlowRate, Width, Depth, Nu, Roughness, OpenChannel
+    )
+    length = _magnitude(Length, u.m)
+    k_minor = _magnitude(KMinor, u.dimensionless)
+    _check(length, ">0", "Length")
+    _check(k_minor, ">=0", "K minor")
+    radius, re, f, major, minor, total = _hydraulics(
+        q, w * d, _radius_hydraulic_rect(w, d, open_channel), length, k_minor, nu, eps
+    )
+    return ChannelHydraulics(
+        radius * u.m,
+        re * u.dimensionless,
+        f * u.dimensionless,
+        major * u.m,
+        minor * u.m,
+        total * u.m,
+    )
+
+
+def hydraulics_channel(Area, Vel, PerimWetted, Length, KMinor, Nu, Roughness):
+    """Return the hydraulic radius, Reynolds number, friction factor and head
+    losses of general channels in one pass.
+
+    :param Area: cross sectional area of channel
+    :type Area: u.m**2
+    :param Vel: velocity of fluid
+    :type Vel: u.m/u.s
+    :param PerimWetted: wetted perimeter of channel
+    :type PerimWetted: u.m
+    :param Length: length of channel
+    :type Length: u.m
+    :param KMinor: minor loss coefficient
+    :type KMinor: u.dimensionless or unitless
+    :param Nu: kinematic viscosity of fluid
+    :type Nu: u.m**2/u.s
+    :param Roughness: roughness of channel
+    :type Roughness: u.m
+
+    :return: hydraulics of the channels
+    :rtype: ChannelHydraulics
+    """
+    area, vel, perim, length, k_minor, nu, eps = np.broadcast_arrays(
+        _magnitude(Area, u.m**2),
+        _magnitude(Vel, u.m / u.s),
+        _magnitude(PerimWetted, u.m),
+        _magnitude(Length, u.m),
+        _magnitude(KMinor, u.dimensionless),
+        _magnitude(Nu, u.m**2 / u.s),
+        _magnitude(Roughness, u.m),
+    )
+    _check(area, ">0", "Area")
+    _check(vel, ">0", "Velocity")
+    _check(perim, ">0", "Wetted perimeter")
+    _check(length, ">0", "Length")
+    _check(k_minor, ">=0", "K minor")
+    _check(eps, ">=0", "Pipe roughness")
+    radius, re, f, major, minor, total = _hydraulics(
+        vel * area, area, area / perim, length, k_minor, nu, eps
+    )
+    return ChannelHydraulics(
+        radius * u.m,
+        re * u.dimensionless,
+        f * u.dimensionless,
+        major * u.m,
+        minor * u.m,
+        total * u.m,
+    )
+
+
+def headloss_channel(Area, Vel, PerimWetted, Length, KMinor, Nu, Roughness):
+    """Return the total head loss from major and minor losses in general
+    channels.
+
+    :param Area: cross sectional area of channel
+    :type Area: u.m**2
+    :param Vel: velocity of fluid
+    :type Vel: u.m/u.s
+    :param PerimWetted: wetted perimeter of channel
+    :type PerimWetted: u.m
+    :param Length: length of channel
+    :type Length: u.m
+    :param KMinor: minor loss coefficient
+    :type KMinor: u.dimensionless or unitless
+    :param Nu: kinematic viscosity of fluid
+    :type Nu: u.m**2/u.s
+    :param Roughness: roughness of channel
+    :type Roughness: u.m
+
+    :return: total head loss in general channel
+    :rtype: u.m
+    """
+    return hydraulics_channel(
+        Area, Vel, PerimWetted, Length, KMinor, Nu, Roughness
+    ).headloss
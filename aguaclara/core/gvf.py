@@ -0,0 +1,241 @@
+"""Water surface profiles of gradually varied flow in rectangular channels.
+
+The lumped head loss functions in :mod:`aguaclara.core.physchem` assume that
+the flow and depth are uniform along a channel. In plant channels, such as the
+inlet channel of the sedimentation tanks, flow is withdrawn (or added) along
+the length, so the depth, velocity and energy vary from station to station.
+:func:`profile_rect` computes the water surface profile of such channels for
+one flow rate or for many flow rates at once.
+
+The profile is computed with the standard step method. Starting from the
+known depth at the downstream end, the energy equation is solved for the
+depth at each station in turn, moving upstream:
+
+.. math::
+
+    H_u = H_d + \\frac{\\Delta x}{2} (S_{f,u} + S_{f,d}) + \\Delta H_{lat}
+
+where :math:`H` is the total head, :math:`S_f` the friction slope and
+:math:`\\Delta H_{lat}` the additional loss from the momentum of lateral
+inflow, which is zero for lateral withdrawal (Chow, 1959). Each step is solved
+with Newton's method for all flow rates simultaneously, so the cost grows with
+the number of stations but hardly with the number of flow rates.
+
+The friction slope uses the same friction factor as
+:func:`aguaclara.core.physchem.fric_rect` for an open channel, evaluated with
+the array functions of :mod:`aguaclara.core.channels`.
+
+Example:
+    >>> from aguaclara.core.units import u
+    >>> from aguaclara.core import gvf
+    >>> profile = gvf.profile_rect(
+    ...     FlowRate=[10, 20, 40] * u.L / u.s, Width=0.3 * u.m, Length=6 * u.m,
+    ...     DepthEnd=0.5 * u.m, Nu=1e-6 * u.m**2 / u.s, Roughness=0.1 * u.mm,
+    ...     FlowRateEnd=0 * u.L / u.s
+    ... )
+    >>> profile.depth.shape
+    (3, 101)
+    >>> (profile.depth[:, 0] - profile.depth[:, -1]).to(u.mm).round(3)
+    <Quantity([-0.201 -0.822 -3.365], 'millimeter')>
+"""
+
+from aguaclara.core.units import u
+import aguaclara.core.channels as ch
+
+from collections import namedtuple
+import warnings
+
+import numpy as np
+
+GRAVITY = ch.GRAVITY
+
+WaterSurfaceProfile = namedtuple(
+    "WaterSurfaceProfile",
+    ["x", "flow", "depth", "vel", "head", "fric_slope", "froude"],
+)
+WaterSurfaceProfile.__doc__ = """Water surface profile of a rectangular channel.
+
+``x`` holds the distance of each station from the upstream end (u.m). The other
+fields have one row per flow rate and one column per station: the flow rate in
+the channel (u.m**3/u.s), water depth (u.m), mean velocity (u.m/u.s), total
+head above the bed at the downstream end (u.m), friction slope and Froude
+number. If a scalar flow rate is given, the fields are 1D."""
+
+
+def _fric_slope(q, width, depth, nu, roughness):
+    """Return the friction slope of flow ``q`` in open rectangular channels."""
+    area = width * depth
+    radius = ch._radius_hydraulic_rect(width, depth, True)
+    vel = q / area
+    # A tiny floor keeps the laminar friction factor finite where the flow
+    # is zero; it is multiplied by a zero velocity head there.
+    re = np.maximum(4 * radius * vel / nu, 1e-12)
+    return ch._fric(re, radius, roughness) / (4 * radius) * vel**2 / (2 * GRAVITY)
+
+
+def _step(q_u, q_d, y_d, dx, dz, width, nu, roughness, alpha, tol, maxiter):
+    """Return the depth at the upstream end of a reach of length ``dx`` whose
+    bed drops by ``dz``, given the depth ``y_d`` at its downstream end.
+    """
+    sf_d = _fric_slope(q_d, width, y_d, nu, roughness)
+    # Only lateral inflow adds a momentum loss; withdrawal conserves energy.
+    lateral = np.where(q_d > q_u, alpha * (q_d - q_u) / (2 * GRAVITY), 0)
+    known = (
+        y_d
+        + alpha * (q_d / (width * y_d)) ** 2 / (2 * GRAVITY)
+        + dx / 2 * sf_d
+        + lateral * q_d / (width * y_d) ** 2
+        - dz
+    )
+    y_c = (alpha * q_u**2 / (GRAVITY * width**2)) ** (1 / 3)
+
+    def residual(y):
+        return (
+            y
+            + alpha * (q_u / (width * y)) ** 2 / (2 * GRAVITY)
+            - dx / 2 * _fric_slope(q_u, width, y, nu, roughness)
+            - lateral * q_u / (width * y) ** 2
+            - known
+        )
+
+    y = y_d.copy()
+    for _ in range(maxiter):
+        h = 1e-7 * y
+        r = residual(y)
+        slope = (residual(y + h) - r) / h
+        # Stay on the subcritical branch of the energy equation.
+        y_new = np.maximum(y - r / slope, y_c)
+        converged = np.abs(y_new - y) <= tol * y
+        y = y_new
+        if converged.all():
+            break
+    return y, y_c
+
+
+def profile_rect(
+    FlowRate,
+    Width,
+    Length,
+    DepthEnd,
+    Nu,
+    Roughness,
+    FlowRateEnd=None,
+    BedSlope=0,
+    NumStations=101,
+    RatioKineticEnergy=1,
+):
+    """Return the water surface profile of subcritical flow in an open
+    rectangular channel, with the flow changing linearly along its length.
+
+    :param FlowRate: flow rate entering the upstream end of the channel; a
+        scalar or a 1D array of flow rates to evaluate at once
+    :type FlowRate: u.m**3/u.s
+    :param Width: width of channel
+    :type Width: u.m
+    :param Length: length of channel
+    :type Length: u.m
+    :param DepthEnd: depth of water at the downstream end, which controls the
+        subcritical profile; a scalar or one depth per flow rate
+    :type DepthEnd: u.m
+    :param Nu: kinematic viscosity of fluid
+    :type Nu: u.m**2/u.s
+    :param Roughness: roughness of channel
+    :type Roughness: u.m
+    :param FlowRateEnd: flow rate leaving the downstream end. Less than
+        FlowRate for uniform lateral withdrawal, for example 0 for a channel
+        that distributes all of its flow, and more than FlowRate for uniform
+        lateral inflow. Defaults to FlowRate (no lateral flow).
+    :type FlowRateEnd: u.m**3/u.s
+    :param BedSlope: slope of the channel bed, positive downward
+    :type BedSlope: u.dimensionless or unitless
+    :param NumStations: number of evenly spaced stations, including both ends
+    :type NumStations: int
+    :param RatioKineticEnergy: kinetic energy correction factor (alpha)
+    :type RatioKineticEnergy: u.dimensionless or unitless
+
+    :return: water surface profile
+    :rtype: WaterSurfaceProfile
+    """
+    q_in = np.asarray(u.Quantity(FlowRate).m_as(u.m**3 / u.s), dtype=float)
+    scalar = q_in.ndim == 0
+    q_in = np.atleast_1d(q_in)
+    if FlowRateEnd is None:
+        q_end = q_in
+    else:
+        q_end = np.broadcast_to(u.Quantity(FlowRateEnd).m_as(u.m**3 / u.s), q_in.shape)
+    y_end = np.broadcast_to(
+        np.asarray(u.Quantity(DepthEnd).m_as(u.m), dtype=float), q_in.shape
+    ).copy()
+    width = float(u.Quantity(Width).m_as(u.m))
+    length = float(u.Quantity(Length).m_as(u.m))
+    nu = float(u.Quantity(Nu).m_as(u.m**2 / u.s))
+    roughness = float(u.Quantity(Roughness).m_as(u.m))
+    slope = float(u.Quantity(BedSlope).m_as(u.dimensionless))
+    alpha = float(u.Quantity(RatioKineticEnergy).m_as(u.dimensionless))
+
+    ch._check(q_in, ">=0", "Flow rate")
+    ch._check(np.asarray(q_end, dtype=float), ">=0", "Flow rate at end")
+    ch._check(y_end, ">0", "Depth at end")
+    ch._check(np.array([width, length, nu]), ">0", "Width, length and Nu")
+    ch._check(np.array(roughness), ">=0", "Pipe roughness")
+    if int(NumStations) != NumStations or NumStations < 2:
+        raise ValueError(
+            "NumStations is {} but must be an integer of 2 or more.".format(NumStations)
+        )
+
+    critical_end = (alpha * q_end**2 / (GRAVITY * width**2)) ** (1 / 3)
+    if np.any(y_end <= critical_end):
+        raise ValueError(
+            "DepthEnd must be greater than the critical depth at the "
+            "downstream end for the profile to be subcritical."
+        )
+
+    x = np.linspace(0, length, int(NumStations))
+    fraction = x / length
+    # Flow at every station, one row per flow rate.
+    q = q_in[:, np.newaxis] + (q_end - q_in)[:, np.newaxis] * fraction
+    depth = np.empty_like(q)
+    depth[:, -1] = y_end
+    dx = length / (NumStations - 1)
+    critical = np.zeros(q_in.shape, dtype=bool)
+    for i in range(int(NumStations) - 2, -1, -1):
+        depth[:, i], y_c = _step(
+            q[:, i],
+            q[:, i + 1],
+            depth[:, i + 1],
+            dx,
+            slope * dx,
+            width,
+            nu,
+            roughness,
+            alpha,
+            tol=1e-12,
+            maxiter=50,
+        )
+        critical |= depth[:, i] <= y_c * (1 + 1e-9)
+    if critical.any():
+        warnings.warn(
+            "The flow reaches critical depth in {} of {} profiles; the profile "
+            "upstream of that point is not valid.".format(
+                np.count_nonzero(critical), q_in.size
+            ),
+            UserWarning,
+        )
+
+    vel = q / (width * depth)
+    head = (length - x) * slope + depth + alpha * vel**2 / (2 * GRAVITY)
+    fric_slope = _fric_slope(q, width, depth, nu, roughness)
+    froude = vel / np.sqrt(GRAVITY * depth)
+    if scalar:
+        q, depth, vel, head, fric_slope, froude = (
+            a[0] for a in (q, depth, vel, head, fric_slope, froude)
+        )
+    return WaterSurfaceProfile(
+        x * u.m,
+        q * u.m**3 / u.s,
+        depth * u.m,
+        vel * u.m / u.s,
+        head * u.m,
+        fric_slope * u.dimensionless,
+        froude * u.dimensionless,
+    )
@@ -0,0 +1,447 @@
+"""Unit-free numerical kernels for the iterative hydraulic solvers.
+
+The iterative functions in :mod:`aguaclara.core.physchem` (``flow_pipe``,
+``diam_pipe``, ``manifold_id``, ``horiz_chan_w`` and ``horiz_chan_h``) spend
+most of their time creating and converting Pint quantities. This module
+contains versions of those solvers, and of the friction factor functions they
+rely on, that operate on plain floats in SI base units. Each solver also has a
+``_solve`` version, such as ``flow_pipe_solve``, that returns the number of
+iterations and the final relative change along with the result, for
+:mod:`aguaclara.core.telemetry`. The physchem functions
+strip units from their inputs, call the kernel selected by the active backend
+and reattach units to the result.
+
+Backends:
+    - ``"numba"``: kernels are compiled with Numba's ``njit`` on first use
+    - ``"numpy"``: kernels run as plain Python/NumPy code
+    - ``"pint"``: kernels are bypassed and physchem runs its unit-aware
+      reference implementation
+
+The default backend is ``"numpy"``, unless the ``AGUACLARA_BACKEND``
+environment variable names another one. Numba is opt-in, with
+``AGUACLARA_BACKEND=numba`` or ``set_backend("numba")``, even when it is
+installed: compiling the kernels takes several seconds in every new process,
+such as the workers of :func:`aguaclara.design.sweep.sweep`, while a compiled
+kernel is barely faster than the plain one once physchem has stripped the
+units. The compiled kernels are cached on disk with the bytecode, which
+shortens the compilation in later processes.
+
+Example:
+    >>> from aguaclara.core import kernels
+    >>> kernels.set_backend("numpy")
+    >>> kernels.get_backend()
+    'numpy'
+    >>> round(kernels.fric_pipe(0.01, 0.1, 1e-6, 1e-4), 6)
+    0.021876
+"""
+
+from aguaclara.core.units import u
+
+import math
+import os
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+#: Standard gravity, in m/s²
+GRAVITY = (1 * u.gravity).to(u.m / u.s**2).magnitude
+
+#: Reynolds number of the laminar/turbulent transition in pipes
+RE_TRANSITION_PIPE = 2100
+
+BACKENDS = ("numba", "numpy", "pint")
+
+
+def _define_kernels(jit):
+    """Define every kernel with the ``jit`` decorator and return them by name.
+
+    Kernels call each other through this closure so that, when ``jit`` is
+    Numba's ``njit``, the compiled kernels only ever call compiled kernels.
+    """
+
+    @jit
+    def re_pipe(FlowRate, Diam, Nu):
+        """Return the Reynolds number of flow through a pipe."""
+        return 4 * FlowRate / (math.pi * Diam * Nu)
+
+    @jit
+    def fric_pipe(FlowRate, Diam, Nu, Roughness):
+        """Return the Swamee-Jain (turbulent) or 64/Re (laminar) friction
+        factor for pipe flow.
+        """
+        re = re_pipe(FlowRate, Diam, Nu)
+        if re >= RE_TRANSITION_PIPE:
+            return 0.25 / math.log10(Roughness / (3.7 * Diam) + 5.74 / re**0.9) ** 2
+        return 64 / re
+
+    @jit
+    def radius_hydraulic_rect(Width, Depth, OpenChannel):
+        """Return the hydraulic radius of a rectangular channel."""
+        if OpenChannel:
+            return (Width * Depth) / (Width + 2 * Depth)
+        return (Width * Depth) / (2 * (Width + Depth))
+
+    @jit
+    def re_rect(FlowRate, Width, Depth, Nu, OpenChannel):
+        """Return the Reynolds number of flow through a rectangular channel."""
+        return (
+            4
+            * FlowRate
+            * radius_hydraulic_rect(Width, Depth, OpenChannel)
+            / (Width * Depth * Nu)
+        )
+
+    @jit
+    def fric_rect(FlowRate, Width, Depth, Nu, Roughness, OpenChannel):
+        """Return the friction factor of a rectangular channel, using the
+        Swamee-Jain equation with Diam = 4 * R_h for turbulent flow.
+        """
+        re = re_rect(FlowRate, Width, Depth, Nu, OpenChannel)
+        if re >= RE_TRANSITION_PIPE:
+            radius = radius_hydraulic_rect(Width, Depth, OpenChannel)
+            return (
+                0.25 / math.log10(Roughness / (3.7 * 4 * radius) + 5.74 / re**0.9) ** 2
+            )
+        return 64 / re
+
+    @jit
+    def headloss_major_pipe(FlowRate, Diam, Length, Nu, Roughness):
+        """Return the major head loss in a pipe."""
+        return (
+            fric_pipe(FlowRate, Diam, Nu, Roughness)
+            * 8
+            / (GRAVITY * math.pi**2)
+            * (Length * FlowRate**2)
+            / Diam**5
+        )
+
+    @jit
+    def headloss_minor_pipe(FlowRate, Diam, KMinor):
+        """Return the minor head loss in a pipe."""
+        return KMinor * 8 / (GRAVITY * math.pi**2) * FlowRate**2 / Diam**4
+
+    @jit
+    def flow_major_pipe(Diam, HeadLossMajor, Length, Nu, Roughness):
+        """Return the flow rate in a pipe with only major losses, using the
+        Hagen-Poiseuille equation for laminar flow and the Swamee-Jain
+        equation otherwise.
+        """
+        flow_hagen = (math.pi * Diam**4) / (128 * Nu) * GRAVITY * HeadLossMajor / Length
+        if flow_hagen < math.pi * Diam * RE_TRANSITION_PIPE * Nu / 4:
+            return flow_hagen
+        logterm = math.log10(
+            Roughness / (3.7 * Diam)
+            + 2.51 * Nu * math.sqrt(Length / (2 * GRAVITY * HeadLossMajor * Diam**3))
+        )
+        return (
+            (-math.pi / math.sqrt(2))
+            * Diam ** (5 / 2)
+            * logterm
+            * math.sqrt(GRAVITY * HeadLossMajor / Length)
+        )
+
+    @jit
+    def flow_minor_pipe(Diam, HeadLossMinor, KMinor):
+        """Return the flow rate in a pipe with only minor losses."""
+        return math.pi / 4 * Diam**2 * math.sqrt(2 * GRAVITY * HeadLossMinor / KMinor)
+
+    @jit
+    def flow_pipe_solve(Diam, HeadLoss, Length, Nu, Roughness, KMinor):
+        """Return the flow rate in a pipe with major and minor losses, the
+        number of iterations and the final relative change.
+        """
+        if KMinor == 0:
+            return flow_major_pipe(Diam, HeadLoss, Length, Nu, Roughness), 0, 0.0
+        flow = min(
+            flow_major_pipe(Diam, HeadLoss, Length, Nu, Roughness),
+            flow_minor_pipe(Diam, HeadLoss, KMinor),
+        )
+        err = 1.0
+        i = 0
+        while err > 0.01:
+            i = i + 1
+            flow_prev = flow
+            hl_major = headloss_major_pipe(flow, Diam, Length, Nu, Roughness)
+            hl_minor = headloss_minor_pipe(flow, Diam, KMinor)
+            flow = flow_major_pipe(
+                Diam, HeadLoss * hl_major / (hl_major + hl_minor), Length, Nu, Roughness
+            )
+            if flow == 0:
+                err = 0.0
+            else:
+                err = abs(flow - flow_prev) / ((flow + flow_prev) / 2)
+        return flow, i, err
+
+    @jit
+    def flow_pipe(Diam, HeadLoss, Length, Nu, Roughness, KMinor):
+        """Return the flow rate in a pipe with major and minor losses."""
+        return flow_pipe_solve(Diam, HeadLoss, Length, Nu, Roughness, KMinor)[0]
+
+    @jit
+    def diam_major_pipe(FlowRate, HeadLossMajor, Length, Nu, Roughness):
+        """Return the pipe inner diameter that would result in the given
+        major losses, using the Hagen-Poiseuille equation for laminar flow and
+        the Swamee-Jain equation otherwise.
+        """
+        diam_hagen = (
+            (128 * Nu * FlowRate * Length) / (GRAVITY * HeadLossMajor * math.pi)
+        ) ** (1 / 4)
+        if re_pipe(FlowRate, diam_hagen, Nu) <= RE_TRANSITION_PIPE:
+            return diam_hagen
+        a = (Roughness**1.25) * (
+            (Length * FlowRate**2) / (GRAVITY * HeadLossMajor)
+        ) ** 4.75
+        b = (Nu**5 * FlowRate**47 * (Length / (GRAVITY * HeadLossMajor)) ** 26) ** 0.2
+        return 0.66 * (a + b) ** 0.04
+
+    @jit
+    def diam_minor_pipe(FlowRate, HeadLossMinor, KMinor):
+        """Return the pipe inner diameter that would result in the given
+        minor losses.
+        """
+        return math.sqrt(4 * FlowRate / math.pi) * (
+            KMinor / (2 * GRAVITY * HeadLossMinor)
+        ) ** (1 / 4)
+
+    @jit
+    def diam_pipe_solve(FlowRate, HeadLoss, Length, Nu, Roughness, KMinor):
+        """Return the pipe inner diameter that would result in the given
+        total head loss, the number of iterations and the final relative
+        change.
+        """
+        if KMinor == 0:
+            return diam_major_pipe(FlowRate, HeadLoss, Length, Nu, Roughness), 0, 0.0
+        diam = max(
+            diam_major_pipe(FlowRate, HeadLoss, Length, Nu, Roughness),
+            diam_minor_pipe(FlowRate, HeadLoss, KMinor),
+        )
+        err = 1.0
+        i = 0
+        while err > 0.001:
+            i = i + 1
+            diam_prev = diam
+            hl_major = headloss_major_pipe(FlowRate, diam, Length, Nu, Roughness)
+            hl_minor = headloss_minor_pipe(FlowRate, diam, KMinor)
+            diam = diam_major_pipe(
+                FlowRate,
+                HeadLoss * hl_major / (hl_major + hl_minor),
+                Length,
+                Nu,
+                Roughness,
+            )
+            err = abs(diam - diam_prev) / ((diam + diam_prev) / 2)
+        return diam, i, err
+
+    @jit
+    def diam_pipe(FlowRate, HeadLoss, Length, Nu, Roughness, KMinor):
+        """Return the pipe inner diameter that would result in the given
+        total head loss.
+        """
+        return diam_pipe_solve(FlowRate, HeadLoss, Length, Nu, Roughness, KMinor)[0]
+
+    @jit
+    def manifold_id_solve(q, h, q_ratio, nu, eps, n):
+        """Return the inner diameter of a manifold pipe, starting from a 2 inch
+        guess, the number of iterations and the final relative change.
+        """
+        id_new = 0.0508
+        error = 1.0
+        i = 0
+        while error > 0.01:
+            i = i + 1
+            id_old = id_new
+            id_new = (
+                ((8 * q**2) / (GRAVITY * math.pi**2 * h))
+                * (
+                    (
+                        1
+                        + fric_pipe(q, id_old, nu, eps)
+                        * (1 / 3 + 1 / (2 * n) + 1 / (6 * n**2))
+                    )
+                    / (1 - q_ratio**2)
+                )
+            ) ** (1 / 4)
+            error = abs(id_old - id_new) / id_new
+        return id_new, i, error
+
+    @jit
+    def manifold_id(q, h, q_ratio, nu, eps, n):
+        """Return the inner diameter of a manifold pipe, starting from a 2 inch
+        guess.
+        """
+        return manifold_id_solve(q, h, q_ratio, nu, eps, n)[0]
+
+    @jit
+    def horiz_chan_w_solve(q, depth, hl, l, nu, eps, manifold, k):  # noqa: E741
+        """Return the width of an open horizontal channel for a given head
+        loss, the number of iterations and the final relative change.
+        Iteration stops after 20 steps.
+        """
+        hl = min(hl, depth / 3)
+        w_new = q / ((depth - hl) * math.sqrt(2 * GRAVITY * hl))
+        error = 1.0
+        i = 0
+        while error > 0.001 and i < 20:
+            w = w_new
+            i = i + 1
+            w_new = math.sqrt(
+                (
+                    1
+                    + k
+                    + fric_rect(q, w, depth - hl, nu, eps, True)
+                    * (l / (4 * radius_hydraulic_rect(w, depth - hl, True)))
+                    * (1 - (2 * (manifold / 3)))
+                )
+                / (2 * GRAVITY * hl)
+            ) * (q / (depth - hl))
+            error = abs(w_new - w) / (w_new + w)
+        return w_new, i, error
+
+    @jit
+    def horiz_chan_w(q, depth, hl, l, nu, eps, manifold, k):  # noqa: E741
+        """Return the width of an open horizontal channel for a given head
+        loss. Iteration stops after 20 steps.
+        """
+        return horiz_chan_w_solve(q, depth, hl, l, nu, eps, manifold, k)[0]
+
+    @jit
+    def horiz_chan_h_solve(q, w, hl, l, nu, eps, manifold):  # noqa: E741
+        """Return the depth of an open horizontal channel for a given head
+        loss, the number of iterations and the final relative change.
+        Iteration stops after 200 steps.
+        """
+        h_new = (q / (w * math.sqrt(2 * GRAVITY * hl))) + hl
+        error = 1.0
+        i = 0
+        while error > 0.001 and i < 200:
+            h = h_new
+            hl_local = min(hl, h / 3)
+            i = i + 1
+            h_new = (q / w) * math.sqrt(
+                (
+                    1
+                    + fric_rect(q, w, h - hl_local, nu, eps, True)
+                    * (l / (4 * radius_hydraulic_rect(w, h - hl_local, True)))
+                    * (1 - 2 * (manifold / 3))
+                )
+                / (2 * GRAVITY * hl_local)
+            ) + hl_local
+            error = abs(h_new - h) / (h_new + h)
+        return h_new, i, error
+
+    @jit
+    def horiz_chan_h(q, w, hl, l, nu, eps, manifold):  # noqa: E741
+        """Return the depth of an open horizontal channel for a given head
+        loss. Iteration stops after 200 steps.
+        """
+        return horiz_chan_h_solve(q, w, hl, l, nu, eps, manifold)[0]
+
+    return {
+        "re_pipe": re_pipe,
+        "fric_pipe": fric_pipe,
+        "radius_hydraulic_rect": radius_hydraulic_rect,
+        "re_rect": re_rect,
+        "fric_rect": fric_rect,
+        "headloss_major_pipe": headloss_major_pipe,
+        "headloss_minor_pipe": headloss_minor_pipe,
+        "flow_major_pipe": flow_major_pipe,
+        "flow_minor_pipe": flow_minor_pipe,
+        "flow_pipe_solve": flow_pipe_solve,
+        "flow_pipe": flow_pipe,
+        "diam_major_pipe": diam_major_pipe,
+        "diam_minor_pipe": diam_minor_pipe,
+        "diam_pipe_solve": diam_pipe_solve,
+        "diam_pipe": diam_pipe,
+        "manifold_id_solve": manifold_id_solve,
+        "manifold_id": manifold_id,
+        "horiz_chan_w_solve": horiz_chan_w_solve,
+        "horiz_chan_w": horiz_chan_w,
+        "horiz_chan_h_solve": horiz_chan_h_solve,
+        "horiz_chan_h": horiz_chan_h,
+    }
+
+
+_python_kernels = _define_kernels(lambda func: func)
+_numba_kernels = None
+
+# The uncompiled kernels, for direct use on floats.
+re_pipe = _python_kernels["re_pipe"]
+fric_pipe = _python_kernels["fric_pipe"]
+radius_hydraulic_rect = _python_kernels["radius_hydraulic_rect"]
+re_rect = _python_kernels["re_rect"]
+fric_rect = _python_kernels["fric_rect"]
+headloss_major_pipe = _python_kernels["headloss_major_pipe"]
+headloss_minor_pipe = _python_kernels["headloss_minor_pipe"]
+flow_major_pipe = _python_kernels["flow_major_pipe"]
+flow_minor_pipe = _python_kernels["flow_minor_pipe"]
+flow_pipe = _python_kernels["flow_pipe"]
+flow_pipe_solve = _python_kernels["flow_pipe_solve"]
+diam_major_pipe = _python_kernels["diam_major_pipe"]
+diam_minor_pipe = _python_kernels["diam_minor_pipe"]
+diam_pipe = _python_kernels["diam_pipe"]
+diam_pipe_solve = _python_kernels["diam_pipe_solve"]
+manifold_id = _python_kernels["manifold_id"]
+manifold_id_solve = _python_kernels["manifold_id_solve"]
+horiz_chan_w = _python_kernels["horiz_chan_w"]
+horiz_chan_w_solve = _python_kernels["horiz_chan_w_solve"]
+horiz_chan_h = _python_kernels["horiz_chan_h"]
+horiz_chan_h_solve = _python_kernels["horiz_chan_h_solve"]
+
+
+def numba_available():
+    """Return whether Numba is installed."""
+    return numba is not None
+
+
+def _resolve(backend):
+    if backend not in BACKENDS:
+        raise ValueError(
+            "backend must be one of {}, not {!r}".format(BACKENDS, backend)
+        )
+    if backend == "numba" and not numba_available():
+        raise ImportError("The numba backend requires Numba to be installed.")
+    return backend
+
+
+_backend = _resolve(os.environ.get("AGUACLARA_BACKEND", "numpy"))
+
+
+def set_backend(backend):
+    """Select the backend used by the iterative solvers in physchem.
+
+    :param backend: one of ``"numba"``, ``"numpy"`` or ``"pint"``
+    :type backend: str
+    """
+    global _backend
+    _backend = _resolve(backend)
+
+
+def get_backend():
+    """Return the name of the active backend.
+
+    :return: ``"numba"``, ``"numpy"`` or ``"pint"``
+    :rtype: str
+    """
+    return _backend
+
+
+def get(name):
+    """Return the kernel called ``name`` for the active backend.
+
+    Numba kernels are compiled the first time they are called, or loaded
+    from Numba's on-disk cache. Returns None if
+    the active backend is ``"pint"``.
+
+    :param name: name of the kernel, e.g. ``"flow_pipe"``
+    :type name: str
+    """
+    global _numba_kernels
+    if _backend == "pint":
+        return None
+    if _backend == "numba":
+        if _numba_kernels is None:
+            _numba_kernels = _define_kernels(numba.njit(cache=True))
+        return _numba_kernels[name]
+    return _python_kernels[name]
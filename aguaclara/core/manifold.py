@@ -0,0 +1,229 @@
+"""Port-by-port flow distribution in manifolds.
+
+:func:`aguaclara.core.physchem.headloss_manifold` and
+:func:`aguaclara.core.physchem.manifold_id` describe a manifold with a lumped
+factor that assumes every port carries the same flow. :func:`flow_distribution`
+instead models each port as an orifice and each pipe segment between ports with
+its own friction loss and change in velocity head, and returns the flow through
+every port.
+
+A manifold either distributes flow (flow enters at one end and leaves through
+the ports, like the inlet manifold of a sedimentation tank) or collects it
+(flow enters through the ports and leaves at one end, like the outlet manifold).
+Along a distribution manifold the velocity decreases and the pressure
+recovers, whereas along a collection manifold the flow accelerates and the
+pressure drops.
+
+The head at each port depends only on the flows through the ports between it
+and the dead end of the manifold, so the Jacobian of the system of port
+equations is triangular. Newton's method on the full system therefore reduces
+to Newton's method on the driving head at the dead end, with the other port
+flows found by forward substitution from the dead end to the open end. The
+substitution runs over the ports in turn while every flow rate is solved at
+once.
+
+Example:
+    >>> from aguaclara.core.units import u
+    >>> from aguaclara.core import manifold
+    >>> distribution = manifold.flow_distribution(
+    ...     FlowRate=[3, 6] * u.L / u.s, Diam=6 * u.inch, Length=5.8 * u.m,
+    ...     NumPorts=55, AreaPort=2 * u.cm**2, Nu=1e-6 * u.m**2 / u.s,
+    ...     Roughness=0.12 * u.mm, Collection=True
+    ... )
+    >>> distribution.port_flow.shape
+    (2, 55)
+    >>> distribution.uniformity.round(4)
+    <Quantity([0.9129 0.9155], 'dimensionless')>
+"""
+
+from aguaclara.core.units import u
+import aguaclara.core.channels as ch
+import aguaclara.core.constants as con
+
+from collections import namedtuple
+import warnings
+
+import numpy as np
+
+GRAVITY = ch.GRAVITY
+
+ManifoldFlow = namedtuple(
+    "ManifoldFlow", ["port_flow", "port_head", "head_entry", "uniformity"]
+)
+ManifoldFlow.__doc__ = """Flow distribution of a manifold.
+
+``port_flow`` (u.m**3/u.s) and ``port_head`` (u.m) have one row per flow rate
+and one column per port, ordered from the open end of the manifold to the dead
+end. ``port_head`` is the driving head across each port: the head in the
+manifold above the water outside for a distribution manifold, and the reverse
+for a collection manifold. ``head_entry`` (u.m) is the driving head at the open
+end of the manifold and ``uniformity`` is the ratio of the smallest to the
+largest port flow. If a scalar flow rate is given, the fields are 1D or
+scalars."""
+
+
+def _march(s, c_port, area, diam, spacing, nu, roughness, n, sign):
+    """Return the port flows, port heads, total flow and entry head of
+    manifolds whose driving head at the dead end is ``s**2``.
+
+    The ports are numbered from the dead end. ``sign`` is 1 for a collection
+    manifold and -1 for a distribution manifold.
+    """
+    heads = np.empty(s.shape + (n,))
+    flows = np.empty(s.shape + (n,))
+
+    def segment_loss(q_seg, length):
+        vel = q_seg / area
+        re = np.maximum(np.abs(vel) * diam / nu, 1e-12)
+        return (
+            ch._fric(re, diam / 4, roughness)
+            * length
+            / diam
+            * vel
+            * np.abs(vel)
+            / (2 * GRAVITY)
+        )
+
+    h = s**2
+    q_seg = np.zeros_like(s)
+    vel_prev = np.zeros_like(s)
+    for i in range(n):
+        if i > 0:
+            vel = q_seg / area
+            h = (
+                h
+                + segment_loss(q_seg, spacing)
+                + sign * (vel**2 - vel_prev**2) / (2 * GRAVITY)
+            )
+            vel_prev = vel
+        q_port = c_port * np.sign(h) * np.sqrt(np.abs(h))
+        heads[..., i] = h
+        flows[..., i] = q_port
+        q_seg = q_seg + q_port
+    vel = q_seg / area
+    head_entry = (
+        h
+        + segment_loss(q_seg, spacing / 2)
+        + sign * (vel**2 - vel_prev**2) / (2 * GRAVITY)
+    )
+    return flows, heads, q_seg, head_entry
+
+
+def flow_distribution(
+    FlowRate,
+    Diam,
+    Length,
+    NumPorts,
+    AreaPort,
+    Nu,
+    Roughness,
+    RatioVCPort=con.VC_ORIFICE_RATIO,
+    Collection=False,
+    tol=1e-12,
+    maxiter=50,
+):
+    """Return the flow through every port of a manifold.
+
+    The ports are evenly spaced along the manifold, half a spacing from each
+    end. Each port discharges like an orifice,
+    ``RatioVCPort * AreaPort * sqrt(2 * g * h)`` for a driving head ``h``.
+    Between ports, the head changes by the friction loss of the segment and by
+    the change in velocity head.
+
+    :param FlowRate: total flow rate through the manifold; a scalar or a 1D
+        array of flow rates to evaluate at once
+    :type FlowRate: u.m**3/u.s
+    :param Diam: inner diameter of the manifold
+    :type Diam: u.m
+    :param Length: length of the manifold
+    :type Length: u.m
+    :param NumPorts: number of ports
+    :type NumPorts: int
+    :param AreaPort: area of each port
+    :type AreaPort: u.m**2
+    :param Nu: kinematic viscosity of fluid
+    :type Nu: u.m**2/u.s
+    :param Roughness: roughness of the manifold
+    :type Roughness: u.m
+    :param RatioVCPort: vena contracta ratio of the ports, defaults to
+        ``VC_ORIFICE_RATIO``
+    :type RatioVCPort: u.dimensionless or unitless
+    :param Collection: true if the manifold collects flow through its ports,
+        false if it distributes flow through them
+    :type Collection: boolean
+
+    :return: flow distribution of the manifold
+    :rtype: ManifoldFlow
+    """
+    q = np.asarray(u.Quantity(FlowRate).m_as(u.m**3 / u.s), dtype=float)
+    scalar = q.ndim == 0
+    q = np.atleast_1d(q)
+    diam = float(u.Quantity(Diam).m_as(u.m))
+    length = float(u.Quantity(Length).m_as(u.m))
+    area_port = float(u.Quantity(AreaPort).m_as(u.m**2))
+    nu = float(u.Quantity(Nu).m_as(u.m**2 / u.s))
+    roughness = float(u.Quantity(Roughness).m_as(u.m))
+    ratio_vc = float(u.Quantity(RatioVCPort).m_as(u.dimensionless))
+
+    ch._check(q, ">0", "Flow rate")
+    ch._check(np.array([diam, length, area_port, nu]), ">0", "Manifold input")
+    ch._check(np.array(roughness), ">=0", "Pipe roughness")
+    if int(NumPorts) != NumPorts or NumPorts < 1:
+        raise ValueError(
+            "NumPorts is {} but must be a positive integer.".format(NumPorts)
+        )
+    if not 0 < ratio_vc <= 1:
+        raise ValueError(
+            "RatioVCPort is {} but must be between 0 and 1.".format(ratio_vc)
+        )
+
+    n = int(NumPorts)
+    args = (
+        ratio_vc * area_port * np.sqrt(2 * GRAVITY),
+        np.pi / 4 * diam**2,
+        diam,
+        length / n,
+        nu,
+        roughness,
+        n,
+        1 if Collection else -1,
+    )
+
+    # Start from the head that gives every port the same flow. The total flow
+    # is close to proportional to the square root of the dead-end head.
+    s = q / (n * args[0])
+    converged = np.zeros(q.shape, dtype=bool)
+    for _ in range(maxiter):
+        q_total = _march(s, *args)[2]
+        ds = 1e-7 * s
+        slope = (_march(s + ds, *args)[2] - q_total) / ds
+        s_new = s - (q_total - q) / slope
+        # Keep the dead-end head positive.
+        s_new = np.where(s_new > 0, s_new, s / 10)
+        converged = np.abs(s_new - s) <= tol * s
+        s = s_new
+        if converged.all():
+            break
+    else:
+        warnings.warn(
+            "flow_distribution did not converge for {} of {} flow rates.".format(
+                np.count_nonzero(~converged), q.size
+            ),
+            UserWarning,
+        )
+
+    flows, heads, _, head_entry = _march(s, *args)
+    # Order the ports from the open end.
+    flows = flows[..., ::-1]
+    heads = heads[..., ::-1]
+    uniformity = flows.min(axis=-1) / flows.max(axis=-1)
+    if scalar:
+        flows, heads, head_entry, uniformity = (
+            a[0] for a in (flows, heads, head_entry, uniformity)
+        )
+    return ManifoldFlow(
+        flows * u.m**3 / u.s,
+        heads * u.m,
+        head_entry * u.m,
+        uniformity * u.dimensionless,
+    )
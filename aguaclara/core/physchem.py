@@ -6,11 +6,45 @@ from aguaclara.core.units import u
 import aguaclara.core.constants as con
 import aguaclara.core.utility as ut
 import aguaclara.core.pipes as pipe
+import aguaclara.core.kernels as kernels
+from aguaclara.core import telemetry
 
 import numpy as np
 from scipy import interpolate, integrate
 import warnings
 
+# Units of the kernel inputs and outputs, built once rather than on every call.
+_M = u.m
+_M3_S = u.m**3 / u.s
+_M2_S = u.m**2 / u.s
+_DIMENSIONLESS = u.dimensionless
+
+
+def _si(value, units):
+    """Return the magnitude of ``value`` in ``units`` as a float, for use
+    with the unit-free kernels. Unitless values are taken to be dimensionless.
+    """
+    if isinstance(value, u.Quantity):
+        return float(value.m_as(units))
+    return float(value)
+
+
+def _call_kernel(name, args, names, rtol):
+    """Return the result of the kernel of an iterative solver for SI
+    arguments, recording the call in the solver telemetry if a collector is
+    running. The solver converged if its final relative change is at most
+    ``rtol``.
+    """
+    start = telemetry.start()
+    if start is None:
+        return kernels.get(name)(*args)
+    result, iterations, residual = kernels.get(name + "_solve")(*args)
+    telemetry.record(
+        name, start, iterations, residual, residual <= rtol, dict(zip(names, args))
+    )
+    return result
+
+
 #####
 # Gas
 #####
@@ -1099,17 +1133,15 @@ def flow_orifice_vert(Diam, Height, RatioVCOrifice):
     :rtype: u.m**3/u.s
     """
     ut.check_range([RatioVCOrifice, "0-1", "VC orifice ratio"])
-    Diam = Diam.to(u.m)
-    Height = Height.to(u.m)
+    Diam = Diam.to(u.m).magnitude
+    Height = Height.to(u.m).magnitude
     if Height > -Diam / 2:
+        # The integrand is evaluated without units, since quad calls it many
+        # times.
         flow_vert = integrate.quad(
-            lambda z: (
-                Diam
-                * np.sin(np.arccos(z * u.m / (Diam / 2)))
-                * np.sqrt(Height - z * u.m)
-            ).magnitude,
-            -Diam.magnitude / 2,
-            min(Diam / 2, Height).magnitude,
+            lambda z: Diam * np.sin(np.arccos(z / (Diam / 2))) * np.sqrt(Height - z),
+            -Diam / 2,
+            min(Diam / 2, Height),
         )
         return (flow_vert[0] * u.m**2.5 * RatioVCOrifice * np.sqrt(2 * u.gravity)).to(
             u.m**3 / u.s
@@ -1440,6 +1472,34 @@ def flow_pipe(
         warnings.warn("PipeRough is deprecated; use Roughness instead.", UserWarning)
         Roughness = PipeRough
 
+    kernel = kernels.get("flow_pipe")
+    if kernel is not None:
+        ut.check_range(
+            [Diam.magnitude, ">0", "Diameter"],
+            [Length.magnitude, ">0", "Length"],
+            [HeadLoss.magnitude, ">=0", "Headloss"],
+            [Nu.magnitude, ">0", "Nu"],
+            [Roughness.magnitude, ">=0", "Pipe roughness"],
+            [KMinor, ">=0", "K minor"],
+        )
+        FlowRate = _call_kernel(
+            "flow_pipe",
+            (
+                _si(Diam, _M),
+                _si(HeadLoss, _M),
+                _si(Length, _M),
+                _si(Nu, _M2_S),
+                _si(Roughness, _M),
+                _si(KMinor, _DIMENSIONLESS),
+            ),
+            ("Diam", "HeadLoss", "Length", "Nu", "Roughness", "KMinor"),
+            0.01,
+        )
+        return FlowRate * _M3_S
+
+    start = telemetry.start()
+    i = 0
+    err = 0.0
     if KMinor == 0:
         FlowRate = flow_major_pipe(Diam, HeadLoss, Length, Nu, Roughness)
     else:
@@ -1450,6 +1510,7 @@ def flow_pipe(
             flow_minor_pipe(Diam, HeadLoss, KMinor),
         )
         while err > 0.01:
+            i = i + 1
             FlowRatePrev = FlowRate
             HLFricNew = (
                 HeadLoss
@@ -1464,6 +1525,22 @@ def flow_pipe(
                 err = 0.0
             else:
                 err = abs(FlowRate - FlowRatePrev) / ((FlowRate + FlowRatePrev) / 2)
+    if start is not None:
+        telemetry.record(
+            "flow_pipe",
+            start,
+            i,
+            _si(err, _DIMENSIONLESS),
+            err <= 0.01,
+            {
+                "Diam": _si(Diam, _M),
+                "HeadLoss": _si(HeadLoss, _M),
+                "Length": _si(Length, _M),
+                "Nu": _si(Nu, _M2_S),
+                "Roughness": _si(Roughness, _M),
+                "KMinor": _si(KMinor, _DIMENSIONLESS),
+            },
+        )
     return FlowRate.to(u.m**3 / u.s)
 
 
@@ -1708,6 +1785,34 @@ def diam_pipe(FlowRate, HeadLoss, Length, Nu, PipeRough, KMinor):
     :return: inner diameter of pipe
     :rtype: u.m
     """
+    kernel = kernels.get("diam_pipe")
+    if kernel is not None:
+        ut.check_range(
+            [FlowRate.magnitude, ">0", "Flow rate"],
+            [HeadLoss.magnitude, ">0", "Headloss"],
+            [Length.magnitude, ">0", "Length"],
+            [Nu.magnitude, ">0", "Nu"],
+            [PipeRough.magnitude, ">=0", "Pipe roughness"],
+            [KMinor, ">=0", "K minor"],
+        )
+        Diam = _call_kernel(
+            "diam_pipe",
+            (
+                _si(FlowRate, _M3_S),
+                _si(HeadLoss, _M),
+                _si(Length, _M),
+                _si(Nu, _M2_S),
+                _si(PipeRough, _M),
+                _si(KMinor, _DIMENSIONLESS),
+            ),
+            ("FlowRate", "HeadLoss", "Length", "Nu", "PipeRough", "KMinor"),
+            0.001,
+        )
+        return Diam * _M
+
+    start = telemetry.start()
+    i = 0
+    err = 0.0
     if KMinor == 0:
         Diam = diam_major_pipe(FlowRate, HeadLoss, Length, Nu, PipeRough)
     else:
@@ -1717,6 +1822,7 @@ def diam_pipe(FlowRate, HeadLoss, Length, Nu, PipeRough, KMinor):
         )
         err = 1.00
         while err > 0.001:
+            i = i + 1
             DiamPrev = Diam
             HLFricNew = (
                 HeadLoss
@@ -1728,6 +1834,22 @@ def diam_pipe(FlowRate, HeadLoss, Length, Nu, PipeRough, KMinor):
             )
             Diam = diam_major_pipe(FlowRate, HLFricNew, Length, Nu, PipeRough)
             err = abs(Diam - DiamPrev) / ((Diam + DiamPrev) / 2)
+    if start is not None:
+        telemetry.record(
+            "diam_pipe",
+            start,
+            i,
+            _si(err, _DIMENSIONLESS),
+            err <= 0.001,
+            {
+                "FlowRate": _si(FlowRate, _M3_S),
+                "HeadLoss": _si(HeadLoss, _M),
+                "Length": _si(Length, _M),
+                "Nu": _si(Nu, _M2_S),
+                "PipeRough": _si(PipeRough, _M),
+                "KMinor": _si(KMinor, _DIMENSIONLESS),
+            },
+        )
     return Diam.to(u.m)
 
 
@@ -2061,10 +2183,36 @@ def manifold_id_alt(q, pr_max):
 
 @ut.list_handler()
 def manifold_id(q, h, l, q_ratio, nu, eps, k, n):  # noqa: E741
+    kernel = kernels.get("manifold_id")
+    if kernel is not None:
+        ut.check_range(
+            [q.magnitude, ">0", "Flow rate"],
+            [h.magnitude, ">0", "Headloss"],
+            [nu.magnitude, ">0", "Nu"],
+            [eps.magnitude, ">=0", "Pipe roughness"],
+        )
+        id_new = _call_kernel(
+            "manifold_id",
+            (
+                _si(q, _M3_S),
+                _si(h, _M),
+                _si(q_ratio, _DIMENSIONLESS),
+                _si(nu, _M2_S),
+                _si(eps, _M),
+                _si(n, _DIMENSIONLESS),
+            ),
+            ("q", "h", "q_ratio", "nu", "eps", "n"),
+            0.01,
+        )
+        return id_new * _M
+
+    start = telemetry.start()
     id_new = 2 * u.inch
     id_old = 0 * u.inch
     error = 1
+    i = 0
     while error > 0.01:
+        i = i + 1
         id_old = id_new
         id_new = (
             ((8 * q**2) / (u.gravity * np.pi**2 * h))
@@ -2078,6 +2226,22 @@ def manifold_id(q, h, l, q_ratio, nu, eps, k, n):  # noqa: E741
             )
         ) ** (1 / 4)
         error = np.abs(id_old - id_new) / id_new
+    if start is not None:
+        telemetry.record(
+            "manifold_id",
+            start,
+            i,
+            _si(error, _DIMENSIONLESS),
+            True,
+            {
+                "q": _si(q, _M3_S),
+                "h": _si(h, _M),
+                "q_ratio": _si(q_ratio, _DIMENSIONLESS),
+                "nu": _si(nu, _M2_S),
+                "eps": _si(eps, _M),
+                "n": _si(n, _DIMENSIONLESS),
+            },
+        )
     return id_new
 
 
@@ -2091,6 +2255,44 @@ def manifold_nd(q, h, l, q_ratio, nu, eps, k, n, sdr):  # noqa: E741
 
 @ut.list_handler()
 def horiz_chan_w(q, depth, hl, l, nu, eps, manifold, k):  # noqa: E741
+    kernel = kernels.get("horiz_chan_w")
+    if kernel is not None:
+        ut.check_range(
+            [q.magnitude, ">0", "Flow rate"],
+            [depth.magnitude, ">0", "Depth"],
+            [hl.magnitude, ">0", "Headloss"],
+            [nu.magnitude, ">0", "Nu"],
+            [eps.magnitude, ">=0", "Roughness"],
+        )
+        w = _call_kernel(
+            "horiz_chan_w",
+            (
+                _si(q, _M3_S),
+                _si(depth, _M),
+                _si(hl, _M),
+                _si(l, _M),
+                _si(nu, _M2_S),
+                _si(eps, _M),
+                int(manifold),
+                _si(k, _DIMENSIONLESS),
+            ),
+            ("q", "depth", "hl", "l", "nu", "eps", "manifold", "k"),
+            0.001,
+        )
+        return w * _M
+
+    start = telemetry.start()
+    if start is not None:
+        inputs = {
+            "q": _si(q, _M3_S),
+            "depth": _si(depth, _M),
+            "hl": _si(hl, _M),
+            "l": _si(l, _M),
+            "nu": _si(nu, _M2_S),
+            "eps": _si(eps, _M),
+            "manifold": int(manifold),
+            "k": _si(k, _DIMENSIONLESS),
+        }
     hl = min(hl, depth / 3)
     horiz_chan_w_new = q / ((depth - hl) * np.sqrt(2 * u.gravity * hl))
 
@@ -2110,11 +2312,40 @@ def horiz_chan_w(q, depth, hl, l, nu, eps, manifold, k):  # noqa: E741
             / (2 * u.gravity * hl)
         ) * (q / (depth - hl))
         error = np.abs(horiz_chan_w_new - w) / (horiz_chan_w_new + w)
+    if start is not None:
+        error = _si(error, _DIMENSIONLESS)
+        telemetry.record("horiz_chan_w", start, i, error, error <= 0.001, inputs)
     return horiz_chan_w_new.to(u.m)
 
 
 @ut.list_handler()
 def horiz_chan_h(q, w, hl, l, nu, eps, manifold):  # noqa: E741
+    kernel = kernels.get("horiz_chan_h")
+    if kernel is not None:
+        ut.check_range(
+            [q.magnitude, ">0", "Flow rate"],
+            [w.magnitude, ">0", "Width"],
+            [hl.magnitude, ">0", "Headloss"],
+            [nu.magnitude, ">0", "Nu"],
+            [eps.magnitude, ">=0", "Roughness"],
+        )
+        h = _call_kernel(
+            "horiz_chan_h",
+            (
+                _si(q, _M3_S),
+                _si(w, _M),
+                _si(hl, _M),
+                _si(l, _M),
+                _si(nu, _M2_S),
+                _si(eps, _M),
+                int(manifold),
+            ),
+            ("q", "w", "hl", "l", "nu", "eps", "manifold"),
+            0.001,
+        )
+        return h * _M
+
+    start = telemetry.start()
     h_new = (q / (w * np.sqrt(2 * u.gravity * hl))) + hl
     error = 1
     i = 0
@@ -2132,6 +2363,24 @@ def horiz_chan_h(q, w, hl, l, nu, eps, manifold):  # noqa: E741
             / (2 * u.gravity * hl_local)
         ) + (hl_local)
         error = np.abs(h_new - h) / (h_new + h)
+    if start is not None:
+        error = _si(error, _DIMENSIONLESS)
+        telemetry.record(
+            "horiz_chan_h",
+            start,
+            i,
+            error,
+            error <= 0.001,
+            {
+                "q": _si(q, _M3_S),
+                "w": _si(w, _M),
+                "hl": _si(hl, _M),
+                "l": _si(l, _M),
+                "nu": _si(nu, _M2_S),
+                "eps": _si(eps, _M),
+                "manifold": int(manifold),
+            },
+        )
     return h_new.to(u.m)
 
 
@@ -0,0 +1,360 @@
+"""Generic numerical solvers for inverting the functions in
+:mod:`aguaclara.core.physchem`.
+
+Many design problems ask for the input of a physchem function that produces a
+required output, such as the channel width that gives a target head loss.
+Rather than writing a new loop for every such problem, :func:`solve_for` finds
+the unknown input of any function that is monotone over a bracket, for one
+target or for a whole array of targets at once.
+
+Designs of interdependent components, such as an entrance tank whose length
+depends on the flocculator that is designed around it, are fixed points of a
+redesign step. :func:`fixed_point` iterates such a step, with Anderson
+acceleration when plain iteration stalls, and records how it converged.
+
+Example:
+    >>> from aguaclara.core.units import u
+    >>> import aguaclara.core.physchem as pc
+    >>> from aguaclara.core.solvers import solve_for
+    >>> width = solve_for(
+    ...     pc.headloss_rect, [1, 2, 5] * u.cm, unknown="Width",
+    ...     bounds=(1 * u.cm, 1 * u.m), FlowRate=20 * u.L / u.s,
+    ...     Depth=0.5 * u.m, Length=10 * u.m, KMinor=2,
+    ...     Nu=1e-6 * u.m**2 / u.s, Roughness=0.1 * u.mm, OpenChannel=True
+    ... )
+    >>> width.round(4)
+    <Quantity([15.1132 11.1756  7.6173], 'centimeter')>
+    >>> from aguaclara.core.solvers import fixed_point
+    >>> result = fixed_point(lambda x: (x + 2 * u.m**2 / x) / 2, 1 * u.m)
+    >>> round(result.x, 6), result.iterations
+    (<Quantity(1.414214, 'meter')>, 5)
+"""
+
+from aguaclara.core.units import u
+from aguaclara.core import channels
+from aguaclara.core import telemetry
+
+from collections import namedtuple
+import warnings
+
+import numpy as np
+
+FixedPointResult = namedtuple(
+    "FixedPointResult", ["x", "converged", "iterations", "trace", "residuals"]
+)
+FixedPointResult.__doc__ = """Result of :func:`fixed_point`.
+
+``x`` is the last iterate at which the function was evaluated. ``trace`` holds
+every iterate in order, and ``residuals`` the largest relative residual,
+``|func(x) - x| / |func(x)|``, of each."""
+
+
+def _is_array(value):
+    if isinstance(value, u.Quantity):
+        value = value.magnitude
+    return isinstance(value, (list, tuple, np.ndarray)) and np.ndim(value) > 0
+
+
+def _evaluate(func, unknown, x, known, idx, vectorized):
+    """Evaluate ``func`` at the unknown values ``x`` (a Quantity array) for
+    the targets at flat indices ``idx``.
+
+    A vectorized ``func`` is called once, with ``x`` and the elements of the
+    array known arguments at ``idx``. Otherwise, scalar known arguments let
+    ``func`` receive ``x`` as a single array, which
+    :func:`aguaclara.core.utility.list_handler` then evaluates one element at
+    a time, and array known arguments are matched to ``x`` by calling
+    ``func`` once per element.
+    """
+    scalars = {k: v for k, v in known.items() if not isinstance(v, _Broadcast)}
+    arrays = {k: v for k, v in known.items() if isinstance(v, _Broadcast)}
+    if vectorized:
+        result = func(
+            **{unknown: x}, **scalars, **{k: v.take(idx) for k, v in arrays.items()}
+        )
+        return u.Quantity(result) * np.ones(len(idx))
+    if not arrays:
+        result = func(**{unknown: x}, **scalars)
+        return u.Quantity(result) * np.ones(len(idx))
+    results = [
+        u.Quantity(
+            func(**{unknown: x[j]}, **scalars, **{k: v[i] for k, v in arrays.items()})
+        )
+        for j, i in enumerate(idx)
+    ]
+    units = results[0].units
+    return np.array([r.m_as(units) for r in results]) * units
+
+
+class _Broadcast:
+    """A known argument broadcast to the shape of the targets."""
+
+    def __init__(self, value, shape):
+        if isinstance(value, u.Quantity):
+            self.units = value.units
+            self.values = np.broadcast_to(value.magnitude, shape).ravel()
+        else:
+            self.units = None
+            self.values = np.broadcast_to(np.asarray(value), shape).ravel()
+
+    def __getitem__(self, i):
+        if self.units is None:
+            return self.values[i].item()
+        return self.values[i].item() * self.units
+
+    def take(self, idx):
+        """Return the values at the flat indices ``idx`` as an array."""
+        if self.units is None:
+            return self.values[idx]
+        return self.values[idx] * self.units
+
+
+def solve_for(
+    func,
+    target,
+    unknown="Diam",
+    bounds=None,
+    rtol=1e-10,
+    maxiter=100,
+    expand=10,
+    vectorized=None,
+    **known
+):
+    """Return the value of the argument ``unknown`` of ``func`` at which
+    ``func`` equals ``target``.
+
+    The root is found with a vectorized regula falsi iteration safeguarded by
+    bisection: every target is solved simultaneously and only the targets that
+    have not yet converged are evaluated again. ``func`` must be continuous
+    and monotone between the bounds. If a target is not bracketed by the
+    bounds, the bracket is widened geometrically up to ``expand`` times.
+
+    Each iteration evaluates ``func`` once for all of the targets if it is
+    vectorized, as are the functions of :mod:`aguaclara.core.channels`.
+    The functions of physchem are wrapped with
+    :func:`aguaclara.core.utility.list_handler`, which evaluates them one
+    element at a time, so inverting them for many targets costs as many
+    calls per iteration.
+
+    Args:
+        - ``func (function)``: Function to invert, usually from physchem. All
+          other arguments are passed to it by keyword.
+        - ``target (u.Quantity)``: Required output of ``func``; a scalar or an
+          array of any shape.
+        - ``unknown (str)``: Name of the argument of ``func`` to solve for.
+          Defaults to ``"Diam"``.
+        - ``bounds (tuple)``: Lower and upper bound of the unknown. The
+          result has the units of the lower bound.
+        - ``rtol (float)``: Relative tolerance on the unknown and on the
+          residual. Defaults to 1e-10.
+        - ``maxiter (int)``: Maximum number of iterations. Defaults to 100.
+        - ``expand (int)``: Maximum number of times to widen the bracket by a
+          factor of 10 when a target lies outside it. Defaults to 10.
+        - ``vectorized (bool)``: Whether ``func`` evaluates arrays of all of
+          its arguments elementwise in one call, broadcasting them against
+          each other. Defaults to True for the functions of
+          :mod:`aguaclara.core.channels` and False otherwise.
+        - ``**known``: Values of the other arguments of ``func``. Arrays are
+          broadcast against ``target``.
+
+    Returns:
+        - ``u.Quantity``: The unknown, in the units of the lower bound, with the
+          shape of ``target`` broadcast against the known arrays.
+
+    Raises:
+        - ``TypeError``: If ``bounds`` is not given.
+        - ``ValueError``: If some target cannot be bracketed.
+    """
+    if bounds is None:
+        raise TypeError("solve_for requires the bounds of {}".format(unknown))
+    lo, hi = bounds
+    units = lo.units if isinstance(lo, u.Quantity) else u.dimensionless
+    lo = float(u.Quantity(lo).m_as(units))
+    hi = float(u.Quantity(hi).m_as(units))
+    if not lo < hi:
+        raise ValueError("The lower bound must be less than the upper bound.")
+
+    target = u.Quantity(target)
+    target_units = target.units
+    shape = np.broadcast_shapes(
+        np.shape(target.magnitude),
+        *(np.shape(u.Quantity(v).magnitude) for v in known.values() if _is_array(v))
+    )
+    goal = np.broadcast_to(target.magnitude, shape).astype(float).ravel()
+    known = {k: _Broadcast(v, shape) if _is_array(v) else v for k, v in known.items()}
+    if vectorized is None:
+        vectorized = getattr(func, "__module__", None) == channels.__name__
+    n = goal.size
+
+    def residual(x, idx):
+        f = _evaluate(func, unknown, x * units, known, idx, vectorized)
+        return f.m_as(target_units) - goal[idx]
+
+    everything = np.arange(n)
+    a = np.full(n, lo)
+    b = np.full(n, hi)
+    fa = residual(a, everything)
+    fb = residual(b, everything)
+
+    # Widen the bracket of the targets whose residuals share a sign.
+    for _ in range(expand):
+        idx = np.flatnonzero(np.sign(fa) * np.sign(fb) > 0)
+        if idx.size == 0:
+            break
+        # Move whichever end is closer to the root.
+        low = np.abs(fa[idx]) < np.abs(fb[idx])
+        lower, upper = idx[low], idx[~low]
+        if lower.size:
+            b[lower], fb[lower] = a[lower], fa[lower]
+            a[lower] = a[lower] / 10 if lo > 0 else a[lower] - 9 * (hi - lo)
+            fa[lower] = residual(a[lower], lower)
+        if upper.size:
+            a[upper], fa[upper] = b[upper], fb[upper]
+            b[upper] = b[upper] * 10 if hi > 0 else b[upper] + 9 * (hi - lo)
+            fb[upper] = residual(b[upper], upper)
+    unbracketed = np.sign(fa) * np.sign(fb) > 0
+    if unbracketed.any():
+        raise ValueError(
+            "{} of {} targets could not be bracketed between {} and {}.".format(
+                np.count_nonzero(unbracketed), n, lo * units, hi * units
+            )
+        )
+
+    x = np.where(np.abs(fa) < np.abs(fb), a, b)
+    done = (fa == 0) | (fb == 0)
+    # Targets whose bracket shrank by less than half on the last step are
+    # bisected on the next one, which bounds the cost of slow secant steps.
+    bisect = np.zeros(n, dtype=bool)
+    for _ in range(maxiter):
+        idx = np.flatnonzero(~done)
+        if idx.size == 0:
+            break
+        ai, bi, fai, fbi = a[idx], b[idx], fa[idx], fb[idx]
+        xi = (ai * fbi - bi * fai) / (fbi - fai)
+        # Bisect geometrically if the bracket excludes zero, since the
+        # unknowns are usually physical sizes spanning orders of magnitude.
+        mid = np.where(
+            ai * bi > 0, np.sign(ai) * np.sqrt(np.abs(ai * bi)), (ai + bi) / 2
+        )
+        outside = ~((xi > np.minimum(ai, bi)) & (xi < np.maximum(ai, bi)))
+        xi = np.where(bisect[idx] | outside, mid, xi)
+        fxi = residual(xi, idx)
+        x[idx] = xi
+
+        # Replace the end whose residual has the same sign as the new point.
+        replace_a = np.sign(fxi) == np.sign(fai)
+        a[idx[replace_a]], fa[idx[replace_a]] = xi[replace_a], fxi[replace_a]
+        b[idx[~replace_a]], fb[idx[~replace_a]] = xi[~replace_a], fxi[~replace_a]
+
+        width = np.abs(b[idx] - a[idx])
+        bisect[idx] = width > np.abs(bi - ai) / 2
+        tiny = np.finfo(float).tiny
+        done[idx] = (np.abs(fxi) <= rtol * np.maximum(np.abs(goal[idx]), tiny)) | (
+            width <= rtol * np.maximum(np.abs(xi), tiny)
+        )
+    else:
+        if not done.all():
+            warnings.warn(
+                "solve_for did not converge for {} of {} targets in {} "
+                "iterations.".format(np.count_nonzero(~done), n, maxiter),
+                UserWarning,
+            )
+
+    x = x.reshape(shape)
+    if x.ndim == 0:
+        return x.item() * units
+    return x * units
+
+
+def fixed_point(
+    func, x0, rtol=1e-6, maxiter=50, memory=3, contraction=0.5, name="fixed_point"
+):
+    """Return a fixed point of ``func``, a value ``x`` at which ``func(x)``
+    equals ``x`` within a relative tolerance.
+
+    Each iteration evaluates ``func`` once. As long as the residual
+    ``func(x) - x`` shrinks by at least the factor ``contraction`` per
+    iteration, the next iterate is ``func(x)``. Otherwise, the next iterate
+    is the Anderson-accelerated combination of the last ``memory`` iterates,
+    which for a scalar ``x`` is a secant step. Redesigns of components whose
+    sizes are rounded are piecewise constant, so they usually converge by
+    plain iteration in a few steps or alternate between two designs, which
+    the accelerated step settles between.
+
+    ``func`` may redesign components as a side effect. It is evaluated last
+    at the returned ``x``, so the components are left designed for it.
+
+    Args:
+        - ``func (function)``: Function of one argument, with the units and
+          shape of ``x0``
+        - ``x0 (u.Quantity)``: Initial guess, a scalar or an array
+        - ``rtol (float)``: Relative tolerance of the residual (optional,
+          defaults to 1e-6)
+        - ``maxiter (int)``: Maximum number of evaluations of ``func``
+          (optional, defaults to 50)
+        - ``memory (int)``: Number of previous iterates that Anderson
+          acceleration combines (optional, defaults to 3)
+        - ``contraction (float)``: Factor by which the residual must shrink
+          per iteration to continue without acceleration (optional, defaults
+          to 0.5)
+        - ``name (str)``: Name of the iteration in the solver telemetry of
+          :mod:`aguaclara.core.telemetry` (optional, defaults to
+          "fixed_point")
+
+    Returns:
+        - The fixed point and a trace of the iteration (FixedPointResult)
+    """
+    if maxiter < 1:
+        raise ValueError("maxiter must be at least 1.")
+    start = telemetry.start()
+    x0 = u.Quantity(x0)
+    units = x0.units
+    shape = np.shape(x0.magnitude)
+    x = np.array(x0.magnitude, dtype=float).ravel()
+    # Anderson acceleration with more differences than unknowns is singular.
+    memory = max(1, min(int(memory), x.size))
+    tiny = np.finfo(float).tiny
+
+    trace = []
+    residuals = []
+    xs = []
+    fs = []
+    converged = False
+    for _ in range(int(maxiter)):
+        arg = x.reshape(shape) * units if shape else x.item() * units
+        g = np.array(u.Quantity(func(arg)).m_as(units), dtype=float).ravel()
+        f = g - x
+        residual = np.max(np.abs(f) / np.maximum(np.abs(g), tiny))
+        trace.append(x)
+        residuals.append(residual)
+        if residual <= rtol:
+            converged = True
+            break
+
+        xs, fs = xs[-memory:] + [x], fs[-memory:] + [f]
+        if len(fs) > 1 and np.linalg.norm(f) > contraction * np.linalg.norm(fs[-2]):
+            dx = np.diff(xs, axis=0).T
+            df = np.diff(fs, axis=0).T
+            gamma = np.linalg.lstsq(df, f, rcond=None)[0]
+            x = x + f - (dx + df) @ gamma
+            if not np.all(np.isfinite(x)):
+                x = g
+        else:
+            x = g
+
+    if not converged:
+        warnings.warn(
+            "fixed_point did not converge in {} iterations; the last relative "
+            "residual was {:.3g}.".format(maxiter, residuals[-1]),
+            UserWarning,
+        )
+    telemetry.record(name, start, len(residuals), residuals[-1], converged)
+
+    trace = np.array(trace).reshape((len(trace),) + shape)
+    return FixedPointResult(
+        trace[-1] * units if shape else trace[-1].item() * units,
+        converged,
+        len(residuals),
+        trace * units,
+        np.array(residuals),
+    )
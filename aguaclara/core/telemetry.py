@@ -0,0 +1,258 @@
+"""Telemetry of the iterative solvers of the package.
+
+The iterative solvers of :mod:`aguaclara.core.physchem` (``flow_pipe``,
+``diam_pipe``, ``manifold_id``, ``horiz_chan_w`` and ``horiz_chan_h``),
+:func:`aguaclara.core.solvers.fixed_point`, ``CompiledPipeline.flow``, which
+``PipelineComponent.flow_pipeline`` calls, and ``PipeNetwork.solve`` report
+every call to the collectors that are running. The fixed point iterations of
+the designs are named after them, such as ``EntTankFloc._design_ent_floc``. A
+call is reported with its number of iterations, its final residual (the
+relative change or residual that the solver compares to its tolerance),
+whether it converged, its wall time and its inputs, which the physchem
+solvers report in SI units.
+
+A :class:`Telemetry` collector aggregates the calls of each solver into
+histograms of iterations and wall time, keeps the slowest calls and the
+first calls that did not converge, and can write every call to a JSON lines
+file. Nothing is recorded, and the solvers run at full speed, while no
+collector is running.
+
+Example:
+    >>> from aguaclara.core.units import u
+    >>> import aguaclara.core.physchem as pc
+    >>> from aguaclara.core import telemetry
+    >>> with telemetry.collect() as t:
+    ...     width = pc.horiz_chan_w(
+    ...         20 * u.L / u.s, 50 * u.cm, 1 * u.mm, 5 * u.m,
+    ...         1e-6 * u.m**2 / u.s, 2 * u.mm, False, 0
+    ...     )
+    >>> summary = t.summary()["horiz_chan_w"]
+    >>> summary.calls, summary.failures
+    (1, 0)
+    >>> summary.iterations
+    {3: 1}
+"""
+
+from collections import Counter, namedtuple
+import heapq
+import itertools
+import json
+import time
+
+import numpy as np
+
+SolverCall = namedtuple(
+    "SolverCall",
+    ["solver", "iterations", "residual", "converged", "time", "inputs"],
+)
+SolverCall.__doc__ = """A call of an iterative solver.
+
+``time`` is the wall time of the call (s), and ``inputs`` a dictionary of the
+inputs of the call in SI units, which is empty for solvers that don't report
+their inputs."""
+
+SolverSummary = namedtuple(
+    "SolverSummary",
+    [
+        "calls",
+        "failures",
+        "time",
+        "time_max",
+        "residual_max",
+        "iterations",
+        "time_histogram",
+    ],
+)
+SolverSummary.__doc__ = """Statistics of the calls of an iterative solver.
+
+``failures`` counts the calls that did not converge, ``time`` and
+``time_max`` are the total and largest wall times (s) and ``residual_max``
+the largest final residual. ``iterations`` maps each number of iterations to
+the number of calls that took it, and ``time_histogram`` counts the calls by
+wall time between the edges of ``TIME_BINS``."""
+
+#: Edges of the bins of wall time (s) of the histograms of
+#: ``SolverSummary.time_histogram``, which has one more bin than edges: the
+#: first counts calls faster than ``TIME_BINS[0]`` and the last calls slower
+#: than ``TIME_BINS[-1]``.
+TIME_BINS = 10.0 ** np.arange(-6, 2)
+
+# The collectors that are running
+_collectors = []
+
+
+def start():
+    """Return the start time of a solver call, or None if no collector is
+    running, in which case the call shouldn't be recorded.
+    """
+    return time.perf_counter() if _collectors else None
+
+
+def record(solver, start, iterations, residual, converged, inputs=None):
+    """Report a solver call to the collectors that are running.
+
+    Args:
+        - ``solver (str)``: Name of the solver
+        - ``start (float)``: Start time of the call, returned by ``start()``.
+          Calls that started while no collector was running are ignored.
+        - ``iterations (int)``: Number of iterations
+        - ``residual (float)``: Final residual
+        - ``converged (bool)``: Whether the call converged
+        - ``inputs (dict)``: Inputs of the call in SI units (optional)
+    """
+    if start is None or not _collectors:
+        return
+    call = SolverCall(
+        solver,
+        int(iterations),
+        float(residual),
+        bool(converged),
+        time.perf_counter() - start,
+        {} if inputs is None else inputs,
+    )
+    for collector in _collectors:
+        collector.add(call)
+
+
+class _Stats:
+    __slots__ = (
+        "calls",
+        "failures",
+        "time",
+        "time_max",
+        "residual_max",
+        "iterations",
+        "time_histogram",
+    )
+
+    def __init__(self):
+        self.calls = 0
+        self.failures = 0
+        self.time = 0.0
+        self.time_max = 0.0
+        self.residual_max = 0.0
+        self.iterations = Counter()
+        self.time_histogram = np.zeros(TIME_BINS.size + 1, dtype=int)
+
+
+class Telemetry:
+    """A collector of the calls of the iterative solvers that are made
+    inside of a ``with`` block. Use :func:`collect` to make one.
+
+    Attributes:
+        - ``slowest (list of SolverCall)``: The slowest calls, slowest first
+        - ``failures (list of SolverCall)``: The first calls that did not
+          converge
+    """
+
+    def __init__(self, file=None, keep=10):
+        self.file = file
+        self.keep = int(keep)
+        self.failures = []
+        self._stats = {}
+        self._slowest = []
+        self._counter = itertools.count()
+        self._file = None
+
+    def __enter__(self):
+        if isinstance(self.file, str):
+            self._file = open(self.file, "a")
+        else:
+            self._file = self.file
+        _collectors.append(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        _collectors.remove(self)
+        if isinstance(self.file, str):
+            self._file.close()
+        self._file = None
+
+    def add(self, call):
+        """Add a solver call to the statistics."""
+        stats = self._stats.get(call.solver)
+        if stats is None:
+            stats = self._stats[call.solver] = _Stats()
+        stats.calls += 1
+        stats.time += call.time
+        stats.time_max = max(stats.time_max, call.time)
+        if np.isfinite(call.residual):
+            stats.residual_max = max(stats.residual_max, call.residual)
+        stats.iterations[call.iterations] += 1
+        stats.time_histogram[np.searchsorted(TIME_BINS, call.time)] += 1
+        if not call.converged:
+            stats.failures += 1
+            if len(self.failures) < self.keep:
+                self.failures.append(call)
+        # Keep the slowest calls in a heap, with a counter to break ties.
+        entry = (call.time, next(self._counter), call)
+        if len(self._slowest) < self.keep:
+            heapq.heappush(self._slowest, entry)
+        else:
+            heapq.heappushpop(self._slowest, entry)
+        if self._file is not None:
+            self._file.write(json.dumps(call._asdict()) + "\n")
+
+    @property
+    def slowest(self):
+        return [call for _, _, call in sorted(self._slowest, reverse=True)]
+
+    def summary(self):
+        """Return the statistics of the calls of each solver.
+
+        Returns:
+            - A dictionary from the name of each solver to its statistics
+              (SolverSummary)
+        """
+        return {
+            solver: SolverSummary(
+                stats.calls,
+                stats.failures,
+                stats.time,
+                stats.time_max,
+                stats.residual_max,
+                dict(sorted(stats.iterations.items())),
+                stats.time_histogram.copy(),
+            )
+            for solver, stats in self._stats.items()
+        }
+
+    def report(self):
+        """Return a table of the statistics of each solver (str)."""
+        lines = [
+            "{:<32} {:>8} {:>8} {:>10} {:>10} {:>8}".format(
+                "solver", "calls", "failed", "time (s)", "max (s)", "max it."
+            )
+        ]
+        for solver, stats in sorted(self.summary().items()):
+            lines.append(
+                "{:<32} {:>8} {:>8} {:>10.4f} {:>10.4f} {:>8}".format(
+                    solver,
+                    stats.calls,
+                    stats.failures,
+                    stats.time,
+                    stats.time_max,
+                    max(stats.iterations),
+                )
+            )
+        return "\n".join(lines)
+
+
+def collect(file=None, keep=10):
+    """Return a collector of the calls of the iterative solvers made inside
+    of a ``with`` block.
+
+    Collectors may be nested, and each records every call made while it
+    runs.
+
+    Args:
+        - ``file (str or file)``: Path of a file, which is appended to, or a
+          text file to write every call to as a line of JSON (optional,
+          defaults to not writing the calls)
+        - ``keep (int)``: Number of slowest calls, and of calls that did not
+          converge, to keep (optional, defaults to 10)
+
+    Returns:
+        - The collector (Telemetry)
+    """
+    return Telemetry(file, keep)
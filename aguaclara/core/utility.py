@@ -234,7 +234,7 @@ def list_handler():
             argsFirstSequence = None
             for num, arg in enumerate(args):  # args is a tuple
                 if isinstance(arg, u.Quantity):
-                    arg = arg.to_base_units().magnitude
+                    arg = arg.magnitude
                 if isinstance(arg, (list, tuple, np.ndarray)):
                     argsFirstSequence = num
                     break
@@ -242,7 +242,7 @@ def list_handler():
             kwargsFirstSequence = None
             for keyword, arg in kwargs.items():  # kwargs is a dictionary
                 if isinstance(arg, u.Quantity):
-                    arg = arg.to_base_units().magnitude
+                    arg = arg.magnitude
                 if isinstance(arg, (list, tuple, np.ndarray)):
                     kwargsFirstSequence = keyword
                     break
@@ -25,6 +25,20 @@ class CDC(Component):
         - ``q (float * u.L / u.s)``: Flow rate (required)
     """
 
+    OUTPUTS = (
+        "coag_q_max",
+        "coag_stock_vol",
+        "coag_sack_n",
+        "coag_stock_time_min",
+        "coag_stock_nu",
+        "coag_tubes_active_n",
+        "coag_tubes_n",
+        "coag_tube_operating_q_max",
+        "coag_tube_l",
+        "coag_tank_r",
+        "coag_tank_h",
+    )
+
     def __init__(self, **kwargs):
         self.hl = 20 * u.cm
         self.coag_type = "pacl"
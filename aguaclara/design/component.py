@@ -36,6 +36,64 @@ Otherwise, subcomponents will inherit the main component's ``q`` and ``temp``:
     >>> plant.filter.q
     40 liter / second
 
+The ``@property`` functions of a ``Component`` subclass are memoized: each is
+evaluated the first time that it is read, and read from a cache afterwards.
+While a property is evaluated, the attributes and properties that it reads,
+including those of other components, are recorded as its dependencies.
+Setting or deleting an attribute then invalidates every cached property that
+depends on it, directly or through other properties, so the next read
+re-evaluates only those properties. Setting an attribute to a value equal to its current one,
+with the same units, keeps the cache:
+
+.. code-block:: python
+
+    >>> floc = Flocculator()
+    >>> floc.chan_w
+    34 centimeter
+    >>> floc.cache_info()
+    CacheInfo(hits=7, misses=10, currsize=10)
+    >>> floc.hl = 50 * u.cm  # Invalidates vel_grad_avg, vol, chan_w, ...
+    >>> floc.cache_info()
+    CacheInfo(hits=7, misses=10, currsize=0)
+
+Changes made in place, such as appending to a list attribute, and changes to
+class attributes are not detected; call ``cache_clear()`` after them.
+
+Dependencies are recorded separately in each thread, so components may be
+designed in several threads at once, as long as each thread designs its own
+components.
+
+The recorded dependencies form a graph of the properties that have been
+evaluated, which ``dependency_graph()`` returns along with how long each
+property took to evaluate. ``DependencyGraph.to_dot()`` writes the graph in the
+DOT language of Graphviz.
+
+``with_()`` returns a variant of a component with some of its inputs
+overridden. The variant shares the rest of the inputs and the cached
+properties that don't depend on the overrides with the component, so only
+the affected properties are evaluated again:
+
+.. code-block:: python
+
+    >>> variant = floc.with_(chan_n_parity="any")
+    >>> variant.vel_grad_avg is floc.vel_grad_avg
+    True
+
+Each ``Component`` subclass declares its design outputs, the properties that
+describe its design, in its ``OUTPUTS`` tuple, and inherits those of its base
+classes. ``to_dict()`` returns the attributes and the declared outputs of a
+component as nested dictionaries of JSON types, with subcomponents nested as
+dictionaries of their own, and ``dump()`` writes them as JSON or MessagePack,
+one component at a time. Each output is evaluated once, so properties that
+are only steps in the design of others are evaluated no more than they need
+to be:
+
+.. code-block:: python
+
+    >>> floc = Flocculator()
+    >>> floc.to_dict()["outputs"]["chan_w"]
+    {'magnitude': 34, 'units': 'centimeter'}
+
 .. # TODO: update the a code example with the complete Onshape design flow.
 """
 
@@ -44,9 +102,242 @@ import aguaclara.core.utility as ut
 
 import numpy as np
 import json
+from collections import namedtuple
 from pprint import pprint
 from abc import ABC
 from urllib.parse import quote_plus
+import inspect
+import threading
+import time
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "currsize"])
+
+
+class _State(threading.local):
+    """The evaluation of memoized properties in a thread.
+
+    Attributes:
+        - ``evaluating (list)``: The memoized properties that are being
+          evaluated, innermost last, as (component, property name) pairs
+        - ``child_times (list)``: The time spent so far evaluating the
+          properties that each of them read (s)
+        - ``profiler (Profile)``: The profile that records property
+          evaluations, if any is running (see aguaclara.design.profiler)
+    """
+
+    def __init__(self):
+        self.evaluating = []
+        self.child_times = []
+        self.profiler = None
+
+
+_state = _State()
+
+
+class _Memo:
+    """The cached property values of one component, the properties of any
+    component that depend on each of its attributes, and cache statistics.
+    """
+
+    __slots__ = ("values", "dependents", "costs", "hits", "misses")
+
+    def __init__(self):
+        self.values = {}
+        self.dependents = {}
+        # Number of evaluations, total time and time excluding the
+        # evaluation of other properties, for each property.
+        self.costs = {}
+        self.hits = 0
+        self.misses = 0
+
+
+def _memo(component):
+    """Return the memo of a component, creating it if needed."""
+    dict_ = object.__getattribute__(component, "__dict__")
+    memo = dict_.get("_memo")
+    if memo is None:
+        memo = dict_["_memo"] = _Memo()
+    return memo
+
+
+def _invalidate(component, name):
+    """Remove every cached property that depends on the attribute ``name``
+    of ``component``, directly or through other properties.
+    """
+    stack = [(component, name)]
+    while stack:
+        component, name = stack.pop()
+        for dependent in _memo(component).dependents.pop(name, ()):
+            _memo(dependent[0]).values.pop(dependent[1], None)
+            stack.append(dependent)
+
+
+# The value of an attribute that has not been set on a component
+_MISSING = object()
+
+
+def _same(old, new):
+    """Return whether two values of an attribute are equal and have the same
+    units, so that setting one in place of the other changes nothing.
+    """
+    if old is new:
+        return True
+    if type(old) is not type(new):
+        return False
+    if isinstance(old, u.Quantity):
+        if old.units != new.units:
+            return False
+        old, new = old.magnitude, new.magnitude
+    try:
+        return bool(np.array_equal(old, new))
+    except Exception:
+        return False
+
+
+class _MemoizedProperty(property):
+    """A ``property`` whose value is cached by the component that it belongs
+    to until an attribute that it depends on changes.
+    """
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, component, owner=None):
+        if component is None:
+            return self
+        memo = _memo(component)
+        try:
+            value = memo.values[self.name]
+        except KeyError:
+            pass
+        else:
+            memo.hits += 1
+            return value
+        memo.misses += 1
+        state = _state
+        profiler = state.profiler
+        if profiler is not None:
+            profiler.enter(type(component).__name__ + "." + self.name)
+        start = time.perf_counter()
+        state.evaluating.append((component, self.name))
+        state.child_times.append(0.0)
+        try:
+            value = self.fget(component)
+        finally:
+            if profiler is not None:
+                profiler.exit()
+            state.evaluating.pop()
+            child_time = state.child_times.pop()
+            elapsed = time.perf_counter() - start
+            if state.child_times:
+                state.child_times[-1] += elapsed
+            cost = memo.costs.setdefault(self.name, [0, 0.0, 0.0])
+            cost[0] += 1
+            cost[1] += elapsed
+            cost[2] += elapsed - child_time
+        memo.values[self.name] = value
+        return value
+
+
+class DependencyGraph:
+    """The dependencies between the attributes and evaluated properties of a
+    component and its subcomponents.
+
+    Nodes are named by their path from the component, such as ``chan_w`` or
+    ``floc.chan_w``. Edges point from an attribute or property to the
+    properties that read it.
+
+    Attributes:
+        - ``nodes (dict)``: For each node, a dictionary with its ``kind``
+          ("input" or "property") and, for properties, the number of
+          ``evaluations``, the total evaluation ``time`` (s) and the
+          ``self_time`` (s), which excludes the evaluation of the properties
+          that it read
+        - ``edges (set of tuples)``: The (dependency, dependent) pairs
+    """
+
+    def __init__(self, nodes, edges):
+        self.nodes = nodes
+        self.edges = edges
+
+    def dependents(self, name):
+        """Return every node that depends on a node, directly or through
+        other nodes.
+
+        Args:
+            - ``name (str)``: Name of the node
+        """
+        children = {}
+        for source, target in self.edges:
+            children.setdefault(source, []).append(target)
+        found = set()
+        stack = [name]
+        while stack:
+            for child in children.get(stack.pop(), []):
+                if child not in found:
+                    found.add(child)
+                    stack.append(child)
+        return found
+
+    def costliest(self, n=10):
+        """Return the names of the properties with the longest self time,
+        longest first.
+
+        Args:
+            - ``n (int)``: Number of properties (optional, defaults to 10)
+        """
+        properties = [
+            name for name, node in self.nodes.items() if node["kind"] == "property"
+        ]
+        properties.sort(key=lambda name: self.nodes[name]["self_time"], reverse=True)
+        return properties[:n]
+
+    def to_dot(self):
+        """Return the graph in the DOT language. Inputs are drawn as boxes,
+        and properties are labeled with their self time.
+        """
+        lines = ["digraph dependencies {", "    rankdir=LR;"]
+        for name, node in sorted(self.nodes.items()):
+            if node["kind"] == "input":
+                lines.append('    "{}" [shape=box];'.format(name))
+            else:
+                lines.append(
+                    '    "{}" [label="{}\\n{:.3g} ms"];'.format(
+                        name, name, node["self_time"] * 1e3
+                    )
+                )
+        for source, target in sorted(self.edges):
+            lines.append('    "{}" -> "{}";'.format(source, target))
+        lines.append("}")
+        return "\n".join(lines)
+
+
+def _encode(value):
+    """Return a value as JSON types: quantities as dictionaries of their
+    magnitude and units, arrays as lists and named tuples as dictionaries.
+    """
+    if isinstance(value, Component):
+        return value.to_dict()
+    if isinstance(value, u.Quantity):
+        return {"magnitude": _encode(value.magnitude), "units": str(value.units)}
+    if isinstance(value, np.ndarray):
+        return [_encode(item) for item in value.tolist()]
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, tuple) and hasattr(value, "_fields"):
+        return {field: _encode(item) for field, item in zip(value._fields, value)}
+    if isinstance(value, (list, tuple)):
+        return [_encode(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): _encode(item) for key, item in value.items()}
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
 
 
 class Component(ABC):
@@ -61,6 +352,35 @@ class Component(ABC):
     TEMP_DEFAULT = 20 * u.degC
     onshape_url_default = ""
 
+    #: The names of the properties that describe the design of the component.
+    #: Subclasses add theirs to those of their base classes.
+    OUTPUTS = ()
+    _outputs = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        outputs = []
+        for base in reversed(cls.__mro__):
+            outputs.extend(vars(base).get("OUTPUTS", ()))
+        cls._outputs = tuple(dict.fromkeys(outputs))
+        for name in cls._outputs:
+            if not isinstance(getattr(cls, name, None), property):
+                raise TypeError(
+                    "{} declares the output {}, which is not a property.".format(
+                        cls.__name__, name
+                    )
+                )
+        # Memoize the read-only properties that take no arguments.
+        for name, value in list(vars(cls).items()):
+            if (
+                type(value) is property
+                and value.fset is None
+                and len(inspect.signature(value.fget).parameters) == 1
+            ):
+                memoized = _MemoizedProperty(value.fget, doc=value.__doc__)
+                memoized.__set_name__(cls, name)
+                setattr(cls, name, memoized)
+
     def __init__(self, **kwargs):
         self.q = self.Q_DEFAULT
         self.temp = self.TEMP_DEFAULT
@@ -68,6 +388,220 @@ class Component(ABC):
         # Update the Component with new expert inputs, if any were given
         self.__dict__.update(**kwargs)
 
+    def __getattribute__(self, name):
+        # Record the attribute as a dependency of the property, if any, that
+        # is being evaluated.
+        evaluating = _state.evaluating
+        if evaluating:
+            _memo(self).dependents.setdefault(name, set()).add(evaluating[-1])
+        return object.__getattribute__(self, name)
+
+    def __setattr__(self, name, value):
+        old = self.__dict__.get(name, _MISSING)
+        super().__setattr__(name, value)
+        memo = self.__dict__.get("_memo")
+        if memo is not None and name in memo.dependents and not _same(old, value):
+            _invalidate(self, name)
+
+    def __delattr__(self, name):
+        super().__delattr__(name)
+        memo = self.__dict__.get("_memo")
+        if memo is not None and name in memo.dependents:
+            _invalidate(self, name)
+
+    def _design(self):
+        """Design the subcomponents of this component from its inputs.
+
+        Subclasses that design their subcomponents override this method and
+        call it at the end of ``__init__()``. ``with_()`` calls it again after
+        setting the overrides of a variant.
+        """
+
+    def with_(self, **overrides):
+        """Return a variant of this component with some inputs overridden.
+
+        The variant is designed as if it were instantiated with the inputs of
+        this component and the overrides, but without instantiating its
+        subcomponents and evaluating its properties again. It shares the
+        values of the attributes that aren't overridden, and the cached
+        properties that don't depend on the overrides, with this component.
+        Only the properties that depend on the overrides are evaluated again
+        when they are read. Overriding ``q`` or ``temp`` also sets them for
+        the subcomponents that have the same value as this component, as
+        ``set_subcomponents()`` does. Designs that iterate, such as that of
+        ``EntTankFloc``, start from the same initial guess as this component.
+
+        Changing the variant, or this component, afterwards does not affect
+        the other, except for changes made in place to shared attribute
+        values.
+
+        Args:
+            - ``**overrides``: The inputs to change, such as ``hl=50 * u.cm``
+
+        Returns:
+            - The variant (the same class as this component)
+        """
+        variant = self._copy()
+        for name, value in overrides.items():
+            old = variant.__dict__.get(name, _MISSING)
+            setattr(variant, name, value)
+            if name in ("q", "temp"):
+                variant._propagate(name, old, value)
+        variant._design()
+        return variant
+
+    def _propagate(self, name, old, value):
+        """Set ``q`` or ``temp`` for the subcomponents that had the same value
+        as this component.
+        """
+        for subcomponent in getattr(self, "subcomponents", []):
+            if _same(subcomponent.__dict__.get(name, _MISSING), old):
+                setattr(subcomponent, name, value)
+                subcomponent._propagate(name, old, value)
+
+    def _copy(self):
+        """Return a copy of this component and the components that it holds,
+        with their caches and dependencies, sharing their attribute values.
+        """
+        # Copy every component that can be reached from this one, once.
+        originals = {}
+        copies = {}
+        stack = [self]
+        while stack:
+            component = stack.pop()
+            if id(component) in copies:
+                continue
+            originals[id(component)] = component
+            copies[id(component)] = object.__new__(type(component))
+            for value in vars(component).values():
+                values = value if isinstance(value, (list, tuple)) else [value]
+                stack.extend(item for item in values if isinstance(item, Component))
+
+        def remap(value):
+            if isinstance(value, Component):
+                return copies[id(value)]
+            if isinstance(value, (list, tuple)) and any(
+                isinstance(item, Component) for item in value
+            ):
+                return type(value)(remap(item) for item in value)
+            return value
+
+        for key, original in originals.items():
+            copy = copies[key]
+            memo = _memo(original)
+            copy_memo = _Memo()
+            copy_memo.values = dict(memo.values)
+            copy_memo.costs = {name: list(cost) for name, cost in memo.costs.items()}
+            # Dependents outside of the copied components depend on the
+            # original, not the copy.
+            copy_memo.dependents = {
+                name: {
+                    (copies[id(component)], dependent)
+                    for component, dependent in dependents
+                    if id(component) in copies
+                }
+                for name, dependents in memo.dependents.items()
+            }
+            dict_ = object.__getattribute__(copy, "__dict__")
+            for name, value in object.__getattribute__(original, "__dict__").items():
+                dict_[name] = remap(value)
+            dict_["_memo"] = copy_memo
+        return copies[id(self)]
+
+    def cache_info(self):
+        """Return the number of cache hits and misses of the memoized
+        properties of this component, and the number of cached properties.
+        """
+        memo = _memo(self)
+        return CacheInfo(memo.hits, memo.misses, len(memo.values))
+
+    def dependency_graph(self):
+        """Return the dependencies between the attributes and properties of
+        this component and its subcomponents that have been traced so far.
+
+        Dependencies are traced as properties are evaluated, so the graph
+        only contains properties that have been read since they were last
+        invalidated.
+
+        Returns:
+            - The dependency graph (DependencyGraph)
+        """
+        # Name the components reachable from this one by their paths.
+        names = {id(self): ""}
+        stack = [self]
+        while stack:
+            component = stack.pop()
+            prefix = names[id(component)]
+            items = object.__getattribute__(component, "__dict__").items()
+            # Prefer the name of an attribute to a position in a list.
+            for attr, value in sorted(
+                items, key=lambda item: isinstance(item[1], (list, tuple))
+            ):
+                values = value if isinstance(value, (list, tuple)) else [value]
+                for item in values:
+                    if isinstance(item, Component) and id(item) not in names:
+                        names[id(item)] = prefix + attr + "."
+                        stack.append(item)
+
+        def node_name(component, attr):
+            if id(component) not in names:
+                names[id(component)] = "{}@{:x}.".format(
+                    type(component).__name__, id(component)
+                )
+            return names[id(component)] + attr
+
+        nodes = {}
+        edges = set()
+        stack = [self]
+        seen = set()
+        while stack:
+            component = stack.pop()
+            if id(component) in seen:
+                continue
+            seen.add(id(component))
+            memo = _memo(component)
+            for attr, (evaluations, total, self_time) in memo.costs.items():
+                if attr in memo.values:
+                    nodes[node_name(component, attr)] = {
+                        "kind": "property",
+                        "evaluations": evaluations,
+                        "time": total,
+                        "self_time": self_time,
+                    }
+            for attr, dependents in memo.dependents.items():
+                value = inspect.getattr_static(component, attr, None)
+                # Leave out methods and the attributes that hold other
+                # components, which are only read to reach their attributes.
+                if attr.startswith("__") or (
+                    not isinstance(value, _MemoizedProperty)
+                    and (callable(value) or isinstance(value, (Component, list)))
+                ):
+                    continue
+                for dependent, name in dependents:
+                    # Skip dependents that have been invalidated since.
+                    if name in _memo(dependent).values:
+                        edges.add(
+                            (node_name(component, attr), node_name(dependent, name))
+                        )
+                        stack.append(dependent)
+            for value in object.__getattribute__(component, "__dict__").values():
+                values = value if isinstance(value, (list, tuple)) else [value]
+                stack.extend(item for item in values if isinstance(item, Component))
+        for source, _ in edges:
+            nodes.setdefault(source, {"kind": "input"})
+        return DependencyGraph(nodes, edges)
+
+    def cache_clear(self):
+        """Clear the cached properties of this component and its
+        subcomponents.
+        """
+        memo = _memo(self)
+        for name in list(memo.values):
+            _invalidate(self, name)
+        memo.values.clear()
+        for subcomponent in getattr(self, "subcomponents", []):
+            subcomponent.cache_clear()
+
     def set_subcomponents(self):
         """Set the plant-wide inputs of all subcomponents.
 
@@ -87,48 +621,154 @@ class Component(ABC):
             if hasattr(subcomp, "subcomponents"):
                 subcomp.set_subcomponents()
 
-    def serialize_properties(self):
-        """Return the properties (fields and ``@property`` functions) of a
-        component as a dictionary string.
+    def _attributes(self):
+        """Return the names and values of the public attributes of this
+        component, leaving out methods and the list of its subcomponents.
         """
-        properties = {}
-        ignored_properties = [
-            "__dict__",
-            "__doc__",
-            "__module__",
-            "__weakref__",
-            "subcomponents",
-            "Q_DEFAULT",
-            "TEMP_DEFAULT",
-            "__abstractmethods__",
-            "_abc_cache",
-            "_abc_negative_cache",
-            "_abc_negative_cache_version",
-            "_abc_registry",
-            "onshape_config",
+        return [
+            (name, value)
+            for name, value in vars(self).items()
+            if not name.startswith("_")
+            and name != "subcomponents"
+            and not callable(value)
         ]
-        # Get all of the object's fields
-        for var_name in dir(self):
-            value = getattr(self, var_name)
 
-            # Serialize subcomponents to strings so that they are accessible by
-            # Onshape's Super Derive feature
-            if isinstance(value, Component):
-                properties[var_name] = str(value.serialize_properties())
+    def _sections(self, path):
+        """Mark this component as being serialized, and return its sections
+        when serialized: their names, numbers of items and iterators of the
+        names and values of the items.
+
+        Outputs come first and are evaluated as they are read. Attributes are
+        read after them, since evaluating a property may set an attribute.
+
+        Args:
+            - ``path (set)``: The ids of the components that are being
+              serialized and contain this one
+        """
+        if id(self) in path:
+            raise ValueError(
+                "The {} contains itself, so it can't be serialized.".format(
+                    type(self).__name__
+                )
+            )
+        path.add(id(self))
+        yield "outputs", len(self._outputs), (
+            (name, getattr(self, name)) for name in self._outputs
+        )
+        attributes = self._attributes()
+        yield "inputs", len(attributes), iter(attributes)
+
+    def to_dict(self):
+        """Return the attributes and declared outputs of this component as
+        JSON types.
 
-            # Serialize non-component properties
-            elif not callable(value) and var_name not in ignored_properties:
+        Quantities become dictionaries of their ``magnitude`` and ``units``,
+        arrays become lists and subcomponents are nested as dictionaries of
+        their own.
 
-                # Serialize lists or arrays
-                try:
-                    if type(value.magnitude) is np.ndarray:
-                        properties[var_name] = ut.array_qtys_to_strs(value)
-                    else:
-                        properties[var_name] = str(value)
+        Returns:
+            - A dictionary with the ``type`` (the name of the class) of the
+              component, its ``outputs`` (the properties named in
+              ``OUTPUTS``) and its ``inputs`` (the public attributes)
+        """
+        return self._to_dict(set())
+
+    def _to_dict(self, path):
+        result = {"type": type(self).__name__}
+        for section, _, items in self._sections(path):
+            result[section] = {
+                name: (
+                    value._to_dict(path)
+                    if isinstance(value, Component)
+                    else _encode(value)
+                )
+                for name, value in items
+            }
+        path.discard(id(self))
+        return result
+
+    def dump(self, file=None, format="json"):
+        """Write the attributes and declared outputs of this component, as
+        returned by ``to_dict()``, as JSON or MessagePack.
+
+        The component is written as it is serialized, one attribute or output
+        at a time, so a plant is never held in memory in full.
+
+        Args:
+            - ``file (file)``: Text file for JSON, or binary file for
+              MessagePack, to write to (optional, defaults to returning the
+              serialized component)
+            - ``format (str)``: "json" or "msgpack" (optional, defaults to
+              "json"). MessagePack requires the msgpack package.
+
+        Returns:
+            - The serialized component (str for JSON, bytes for MessagePack)
+              if no file is given, else None
+        """
+        if format not in ("json", "msgpack"):
+            raise ValueError(
+                'format is {} but must be "json" or "msgpack".'.format(format)
+            )
+        if format == "msgpack" and msgpack is None:
+            raise ImportError("Dumping to MessagePack requires the msgpack package.")
+        chunks = []
+        write = chunks.append if file is None else file.write
+        if format == "json":
+            self._dump_json(write, set())
+        else:
+            self._dump_msgpack(write, msgpack.Packer(), set())
+        if file is None:
+            return "".join(chunks) if format == "json" else b"".join(chunks)
+
+    def _dump_json(self, write, path):
+        write('{"type": ' + json.dumps(type(self).__name__))
+        for section, _, items in self._sections(path):
+            write(", " + json.dumps(section) + ": {")
+            for i, (name, value) in enumerate(items):
+                write((", " if i else "") + json.dumps(name) + ": ")
+                if isinstance(value, Component):
+                    value._dump_json(write, path)
+                else:
+                    write(json.dumps(_encode(value)))
+            write("}")
+        write("}")
+        path.discard(id(self))
+
+    def _dump_msgpack(self, write, packer, path):
+        write(packer.pack_map_header(3))
+        write(packer.pack("type"))
+        write(packer.pack(type(self).__name__))
+        for section, n, items in self._sections(path):
+            write(packer.pack(section))
+            write(packer.pack_map_header(n))
+            for name, value in items:
+                write(packer.pack(name))
+                if isinstance(value, Component):
+                    value._dump_msgpack(write, packer, path)
+                else:
+                    write(packer.pack(_encode(value)))
+        path.discard(id(self))
+
+    def serialize_properties(self):
+        """Return the attributes and declared outputs of a component as a
+        dictionary of strings.
+
+        Subcomponents are serialized to strings so that they are accessible
+        by Onshape's Super Derive feature. Use ``to_dict()`` or ``dump()`` for
+        structured values.
+        """
+        properties = {}
+        items = [(name, getattr(self, name)) for name in self._outputs]
+        items += self._attributes()
+        for var_name, value in sorted(items, key=lambda item: item[0]):
+            if isinstance(value, Component):
+                properties[var_name] = str(value.serialize_properties())
 
-                # Serialize non-iterable properties
-                except AttributeError:
-                    properties[var_name] = str(value)
+            # Serialize lists or arrays
+            elif isinstance(getattr(value, "magnitude", None), np.ndarray):
+                properties[var_name] = ut.array_qtys_to_strs(value)
+            else:
+                properties[var_name] = str(value)
 
         return properties
 
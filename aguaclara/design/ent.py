@@ -60,6 +60,8 @@ class EntranceTank(Component):
           defaults to 41)
     """
 
+    OUTPUTS = ("plate_n", "plate_l", "l")
+
     def __init__(self, **kwargs):
         self.lfom_nd = (
             2.0 * u.inch
@@ -77,6 +79,9 @@ class EntranceTank(Component):
         self.subcomponents = [self.drain_pipe]
 
         super().__init__(**kwargs)
+        self._design()
+
+    def _design(self):
         self._set_drain_pipe()
         super().set_subcomponents()
 
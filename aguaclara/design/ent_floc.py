@@ -15,9 +15,8 @@ from aguaclara.design.component import Component
 from aguaclara.design.ent import EntranceTank
 from aguaclara.design.floc import Flocculator
 from aguaclara.design.lfom import LFOM
-from aguaclara.core.units import u
-
-import numpy as np
+from aguaclara.core.solvers import fixed_point
+from aguaclara.core.units import u  # noqa: F401
 
 
 class EntTankFloc(Component):
@@ -40,8 +39,17 @@ class EntTankFloc(Component):
           defaults)
         - ``lfom (LFOM)``: Linear Flow Orifice Meter
           (optional, see :class:`aguaclara.design.lfom.LFOM` for defaults)
+
+    Attributes:
+        - ``ENT_FLOC_MAXITER (int)``: Maximum number of redesigns of the
+          entrance tank and flocculator
+        - ``ent_floc_convergence (FixedPointResult)``: How the designs of
+          the entrance tank and flocculator converged (see
+          :func:`aguaclara.core.solvers.fixed_point`)
     """
 
+    ENT_FLOC_MAXITER = 20
+
     def __init__(self, **kwargs):
         self.ent = EntranceTank()
         self.floc = Flocculator()
@@ -49,29 +57,46 @@ class EntTankFloc(Component):
         self.subcomponents = [self.ent, self.floc, self.lfom]
 
         super().__init__(**kwargs)
+        # The design converges to different lengths from different guesses,
+        # so variants made by with_() start from the same guess.
+        self._ent_l_guess = self.floc.ent_l
+        self._design()
+
+    def _design(self):
         super().set_subcomponents()
+        self._design_ent_floc(self._ent_l_guess)
 
-        self._design_ent_floc(self.floc.ent_l)
+    @property
+    def ent_floc_convergence(self):
+        """How the designs of the entrance tank and flocculator converged."""
+        return self._ent_floc_convergence
 
     def _design_ent_floc(self, ent_l):
         """Design the entrance tank and flocculator in tandem.
 
         Each subcomponent is redesigned until the expected length of the
-        entrance tank (used to design the flocculator) is close enough to the
+        entrance tank (used to design the flocculator) is within 1% of the
         actual length of the entrance tank (which should accomodate the
-        flocculator's channel width).
+        flocculator's channel width). The iterations are recorded in
+        ``ent_floc_convergence``.
 
         Args:
             - ``ent_l (float * u.m)``: The initial guess for the entrance tank
               length, used to design the first iteration of the flocculator.
         """
-        # Design the flocculator using a guess of the entrance tank's length.
-        self.floc.ent_l = ent_l
 
-        # Design the entrance tank using the flocculator's channel width.
-        self.ent.floc_chan_w = self.floc.chan_w
+        def redesign(ent_l):
+            # Design the flocculator using a guess of the entrance tank's
+            # length, then the entrance tank using the flocculator's channel
+            # width.
+            self.floc.ent_l = ent_l
+            self.ent.floc_chan_w = self.floc.chan_w
+            return self.ent.l
 
-        # Recalculate if the actual length of the entrance tank is not close
-        # enough.
-        if np.abs(self.ent.l.to(u.m) - ent_l) / self.ent.l > 0.01:
-            self._design_ent_floc(self.ent.l)
+        self._ent_floc_convergence = fixed_point(
+            redesign,
+            ent_l,
+            rtol=0.01,
+            maxiter=self.ENT_FLOC_MAXITER,
+            name="EntTankFloc._design_ent_floc",
+        )
@@ -0,0 +1,300 @@
+"""Export the designs of many components to a columnar file.
+
+:func:`export` writes one row per component, with one column for every
+declared output and attribute of the component and its subcomponents, as
+returned by ``Component.to_dict()``. Columns are named by their path, such as
+``chan_w`` or ``drain_pipe.size``. Quantities are stored as magnitudes, and
+the units of every column are stored with the file. The components are
+designed and written a chunk at a time, so the memory that an export takes
+does not grow with the number of components.
+
+Parquet and Feather files require the pyarrow package. CSV files do not, and
+their units are written in the header, as in ``chan_w [centimeter]``.
+:func:`read_designs` reads a file of any of the formats back into a table.
+
+Example:
+    >>> import os
+    >>> import tempfile
+    >>> from aguaclara.core.units import u
+    >>> from aguaclara.design.export import export, read_designs
+    >>> from aguaclara.design.floc import Flocculator
+    >>> path = os.path.join(tempfile.mkdtemp(), "flocs.csv")
+    >>> export((Flocculator(q=q * u.L / u.s) for q in [20, 60]), path)
+    2
+    >>> table = read_designs(path)
+    >>> table["chan_w"].tolist()
+    [34, 101]
+    >>> table.attrs["units"]["chan_w"]
+    'centimeter'
+"""
+
+from aguaclara.core.units import u
+
+import itertools
+import json
+import os
+import re
+import warnings
+
+import pandas as pd
+
+try:
+    import pyarrow
+    import pyarrow.feather
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+FORMATS = ("parquet", "feather", "csv")
+
+_EXTENSIONS = {
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".feather": "feather",
+    ".arrow": "feather",
+    ".csv": "csv",
+}
+
+# The key of the units of the columns in the metadata of Arrow schemas
+_UNITS_KEY = b"aguaclara.units"
+
+# The header of a CSV column with units, such as "chan_w [centimeter]"
+_CSV_HEADER = re.compile(r"^(.*) \[(.*)\]$")
+
+
+def _format(path, format):
+    """Return the format of a file, from its extension if it isn't given.
+    Files with other extensions are Parquet files if pyarrow is installed,
+    and CSV files otherwise.
+    """
+    if format is None:
+        extension = os.path.splitext(str(path))[1].lower()
+        format = _EXTENSIONS.get(extension, "csv" if pyarrow is None else "parquet")
+    if format not in FORMATS:
+        raise ValueError("format is {} but must be one of {}.".format(format, FORMATS))
+    if format != "csv" and pyarrow is None:
+        raise ImportError(
+            "Exporting to {} requires the pyarrow package.".format(format)
+        )
+    return format
+
+
+def _flatten_component(data, prefix, row):
+    """Add the outputs and inputs of a component, as returned by
+    ``Component.to_dict()``, to a row of (value, units) pairs.
+    """
+    row[prefix + "type"] = (data["type"], None)
+    for section in ("outputs", "inputs"):
+        for name, value in data[section].items():
+            _flatten_value(value, prefix + name, row)
+
+
+def _flatten_value(value, name, row):
+    if isinstance(value, dict):
+        if set(value) == {"type", "outputs", "inputs"}:
+            _flatten_component(value, name + ".", row)
+        elif set(value) == {"magnitude", "units"}:
+            row[name] = (_cell(value["magnitude"]), value["units"])
+        else:
+            for key, item in value.items():
+                _flatten_value(item, name + "." + key, row)
+    else:
+        row[name] = (_cell(value), None)
+
+
+def _cell(value):
+    """Return a value that fits in a cell, storing lists as JSON."""
+    return json.dumps(value) if isinstance(value, list) else value
+
+
+def flatten(component):
+    """Return the outputs and attributes of a component and its
+    subcomponents as a flat dictionary.
+
+    Args:
+        - ``component (Component)``: The component
+
+    Returns:
+        - A dictionary from the path of each output and attribute to a pair
+          of its value and its units (str), or None if it has no units. Lists
+          and arrays are stored as JSON strings.
+    """
+    row = {}
+    _flatten_component(component.to_dict(), "", row)
+    return row
+
+
+def _frame(rows, names, units, dropped):
+    """Return a chunk of flattened rows as a table with the given columns,
+    converting quantities to the units of their columns.
+    """
+    columns = {name: [] for name in names}
+    for row in rows:
+        dropped.update(name for name in row if name not in columns)
+        for name, column in columns.items():
+            value, value_units = row.get(name, (None, None))
+            if value_units is not None and value_units != units[name]:
+                if units[name] is None:
+                    raise ValueError(
+                        "{} has units in some designs but not in others.".format(name)
+                    )
+                value = u.Quantity(value, value_units).m_as(units[name])
+            column.append(value)
+    return pd.DataFrame(columns)
+
+
+class _CSVWriter:
+    def __init__(self, path, frame, units):
+        self.file = open(path, "w", newline="")
+        header = [
+            name if units[name] is None else "{} [{}]".format(name, units[name])
+            for name in frame.columns
+        ]
+        frame.to_csv(self.file, header=header, index=False)
+
+    def write(self, frame):
+        frame.to_csv(self.file, header=False, index=False)
+
+    def close(self):
+        self.file.close()
+
+
+class _ArrowWriter:
+    """Write chunks to a Parquet or Feather file, with the schema of the
+    first chunk. Integer columns are stored as floats, and columns without
+    any value in the first chunk as strings, so that later chunks with
+    missing values or values in those columns fit the schema.
+    """
+
+    def __init__(self, path, frame, units, format):
+        schema = pyarrow.Schema.from_pandas(frame, preserve_index=False)
+        for i, field in enumerate(schema):
+            if pyarrow.types.is_integer(field.type):
+                schema = schema.set(i, field.with_type(pyarrow.float64()))
+            elif pyarrow.types.is_null(field.type):
+                schema = schema.set(i, field.with_type(pyarrow.string()))
+        metadata = dict(schema.metadata or {})
+        metadata[_UNITS_KEY] = json.dumps(units).encode()
+        self.schema = schema.with_metadata(metadata)
+        if format == "parquet":
+            self.writer = pyarrow.parquet.ParquetWriter(path, self.schema)
+        else:
+            self.writer = pyarrow.ipc.new_file(path, self.schema)
+        self.write(frame)
+
+    def write(self, frame):
+        self.writer.write_table(
+            pyarrow.Table.from_pandas(frame, schema=self.schema, preserve_index=False)
+        )
+
+    def close(self):
+        self.writer.close()
+
+
+def export(components, path, format=None, chunksize=1000, columns=None):
+    """Write the outputs and attributes of many components to a file, one
+    row per component.
+
+    The components are read from the iterable, flattened and written a chunk
+    at a time, so an iterable that designs the components as it is read,
+    such as a generator, keeps at most one chunk of them in memory. The
+    columns are those of the first chunk, unless they are given. Columns that
+    only later components have are left out, with a warning.
+
+    Args:
+        - ``components (iterable of Components)``: The components to write
+        - ``path (str)``: Path of the file, which is overwritten
+        - ``format (str)``: "parquet", "feather" or "csv" (optional, defaults
+          to the extension of ``path``, or to "parquet" if pyarrow is
+          installed and "csv" otherwise)
+        - ``chunksize (int)``: Number of components to write at a time
+          (optional, defaults to 1000)
+        - ``columns (list of str)``: Paths of the outputs and attributes to
+          write, such as ``"drain_pipe.size"`` (optional, defaults to those
+          of the first chunk)
+
+    Returns:
+        - The number of components written (int). No file is written if
+          there are none.
+    """
+    format = _format(path, format)
+    if chunksize < 1:
+        raise ValueError("chunksize is {} but must be at least 1.".format(chunksize))
+    components = iter(components)
+    writer = None
+    names = None
+    units = {}
+    dropped = set()
+    count = 0
+    try:
+        while True:
+            rows = [flatten(c) for c in itertools.islice(components, chunksize)]
+            if not rows:
+                break
+            if names is None:
+                names = list(
+                    dict.fromkeys(columns or (name for row in rows for name in row))
+                )
+                for name in names:
+                    units[name] = next(
+                        (row[name][1] for row in rows if name in row), None
+                    )
+            frame = _frame(rows, names, units, dropped)
+            if writer is None:
+                if format == "csv":
+                    writer = _CSVWriter(path, frame, units)
+                else:
+                    writer = _ArrowWriter(path, frame, units, format)
+            else:
+                writer.write(frame)
+            count += len(rows)
+    finally:
+        if writer is not None:
+            writer.close()
+    if dropped and columns is None:
+        warnings.warn(
+            "The columns {} were left out, since the first {} components do "
+            "not have them. Name them in columns to write them.".format(
+                sorted(dropped), chunksize
+            ),
+            UserWarning,
+        )
+    return count
+
+
+def read_designs(path, format=None):
+    """Read a file that was written by :func:`export`.
+
+    Args:
+        - ``path (str)``: Path of the file
+        - ``format (str)``: "parquet", "feather" or "csv" (optional, defaults
+          to the extension of ``path``)
+
+    Returns:
+        - A ``pandas.DataFrame`` with one row per component.
+          ``DataFrame.attrs["units"]`` maps the columns with units to their
+          units.
+    """
+    format = _format(path, format)
+    if format == "csv":
+        table = pd.read_csv(path)
+        units = {}
+        names = []
+        for header in table.columns:
+            match = _CSV_HEADER.match(header)
+            names.append(match.group(1) if match else header)
+            if match:
+                units[match.group(1)] = match.group(2)
+        table.columns = names
+    else:
+        if format == "parquet":
+            arrow_table = pyarrow.parquet.read_table(path)
+        else:
+            arrow_table = pyarrow.feather.read_table(path)
+        units = json.loads((arrow_table.schema.metadata or {}).get(_UNITS_KEY, b"{}"))
+        table = arrow_table.to_pandas()
+    table.attrs["units"] = {
+        name: column_units for name, column_units in units.items() if column_units
+    }
+    return table
@@ -6,6 +6,13 @@ Example:
     >>> floc = Flocculator(q = 20 * u.L / u.s, hl = 40 * u.cm)
     >>> round(floc.chan_w)
     <Quantity(34, 'centimeter')>
+
+Many flocculators can be designed at once with :class:`FlocculatorBatch`,
+whose design inputs may be arrays:
+
+    >>> floc = FlocculatorBatch(q = [20, 60] * u.L / u.s, hl = 40 * u.cm)
+    >>> floc.chan_w
+    <Quantity([ 34. 101.], 'centimeter')>
 """
 
 import aguaclara.core.head_loss as hl
@@ -19,6 +26,26 @@ from aguaclara.design.pipeline import Pipe
 import numpy as np
 from urllib.parse import quote_plus
 
+_DRAIN_K_MINOR = (
+    hl.PIPE_ENTRANCE_K_MINOR + hl.PIPE_ENTRANCE_K_MINOR + hl.PIPE_EXIT_K_MINOR
+)
+
+
+def _viscosity_kinematic_water(temp):
+    """Return the kinematic viscosity of water at a temperature, or an array
+    of temperatures.
+
+    ``physchem.viscosity_kinematic_water`` evaluates arrays one element at a
+    time, so for an array it is evaluated once per distinct temperature.
+    """
+    if np.ndim(temp.magnitude) == 0:
+        return pc.viscosity_kinematic_water(temp)
+    unique, inverse = np.unique(temp.magnitude, return_inverse=True)
+    values = [pc.viscosity_kinematic_water(u.Quantity(t, temp.units)) for t in unique]
+    units = values[0].units
+    magnitudes = np.array([value.m_as(units) for value in values])
+    return u.Quantity(magnitudes[inverse].reshape(temp.shape), units)
+
 
 class Flocculator(Component):
     """Design an AguaClara plant's flocculator.
@@ -72,6 +99,22 @@ class Flocculator(Component):
 
     _onshape_url = "https://cad.onshape.com/documents/c3a8ce032e33ebe875b9aab4/w/de9ad5474448b34f33fef097/e/08f41d8bdd9a9c90ab396f8a"  # noqa: E501
 
+    OUTPUTS = (
+        "vel_grad_avg",
+        "retention_time",
+        "vol",
+        "chan_n",
+        "chan_w",
+        "chan_l",
+        "expansion_h_max",
+        "expansion_n",
+        "expansion_h",
+        "baffle_s",
+        "obstacle_n",
+        "contraction_s",
+        "obstacle_pipe_od",
+    )
+
     def __init__(self, **kwargs):
         self.ent_l = 1.5 * u.m
         self.chan_w_max = 42.0 * u.inch
@@ -89,7 +132,9 @@ class Flocculator(Component):
         self.chan_n_parity = "even"
 
         super().__init__(**kwargs)
+        self._design()
 
+    def _design(self):
         self._set_drain_pipe()
         super().set_subcomponents()
 
@@ -103,7 +148,7 @@ class Flocculator(Component):
         """The average velocity gradient of water."""
         vel_grad_avg = (
             (u.standard_gravity * self.hl)
-            / (pc.viscosity_kinematic_water(self.temp) * self.gt)
+            / (_viscosity_kinematic_water(self.temp) * self.gt)
         ).to(u.s**-1)
         return vel_grad_avg
 
@@ -130,7 +175,7 @@ class Flocculator(Component):
                 / (
                     2
                     * self.end_water_depth
-                    * pc.viscosity_kinematic_water(self.temp)
+                    * _viscosity_kinematic_water(self.temp)
                     * self.vel_grad_avg**2
                 )
             )
@@ -207,7 +252,7 @@ class Flocculator(Component):
                     self.BAFFLE_K
                     / (
                         2
-                        * pc.viscosity_kinematic_water(self.temp)
+                        * _viscosity_kinematic_water(self.temp)
                         * (self.vel_grad_avg**2)
                     )
                 )
@@ -238,7 +283,7 @@ class Flocculator(Component):
                         2
                         * self.expansion_h
                         * (self.vel_grad_avg**2)
-                        * pc.viscosity_kinematic_water(self.temp)
+                        * _viscosity_kinematic_water(self.temp)
                     )
                 ).to_base_units()
             )
@@ -270,11 +315,8 @@ class Flocculator(Component):
 
         return pipe_od
 
-    def _set_drain_pipe(self):
-        drain_k_minor = (
-            hl.PIPE_ENTRANCE_K_MINOR + hl.PIPE_ENTRANCE_K_MINOR + hl.PIPE_EXIT_K_MINOR
-        )
-
+    def _drain_id(self):
+        """The minimum inner diameter of the drain pipe."""
         chan_pair_a = 2 * self.chan_l * self.chan_w
         drain_id = (
             np.sqrt(
@@ -282,12 +324,16 @@ class Flocculator(Component):
                 * chan_pair_a
                 / (np.pi * self.drain_t)
                 * np.sqrt(
-                    self.end_water_depth * drain_k_minor / (2 * u.standard_gravity)
+                    self.end_water_depth * _DRAIN_K_MINOR / (2 * u.standard_gravity)
                 )
             )
         ).to_base_units()
+        return drain_id
 
-        self.drain_pipe = Pipe(id=drain_id, k_minor=drain_k_minor, spec=self.spec)
+    def _set_drain_pipe(self):
+        self.drain_pipe = Pipe(
+            id=self._drain_id(), k_minor=_DRAIN_K_MINOR, spec=self.spec
+        )
 
     @property
     def onshape_url_configured(self):
@@ -312,3 +358,154 @@ class Flocculator(Component):
 
         configured_url = self._onshape_url + encoded_config
         return configured_url
+
+
+class FlocculatorBatch(Flocculator):
+    """Design many AguaClara flocculators at once.
+
+    Every numeric design input of :class:`Flocculator` may be an array, and
+    the inputs are broadcast against each other, so that, for example, an
+    array of flow rates and a single head loss design a flocculator for every
+    flow rate. The properties of a ``FlocculatorBatch`` are arrays of the
+    properties of those flocculators, calculated with the same equations as
+    :class:`Flocculator`. The drain pipe is not chosen from the available
+    pipe sizes; ``drain_id`` gives its minimum inner diameter instead. To
+    design one of the flocculators in full, use ``flocculator``.
+
+    Design Inputs:
+        - The design inputs of :class:`Flocculator`, as arrays or scalars.
+          ``chan_n_parity`` and ``spec`` are the same for every flocculator.
+
+    Example:
+        >>> from aguaclara.design.floc import *
+        >>> floc = FlocculatorBatch(q = [10, 20, 60] * u.L / u.s)
+        >>> floc.chan_n
+        array([1, 2, 2])
+        >>> floc.shape
+        (3,)
+    """
+
+    BATCH_INPUTS = (
+        "q",
+        "temp",
+        "ent_l",
+        "chan_w_max",
+        "l_max",
+        "gt",
+        "hl",
+        "end_water_depth",
+        "drain_t",
+        "polycarb_sheet_w",
+        "sed_chan_inlet_w_pre_weir",
+        "dividing_wall_thickness",
+    )
+
+    OUTPUTS = ("obstacle_offset", "drain_id")
+
+    def _design(self):
+        super()._design()
+
+        values = [getattr(self, name) for name in self.BATCH_INPUTS]
+        magnitudes = np.broadcast_arrays(
+            *[np.asarray(getattr(value, "magnitude", value)) for value in values]
+        )
+        for name, value, magnitude in zip(self.BATCH_INPUTS, values, magnitudes):
+            magnitude = np.array(magnitude)
+            if isinstance(value, u.Quantity):
+                magnitude = u.Quantity(magnitude, value.units)
+            setattr(self, name, magnitude)
+        self.shape = magnitudes[0].shape
+
+    def _set_drain_pipe(self):
+        self.drain_pipe = None
+        self.subcomponents = []
+
+    def flocculator(self, index):
+        """Return one of the flocculators, designed in full.
+
+        Args:
+            - ``index (int or tuple)``: Index of the flocculator in the arrays
+              of design inputs
+
+        Returns:
+            - The flocculator (Flocculator)
+        """
+        return Flocculator(
+            chan_n_parity=self.chan_n_parity,
+            spec=self.spec,
+            **{name: getattr(self, name)[index] for name in self.BATCH_INPUTS}
+        )
+
+    @property
+    def chan_w_min(self):
+        """The minimum channel width."""
+        return np.minimum(self.chan_w_min_hs_ratio, self.polycarb_sheet_w).to(u.cm)
+
+    @property
+    def chan_n(self):
+        """The minimum number of channels based on the maximum
+        possible channel width and the maximum length of the channels.
+        """
+        chan_n = (
+            (
+                (
+                    (self.vol / (self.polycarb_sheet_w * self.end_water_depth))
+                    + self.ent_l
+                )
+                / self.chan_l
+            )
+            .to_base_units()
+            .magnitude
+        )
+
+        if self.chan_n_parity == "even":
+            chan_n = np.ceil(chan_n / 2) * 2
+        elif self.chan_n_parity == "odd":
+            chan_n = np.ceil(chan_n / 2) * 2 - 1
+        elif self.chan_n_parity == "any":
+            chan_n = np.ceil(chan_n)
+        return np.where(self.q < 16 * u.L / u.s, 1, chan_n).astype(int)
+
+    @property
+    def chan_w(self):
+        """The channel width."""
+        chan_w = np.maximum(self.chan_w_min_gt, self.chan_w_min).to(u.cm)
+        return np.ceil(chan_w.magnitude) * u.cm
+
+    @property
+    def chan_l(self):
+        """The channel length."""
+        chan_l = np.minimum(self.l_max, self.l_max_vol)
+        return chan_l.to_base_units()
+
+    @property
+    def obstacle_offset(self):
+        """Whether the baffle obstacles are offset from each other, which
+        they are unless the obstacle pipes would be larger than 1.5 inches.
+        """
+        return self._obstacle_pipe_od(self.contraction_s) <= 1.5 * u.inch
+
+    @property
+    def obstacle_pipe_od(self):
+        """The outer diameter of an obstacle pipe. If the available pipe is
+        greater than 1.5 inches, it is halved, as the obstacles are then not
+        offset."""
+        pipe_od = self._obstacle_pipe_od(self.contraction_s)
+        return np.where(
+            self.obstacle_offset, pipe_od, self._obstacle_pipe_od(pipe_od / 2)
+        )
+
+    def _obstacle_pipe_od(self, od_min):
+        """Return the smallest available outer diameters that are at least
+        ``od_min``.
+        """
+        od_available = np.sort(pipes.OD_all_available().m_as(u.inch))
+        od_min = od_min.m_as(u.inch)
+        if np.any(od_min > od_available[-1]):
+            raise ValueError("No pipe is large enough for the obstacles.")
+        return od_available[np.searchsorted(od_available, od_min)] * u.inch
+
+    @property
+    def drain_id(self):
+        """The minimum inner diameter of the drain pipe."""
+        return self._drain_id()
@@ -8,6 +8,8 @@ Example:
     >>> lfom = LFOM(q=20 * u.L / u.s, hl=20 * u.cm)
     >>> lfom.row_n
     6
+    >>> lfom.level_to_flow([5, 10, 20] * u.cm).round(2)
+    <Quantity([ 5.14 10.02 19.98], 'liter / second')>
 """
 
 import aguaclara.core.constants as con
@@ -18,9 +20,54 @@ import aguaclara.core.drills as drills
 from aguaclara.core.units import u
 from aguaclara.design.component import Component
 
-import numpy as np
+from collections import namedtuple
 import math
 
+import numpy as np
+from scipy.interpolate import PchipInterpolator
+
+RatingCurve = namedtuple("RatingCurve", ["h", "q"])
+RatingCurve.__doc__ = """Flow rate through an LFOM at a series of water heights.
+
+``h`` (u.cm) is the height of water above the bottom of the lowest row of
+orifices, and ``q`` (u.L/u.s) the flow rate at each height."""
+
+# Gauss-Legendre nodes and weights on [0, 1] for the integral over the area
+# of an orifice.
+_ORIFICE_NODES, _ORIFICE_WEIGHTS = np.polynomial.legendre.leggauss(32)
+_ORIFICE_NODES = (_ORIFICE_NODES + 1) / 2
+_ORIFICE_WEIGHTS = _ORIFICE_WEIGHTS / 2
+
+
+def flow_orifice_vert_array(diam, height, ratio_vc_orifice):
+    """Return the flow rate (m³/s) through vertical orifices of diameter
+    ``diam`` (m) for heights of water (m) above their centers. The diameters
+    and heights are broadcast against each other.
+
+    This is :func:`aguaclara.core.physchem.flow_orifice_vert` for every height
+    at once. The integral over the orifice is taken over the angle θ, where
+    ``z = diam / 2 * cos(θ)``, from the water surface or the top of the
+    orifice down to its bottom. The angle is spaced quadratically from the
+    top, which removes the square root singularity at the water surface, so
+    that Gauss-Legendre quadrature converges quickly.
+    """
+    r = np.asarray(diam, dtype=float)[..., np.newaxis] / 2
+    height = np.asarray(height, dtype=float)[..., np.newaxis]
+    theta_top = np.arccos(np.clip(height / r, -1, 1))
+    span = np.pi - theta_top
+    theta = theta_top + span * _ORIFICE_NODES**2
+    integrand = (
+        2
+        * r**2
+        * np.sin(theta) ** 2
+        * np.sqrt(np.maximum(height - r * np.cos(theta), 0))
+        * 2
+        * span
+        * _ORIFICE_NODES
+    )
+    gravity = (1 * u.gravity).m_as(u.m / u.s**2)
+    return ratio_vc_orifice * np.sqrt(2 * gravity) * (integrand @ _ORIFICE_WEIGHTS)
+
 
 class LFOM(Component):
     """Design and AguaClara plant's LFOM.
@@ -42,6 +89,23 @@ class LFOM(Component):
           defaults to 10)
     """
 
+    OUTPUTS = (
+        "row_n",
+        "row_b",
+        "vel_critical",
+        "pipe_a_min",
+        "pipe_nd",
+        "top_row_orifice_a",
+        "orifice_d_max",
+        "orifice_d",
+        "drill_bit_a",
+        "orifice_n_max_per_row",
+        "q_per_row",
+        "orifice_h_per_row",
+        "orifice_n_per_row",
+        "error_per_row",
+    )
+
     def __init__(self, **kwargs):
         self.hl = 20.0 * u.cm
         self.safety_factor = 1.5
@@ -142,35 +206,65 @@ class LFOM(Component):
         ) * self.row_b + 0.5 * self.orifice_d
         return height_orifices
 
+    @property
+    def submerged_h_matrix(self):
+        """The height of water above the center of each row of orifices
+        (columns) when each number of rows is submerged (rows), from none to
+        all of them. The water is taken to be one row spacing above the top
+        submerged row.
+        """
+        submerged_n = np.arange(1, self.row_n + 2)[:, np.newaxis]
+        return self.row_b * submerged_n - self.orifice_h_per_row[np.newaxis, :]
+
+    @property
+    def q_submerged_matrix(self):
+        """The flow rate through one orifice of each row of orifices
+        (columns) when each number of rows is submerged (rows), from none to
+        all of them. Only the submerged rows contribute flow.
+        """
+        h = self.submerged_h_matrix
+        submerged = np.tri(self.row_n + 1, self.row_n, k=-1, dtype=bool)
+        # Every pair of rows that are the same distance apart has the same
+        # height, so the orifice flow is evaluated once per distinct height.
+        heights, index = np.unique(h.magnitude[submerged], return_inverse=True)
+        flows = [
+            pc.flow_orifice_vert(
+                self.orifice_d, height * h.units, con.VC_ORIFICE_RATIO
+            ).m_as(u.m**3 / u.s)
+            for height in heights
+        ]
+        q = np.zeros(h.shape)
+        q[submerged] = np.array(flows)[index]
+        return q * u.m**3 / u.s
+
     def q_submerged(self, row_n, orifice_n_per_row):
         """The flow rate through some number of submerged rows.
 
         Args:
             - ``row_n``: Number of submerged rows
         """
-        flow = 0 * u.L / u.s
-        for i in range(row_n):
-            flow = flow + (
-                orifice_n_per_row[i]
-                * (
-                    pc.flow_orifice_vert(
-                        self.orifice_d,
-                        self.row_b * (row_n + 1) - self.orifice_h_per_row[i],
-                        con.VC_ORIFICE_RATIO,
-                    )
-                )
+        if row_n > self.row_n:
+            raise ValueError(
+                "Only {} rows can be submerged, not {}.".format(self.row_n, row_n)
             )
-        return flow.to(u.L / u.s)
+        flow = np.dot(
+            orifice_n_per_row[:row_n],
+            self.q_submerged_matrix[row_n, :row_n].m_as(u.m**3 / u.s),
+        )
+        return (flow * u.m**3 / u.s).to(u.L / u.s)
 
     @property
     def orifice_n_per_row(self):
         """The number of orifices at each level."""
         h = self.row_b - 0.5 * self.orifice_d
         flow_per_orifice = pc.flow_orifice_vert(self.orifice_d, h, con.VC_ORIFICE_RATIO)
+        flow_per_orifice = flow_per_orifice.m_as(u.m**3 / u.s)
+        q_per_row = self.q_per_row.m_as(u.m**3 / u.s)
+        q_submerged = self.q_submerged_matrix.m_as(u.m**3 / u.s)
         n = np.zeros(self.row_n)
         for i in range(self.row_n):
-            flow_needed = self.q_per_row[i] - self.q_submerged(i, n)
-            n_orifices_real = (flow_needed / flow_per_orifice).to(u.dimensionless)
+            flow_needed = q_per_row[i] - np.dot(n[:i], q_submerged[i, :i])
+            n_orifices_real = flow_needed / flow_per_orifice
             n[i] = min((max(0, round(n_orifices_real))), self.orifice_n_max_per_row)
         return n
 
@@ -178,12 +272,60 @@ class LFOM(Component):
     def error_per_row(self):
         """The error of the design based off the predicted flow rate and
         the actual flow rate."""
-        q_error = np.zeros(self.row_n)
-        for i in range(self.row_n):
-            actual_flow = self.q_submerged(i, self.orifice_n_per_row)
-            q_error[i] = (
-                ((actual_flow - self.q_per_row[i]) / self.q_per_row[i]).to(
-                    u.dimensionless
-                )
-            ).magnitude
-        return q_error
+        actual_flow = self.q_submerged_matrix[: self.row_n] @ self.orifice_n_per_row
+        q_error = ((actual_flow - self.q_per_row) / self.q_per_row).to(u.dimensionless)
+        return q_error.magnitude
+
+    def rating_curve(self, h_max=None, num_points=1001):
+        """The flow rate through the LFOM at evenly spaced heights of water
+        above the bottom of the lowest row of orifices, for the designed
+        orifices. All heights and rows are evaluated at once.
+
+        Args:
+            - ``h_max (float * u.cm)``: Largest height (optional, defaults to
+              ``hl``)
+            - ``num_points (int)``: Number of heights (optional, defaults to
+              1001)
+
+        Returns:
+            - The rating curve (RatingCurve)
+        """
+        h_max = self.hl if h_max is None else h_max
+        h = np.linspace(0, h_max.m_as(u.m), int(num_points))
+        orifice_h = self.orifice_h_per_row.m_as(u.m)
+        flow = (
+            flow_orifice_vert_array(
+                self.orifice_d.m_as(u.m),
+                h[:, np.newaxis] - orifice_h[np.newaxis, :],
+                con.VC_ORIFICE_RATIO,
+            )
+            @ self.orifice_n_per_row
+        )
+        return RatingCurve((h * u.m).to(u.cm), (flow * u.m**3 / u.s).to(u.L / u.s))
+
+    @property
+    def _level_to_flow_interpolant(self):
+        """A monotone interpolant of the rating curve up to ``hl``, in m and
+        m³/s."""
+        curve = self.rating_curve(num_points=2001)
+        return PchipInterpolator(curve.h.m_as(u.m), curve.q.m_as(u.m**3 / u.s))
+
+    def level_to_flow(self, heights):
+        """Convert heights of water above the bottom of the lowest row of
+        orifices, such as a level sensor's time series, to flow rates.
+
+        The rating curve is sampled once per LFOM design and interpolated, so
+        millions of heights convert in a fraction of a second.
+
+        Args:
+            - ``heights (float * u.cm array)``: Heights of water
+
+        Returns:
+            - Flow rates (float * u.L/u.s array). Heights below the lowest
+              row of orifices give no flow, and heights above ``hl`` give NaN.
+        """
+        h = np.asarray(u.Quantity(heights).m_as(u.m), dtype=float)
+        interpolant = self._level_to_flow_interpolant
+        flow = interpolant(np.clip(h, 0, interpolant.x[-1]))
+        flow = np.where(h > interpolant.x[-1], np.nan, flow)
+        return u.Quantity(flow * 1000, u.L / u.s)
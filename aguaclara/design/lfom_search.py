@@ -0,0 +1,210 @@
+"""Search the possible layouts of an LFOM for the one with the least error.
+
+An :class:`aguaclara.design.lfom.LFOM` takes the largest drill bit that fits
+its rows, the smallest pipe that carries its flow and as many rows as its flow
+suggests. Each of those discrete choices changes how closely the orifices
+follow the linear relation between flow rate and water level, which
+``LFOM.error_per_row`` measures. :func:`search_layouts` lays out the orifices
+of every combination of row count, drill bit and pipe size at once and
+reports the statistics of their errors, and :func:`best_layouts` finds the
+best layout for every flow rate of a plant catalog, in parallel.
+
+Example:
+    >>> from aguaclara.core.units import u
+    >>> from aguaclara.design.lfom import LFOM
+    >>> from aguaclara.design.lfom_search import search_layouts
+    >>> layouts = search_layouts(LFOM(q=20 * u.L / u.s))
+    >>> layouts.loc[0, ["row_n", "orifice_d", "pipe_nd"]].tolist()
+    [6.0, 1.25, 10.0]
+    >>> layouts.loc[0, "orifice_n_per_row"]
+    [12, 3, 3, 3, 2, 3]
+    >>> round(float(layouts.loc[0, "error_max_abs"]), 4)
+    0.1067
+"""
+
+from aguaclara.core.units import u
+import aguaclara.core.constants as con
+import aguaclara.core.pipes as pipe
+from aguaclara.design.lfom import LFOM, flow_orifice_vert_array
+from aguaclara.design.sweep import decode, encode
+
+from concurrent.futures import ProcessPoolExecutor
+import itertools
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+# Units of the columns of the tables of layouts
+_UNITS = {"q": "liter / second", "orifice_d": "inch", "pipe_nd": "inch"}
+
+
+def _candidates(lfom, pipe_nd_n):
+    """Return the row count, row spacing, drill bit diameter (m), pipe ND
+    (inch) and pipe inner diameter (m) of every candidate layout of an LFOM.
+    """
+    drill_bits = np.sort(np.atleast_1d(lfom.drill_bits.m_as(u.m)))
+    nds = pipe.ND_all_available().m_as(u.inch)
+    ids = pipe.ID_SDR_all_available(lfom.sdr).m_as(u.m)
+    # Every pipe from the smallest one that carries the flow.
+    first = np.searchsorted(ids, np.sqrt(4 * lfom.pipe_a_min.m_as(u.m**2) / np.pi))
+    pipes = list(zip(nds, ids))[first : first + pipe_nd_n]
+    if not pipes:
+        raise ValueError("No pipe is large enough for the LFOM.")
+
+    candidates = []
+    for row_n in range(lfom.min_row_n, lfom.max_row_n + 1):
+        rows = LFOM(
+            q=lfom.q,
+            temp=lfom.temp,
+            hl=lfom.hl,
+            min_row_n=row_n,
+            max_row_n=row_n,
+        )
+        row_b = rows.row_b.m_as(u.m)
+        d_max = min(row_b, rows.orifice_d_max.m_as(u.m))
+        for d in drill_bits[drill_bits <= d_max]:
+            for nd, id_ in pipes:
+                candidates.append((row_n, row_b, d, nd, id_))
+    if not candidates:
+        raise ValueError("No drill bit fits the rows of the LFOM.")
+    return [np.array(column) for column in zip(*candidates)]
+
+
+def search_layouts(lfom, pipe_nd_n=3):
+    """Lay out the orifices of an LFOM for every combination of row count,
+    drill bit and pipe size, and return the errors of the layouts.
+
+    The row counts are those from ``min_row_n`` to ``max_row_n``, the drill
+    bits those of ``drill_bits`` that are no larger than the row spacing or
+    the largest orifice of the top row, and the pipes the ``pipe_nd_n``
+    smallest ones that carry the flow. The orifices of each layout are placed
+    row by row as in ``LFOM.orifice_n_per_row``, for all layouts at once.
+
+    Args:
+        - ``lfom (LFOM)``: The LFOM, whose design inputs set the flow rate,
+          head loss and choices of the search
+        - ``pipe_nd_n (int)``: Number of pipe sizes to try (optional, defaults
+          to 3)
+
+    Returns:
+        - A ``pandas.DataFrame`` with one row per layout, from the least error
+          to the most. The columns are ``row_n``, ``orifice_d`` (inch),
+          ``pipe_nd`` (inch), ``orifice_n_max_per_row``,
+          ``orifice_n_per_row`` and the mean, largest absolute and root mean
+          square values of ``error_per_row``: ``error_mean``,
+          ``error_max_abs`` and ``error_rms``. The bottom row always has an
+          error of -1, since no rows below it are submerged, so it is left
+          out of the statistics. Layouts are ranked by ``error_max_abs``,
+          then ``error_rms``.
+    """
+    row_n, row_b, d, nd, id_ = _candidates(lfom, int(pipe_nd_n))
+    q = lfom.q.m_as(u.m**3 / u.s)
+    orifice_s = lfom.orifice_s.m_as(u.m)
+    orifice_n_max = np.floor(np.pi * id_ / (d + orifice_s))
+
+    # Index the layouts, the rows and the rows below them along the first,
+    # second and third axes.
+    rows = row_n.max()
+    i = np.arange(rows)[np.newaxis, :, np.newaxis]
+    j = np.arange(rows)[np.newaxis, np.newaxis, :]
+    layout_rows = i[..., 0] < row_n[:, np.newaxis]
+    b = row_b[:, np.newaxis, np.newaxis]
+    r = d[:, np.newaxis, np.newaxis] / 2
+    h = b * (i + 1) - (j * b + r)
+    submerged = (j < i) & layout_rows[..., np.newaxis]
+    q_submerged = np.where(
+        submerged, flow_orifice_vert_array(2 * r, h, con.VC_ORIFICE_RATIO), 0
+    )
+    flow_per_orifice = flow_orifice_vert_array(d, row_b - d / 2, con.VC_ORIFICE_RATIO)
+    q_per_row = q * (i[..., 0] + 1) / row_n[:, np.newaxis]
+
+    n = np.zeros((row_n.size, rows))
+    for row in range(rows):
+        flow_needed = q_per_row[:, row] - np.sum(n * q_submerged[:, row], axis=1)
+        n_row = np.clip(np.round(flow_needed / flow_per_orifice), 0, orifice_n_max)
+        n[:, row] = np.where(layout_rows[:, row], n_row, 0)
+    error = (np.sum(n[:, np.newaxis, :] * q_submerged, axis=2) - q_per_row) / q_per_row
+
+    # Leave out the bottom row, and the rows that a layout does not have.
+    error = np.where(layout_rows, error, np.nan)[:, 1:]
+    table = pd.DataFrame(
+        {
+            "row_n": row_n,
+            "orifice_d": (d * u.m).m_as(u.inch),
+            "pipe_nd": nd,
+            "orifice_n_max_per_row": orifice_n_max.astype(int),
+            "orifice_n_per_row": [
+                n[k, : row_n[k]].astype(int).tolist() for k in range(row_n.size)
+            ],
+            "error_mean": np.nanmean(error, axis=1),
+            "error_max_abs": np.nanmax(np.abs(error), axis=1),
+            "error_rms": np.sqrt(np.nanmean(error**2, axis=1)),
+        }
+    )
+    table = table.sort_values(["error_max_abs", "error_rms"], kind="stable")
+    table = table.reset_index(drop=True)
+    table.attrs["units"] = {name: _UNITS[name] for name in ("orifice_d", "pipe_nd")}
+    return table
+
+
+def _best_chunk(flows, inputs, pipe_nd_n):
+    """Return the best layout of the LFOM of each flow rate (L/s)."""
+    inputs = {name: decode(value) for name, value in inputs.items()}
+    rows = []
+    for q in flows:
+        lfom = LFOM(q=q * u.L / u.s, **inputs)
+        rows.append(search_layouts(lfom, pipe_nd_n).iloc[0].to_dict())
+    return rows
+
+
+def best_layouts(flows, workers=None, chunksize=None, pipe_nd_n=3, **inputs):
+    """Find the best layout of the LFOM of every flow rate of a catalog.
+
+    The flow rates are split into chunks that are searched in parallel by a
+    pool of worker processes, as in :func:`aguaclara.design.sweep.sweep`.
+
+    Args:
+        - ``flows (float * u.L / u.s array)``: Flow rates of the LFOMs
+        - ``workers (int)``: Number of worker processes. 1 searches every
+          flow rate in this process. (optional, defaults to the number of
+          CPUs)
+        - ``chunksize (int)``: Number of flow rates that each worker searches
+          at a time (optional, defaults to a quarter of the flow rates per
+          worker)
+        - ``pipe_nd_n (int)``: Number of pipe sizes to try (optional, defaults
+          to 3)
+        - ``**inputs``: The other design inputs of the LFOMs, such as ``hl``
+
+    Returns:
+        - A ``pandas.DataFrame`` with one row per flow rate, with a ``q``
+          column and the columns of :func:`search_layouts` for the best
+          layout. ``DataFrame.attrs["units"]`` maps the columns with units to
+          their units.
+    """
+    flows = np.atleast_1d(u.Quantity(flows).m_as(u.L / u.s)).tolist()
+    inputs = {name: encode(value) for name, value in inputs.items()}
+    workers = os.cpu_count() if workers is None else int(workers)
+    if workers < 1:
+        raise ValueError("workers is {} but must be at least 1.".format(workers))
+    if chunksize is None:
+        chunksize = max(1, math.ceil(len(flows) / (4 * workers)))
+    chunks = [flows[i : i + chunksize] for i in range(0, len(flows), chunksize)]
+
+    if workers == 1 or len(chunks) == 1:
+        results = [_best_chunk(chunk, inputs, pipe_nd_n) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(
+                executor.map(
+                    _best_chunk,
+                    chunks,
+                    itertools.repeat(inputs),
+                    itertools.repeat(pipe_nd_n),
+                )
+            )
+    table = pd.DataFrame(list(itertools.chain.from_iterable(results)))
+    table.insert(0, "q", flows)
+    table.attrs["units"] = dict(_UNITS)
+    return table
@@ -0,0 +1,277 @@
+"""Flow and head in branched and looped pipe networks.
+
+A ``Tee`` in :mod:`aguaclara.design.pipeline` sends all of its flow through
+one outlet, so a pipeline made of components can only describe a single path.
+A ``PipeNetwork`` instead joins pipelines into a network of links between
+nodes. Some nodes have a known head, such as a tank or a reservoir, and the
+others may withdraw (or supply) a known flow rate. ``PipeNetwork.solve`` finds
+the flow through every link and the head at every node.
+
+The network is solved with the global gradient algorithm (Todini and Pilati,
+1988), a Newton's method on the head loss equation of every link and the
+continuity equation of every node at once. Each iteration solves a sparse,
+symmetric positive definite system for the node heads, and the head losses of
+all of the components of all links are evaluated together, so networks with
+thousands of links solve in a fraction of a second.
+
+The friction factor of :func:`aguaclara.core.physchem.fric_pipe` jumps up at
+the laminar-turbulent transition (Re = 2100), where Newton's method would
+cycle. As in EPANET, the friction factor of links in the transitional range,
+from Re = 2100 to ``RE_TURBULENT_PIPE``, is interpolated between the laminar
+value at the start of the range and the turbulent value at its end. Outside of
+that range, the head loss of every link is that of
+``PipelineComponent.headloss_pipeline``.
+
+Example:
+    >>> from aguaclara.core.units import u
+    >>> from aguaclara.design.pipeline import Pipe
+    >>> from aguaclara.design.network import PipeNetwork
+    >>> network = PipeNetwork()
+    >>> network.add_node("tank", head=1 * u.m)
+    >>> network.add_node("outlet", demand=10 * u.L / u.s)
+    >>> network.add_link("tank", "outlet", Pipe(size=4 * u.inch, l=50 * u.m))
+    0
+    >>> network.add_link("tank", "outlet", Pipe(size=2 * u.inch, l=20 * u.m))
+    1
+    >>> network.solve().flow.round(3)
+    <Quantity([7.968 2.032], 'liter / second')>
+"""
+
+from aguaclara.core.units import unit_registry as u
+from aguaclara.core import channels as ch
+from aguaclara.core import telemetry
+from aguaclara.design.pipeline import PipelineComponent
+
+from collections import namedtuple
+import warnings
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse import csgraph
+from scipy.sparse import linalg
+
+NetworkFlow = namedtuple("NetworkFlow", ["flow", "head", "headloss"])
+NetworkFlow.__doc__ = """Solution of a pipe network.
+
+``flow`` (u.L/u.s) and ``headloss`` (u.cm) have one entry per link, in the
+order that the links were added. A negative flow runs from the end node of the
+link to its start node. ``head`` (u.m) has one entry per node, in the order of
+``PipeNetwork.nodes``."""
+
+#: Reynolds number above which pipe flow in a network is fully turbulent
+RE_TURBULENT_PIPE = 4000
+
+
+class PipeNetwork:
+    """A network of pipelines that join at nodes.
+
+    Every link is a pipeline of ``PipelineComponent``'s, starting with the
+    component given to ``add_link``, and carries the same flow rate through
+    all of its components. Pipes contribute their major loss and fittings
+    their minor loss, as in ``PipelineComponent.headloss_pipeline``. The flow
+    rates that are set on the components are ignored. A pipeline is compiled
+    when it is added, so later changes to its components do not affect the
+    network, and a pipeline that joins many pairs of nodes is compiled once.
+
+    Every connected part of the network needs at least one node with a known
+    head.
+    """
+
+    def __init__(self):
+        self.nodes = []
+        self._node_index = {}
+        self._demands = []
+        self._heads = []
+        self._links = []
+        self._compiled = {}
+
+    def add_node(self, name, demand=0 * u.L / u.s, head=None):
+        """Add a node to the network.
+
+        Args:
+            - ``name (hashable)``: Name of the node
+            - ``demand (float * u.L / u.s)``: Flow rate that leaves the network
+              at the node, negative for flow that enters it (optional,
+              defaults to 0)
+            - ``head (float * u.m)``: Known head at the node, such as the water
+              level of a tank (optional, defaults to an unknown head)
+        """
+        if name in self._node_index:
+            raise ValueError("The network already has a node named {}.".format(name))
+        self._node_index[name] = len(self.nodes)
+        self.nodes.append(name)
+        self._demands.append(demand.m_as(u.m**3 / u.s))
+        self._heads.append(np.nan if head is None else head.m_as(u.m))
+
+    def add_link(self, start, end, pipeline):
+        """Add a pipeline between two nodes of the network.
+
+        Args:
+            - ``start (hashable)``: Name of the node at the inlet of the
+              pipeline
+            - ``end (hashable)``: Name of the node at the outlet of the
+              pipeline
+            - ``pipeline (PipelineComponent)``: First component of the pipeline
+
+        Returns:
+            - The index of the link
+        """
+        for name in (start, end):
+            if name not in self._node_index:
+                raise ValueError("The network has no node named {}.".format(name))
+        if start == end:
+            raise ValueError("A link must join two different nodes.")
+        if not isinstance(pipeline, PipelineComponent):
+            raise TypeError("A link must be a PipelineComponent.")
+        if id(pipeline) not in self._compiled:
+            self._compiled[id(pipeline)] = (pipeline, pipeline.compile())
+        self._links.append(
+            (
+                self._node_index[start],
+                self._node_index[end],
+                self._compiled[id(pipeline)][1],
+            )
+        )
+        return len(self._links) - 1
+
+    def _headloss(self, q, segments):
+        """Return the head loss (m) of every link for link flow rates ``q``
+        (m³/s), whose sign follows the flow.
+        """
+        link, id_, l, pipe_rough, k_minor, nu = segments
+        vel = np.abs(q)[link] / (np.pi / 4 * id_**2)
+        velocity_head = vel**2 / (2 * ch.GRAVITY)
+        re = np.maximum(vel * id_ / nu, 1e-12)
+        fric = ch._fric(re, id_ / 4, pipe_rough)
+        # Newton's method cycles across the jump in the friction factor at
+        # the laminar-turbulent transition, so the friction factor is
+        # interpolated across the transitional range instead.
+        ramp = (re >= ch.RE_TRANSITION_PIPE) & (re < RE_TURBULENT_PIPE)
+        fric_laminar = 64 / ch.RE_TRANSITION_PIPE
+        fric_turbulent = ch._fric(RE_TURBULENT_PIPE, id_ / 4, pipe_rough)
+        fric = np.where(
+            ramp,
+            fric_laminar
+            + (fric_turbulent - fric_laminar)
+            * (re - ch.RE_TRANSITION_PIPE)
+            / (RE_TURBULENT_PIPE - ch.RE_TRANSITION_PIPE),
+            fric,
+        )
+        headloss = (fric * l / id_ + k_minor) * velocity_head
+        return np.sign(q) * np.bincount(link, headloss, minlength=q.size)
+
+    def solve(self, tol=1e-10, maxiter=100):
+        """Return the flow through every link and the head at every node.
+
+        Args:
+            - ``tol (float)``: Tolerance of the change in link flow rates,
+              relative to the largest flow rate (optional, defaults to 1e-10)
+            - ``maxiter (int)``: Maximum number of iterations (optional,
+              defaults to 100)
+
+        Returns:
+            - The solution of the network (NetworkFlow)
+
+        Raises:
+            - ``ValueError``: If ``maxiter`` is less than 1, or the network
+              has no links or a connected part without a known head
+        """
+        if maxiter < 1:
+            raise ValueError("maxiter is {} but must be at least 1.".format(maxiter))
+        if not self._links:
+            raise ValueError("The network has no links.")
+        started = telemetry.start()
+        start = np.array([link[0] for link in self._links])
+        end = np.array([link[1] for link in self._links])
+        compiled = [link[2] for link in self._links]
+        n_links, n_nodes = len(self._links), len(self.nodes)
+
+        known = ~np.isnan(self._heads)
+        if not known.any():
+            raise ValueError("At least one node must have a known head.")
+        adjacency = sparse.coo_matrix(
+            (np.ones(n_links), (start, end)), shape=(n_nodes, n_nodes)
+        )
+        _, labels = csgraph.connected_components(adjacency, directed=False)
+        if not np.isin(labels, labels[known]).all():
+            raise ValueError(
+                "Every connected part of the network needs a node with a " "known head."
+            )
+
+        segments = (
+            np.repeat(np.arange(n_links), [len(c) for c in compiled]),
+            *(
+                np.concatenate([getattr(c, name) for c in compiled])
+                for name in ("id", "l", "pipe_rough", "k_minor", "nu")
+            ),
+        )
+
+        # Incidence matrix of the links and nodes: -1 at the start node and 1
+        # at the end node, so that head loss = -(incidence @ head).
+        incidence = sparse.csr_matrix(
+            (
+                np.concatenate([-np.ones(n_links), np.ones(n_links)]),
+                (np.tile(np.arange(n_links), 2), np.concatenate([start, end])),
+            ),
+            shape=(n_links, n_nodes),
+        )
+        unknown = np.flatnonzero(~known)
+        incidence_unknown = incidence[:, unknown]
+        incidence_known = incidence[:, known]
+        head = np.array(self._heads)
+        head_known = head[known]
+        demand = np.array(self._demands)[unknown]
+
+        # Start every link at a velocity of 1 m/s.
+        area = np.array([np.pi / 4 * c.id[0] ** 2 for c in compiled])
+        q = area.copy()
+        head_unknown = np.zeros(unknown.size)
+        converged = False
+        for iterations in range(1, maxiter + 1):
+            headloss = self._headloss(q, segments)
+            # The head loss gradient of every link. Laminar head loss is
+            # linear in flow rate, so the gradient stays positive at no flow.
+            q_abs = np.maximum(np.abs(q), 1e-9 * area)
+            gradient = (
+                self._headloss(q_abs * (1 + 1e-7), segments)
+                - self._headloss(q_abs, segments)
+            ) / (1e-7 * q_abs)
+            energy = headloss + incidence_unknown @ head_unknown
+            energy = energy + incidence_known @ head_known
+            continuity = incidence_unknown.T @ q - demand
+            if unknown.size:
+                inverse = sparse.diags(1 / gradient)
+                matrix = (incidence_unknown.T @ inverse @ incidence_unknown).tocsc()
+                step_head = linalg.spsolve(
+                    matrix, continuity - incidence_unknown.T @ (energy / gradient)
+                )
+                step_head = np.atleast_1d(step_head)
+                step_q = -(energy + incidence_unknown @ step_head) / gradient
+                head_unknown = head_unknown + step_head
+            else:
+                step_q = -energy / gradient
+            q = q + step_q
+            change = np.max(np.abs(step_q)) / max(np.max(np.abs(q)), 1e-12)
+            if change <= tol:
+                converged = True
+                break
+        if not converged:
+            warnings.warn(
+                "The pipe network did not converge in {} iterations.".format(maxiter),
+                UserWarning,
+            )
+        telemetry.record(
+            "PipeNetwork.solve",
+            started,
+            iterations,
+            change,
+            converged,
+            {"links": n_links, "nodes": n_nodes},
+        )
+
+        head[unknown] = head_unknown
+        return NetworkFlow(
+            (q * u.m**3 / u.s).to(u.L / u.s),
+            head * u.m,
+            (self._headloss(q, segments) * u.m).to(u.cm),
+        )
@@ -17,8 +17,10 @@ Constants:
 """
 
 from aguaclara.core.units import unit_registry as u
+from aguaclara.core import channels as ch
 from aguaclara.core import physchem as pc
 from aguaclara.core import head_loss as hl
+from aguaclara.core import telemetry
 import aguaclara.core.materials as mats
 import aguaclara.core.utility as ut
 from aguaclara.design.component import Component
@@ -26,6 +28,7 @@ from aguaclara.design.component import Component
 import pandas as pd
 import numpy as np
 import os.path
+import warnings
 from abc import ABC, abstractmethod
 
 _dir_path = os.path.dirname(__file__)
@@ -53,6 +56,11 @@ AVAILABLE_FITTING_SIZES = np.array(_available_fitting_sizes_raw) * u.inch
 _available_fitting_ids_raw = _fitting_database.query("Used==1")["id_inch"]
 AVAILABLE_FITTING_IDS = np.array(_available_fitting_ids_raw) * u.inch
 
+# Attributes that connect pipeline components, and a counter of changes to
+# them that invalidates cached traversal orders.
+_STRUCTURE_ATTRIBUTES = frozenset(["next", "left", "right", "left_type", "right_type"])
+_structure_version = 0
+
 
 class PipelineComponent(Component, ABC):
     """An abstract representation of pipeline components
@@ -83,6 +91,8 @@ class PipelineComponent(Component, ABC):
 
     _AVAILABLE_FLUID_TYPES = ["water", "pacl", "alum"]
 
+    OUTPUTS = ("nu", "headloss_pipeline")
+
     def __init__(self, **kwargs):
         if all(key in kwargs for key in ("size", "id")):
             raise AttributeError(
@@ -126,64 +136,83 @@ class PipelineComponent(Component, ABC):
         """The head loss of this pipeline component."""
         pass
 
+    def __setattr__(self, name, value):
+        # Changing how components are connected invalidates every cached
+        # traversal order.
+        if name in _STRUCTURE_ATTRIBUTES:
+            global _structure_version
+            _structure_version += 1
+        super().__setattr__(name, value)
+
+    def _successors(self):
+        """The components that directly follow this one in the flow
+        direction.
+        """
+        return [] if self.next is None else [self.next]
+
+    def _components(self):
+        """Return this component and every component that follows it, in
+        topological (flow) order.
+
+        The pipeline is walked with an explicit stack rather than recursion,
+        so pipelines of any length can be traversed. The order is cached until
+        any pipeline component is reconnected.
+        """
+        cached = self.__dict__.get("_order_cache")
+        if cached is not None and cached[0] == _structure_version:
+            return cached[1]
+        order = []
+        visited = set()
+        stack = [self]
+        while stack:
+            component = stack.pop()
+            if id(component) in visited:
+                continue
+            visited.add(id(component))
+            order.append(component)
+            # Reverse so that the first successor is visited first.
+            stack.extend(reversed(component._successors()))
+        # Bypass __setattr__, which would invalidate the cache.
+        self.__dict__["_order_cache"] = (_structure_version, order)
+        return order
+
     @property
     def headloss_pipeline(self):
         """The head loss of the entire pipeline following this component."""
-        if self.next is None:
-            return self.headloss
-        else:
-            return self.headloss + self.next.headloss_pipeline
+        components = self._components()
+        headloss = components[0].headloss
+        for component in components[1:]:
+            headloss = headloss + component.headloss
+        return headloss
 
     def _set_next_components_q(self):
         """Set the flow rates of the next components in this pipeline to be
         the same as this component.
         """
-        if self.next is not None:
-            self.next.q = self.q
-            self.next._set_next_components_q()
+        for component in self._components()[1:]:
+            component.q = self.q
 
     def flow_pipeline(self, target_headloss):
         """Calculate the required flow through a pipeline component and all of
         its next components to reach a desired head loss.
 
+        The flow rates of the components are not changed.
+
         Args:
             - ``target_headloss (float * u.m)``: The desired head loss through
-              the pipeline
+              the pipeline, or an array of head losses
+
+        Returns:
+            - The flow rate for each head loss (float * u.L / u.s)
         """
-        if type(self) is Pipe:
-            flow = pc.flow_pipe(
-                self.id,
-                target_headloss,
-                self.l,
-                self.nu,
-                self.pipe_rough,
-                self.k_minor,
-            )
-        else:
-            try:
-                flow = pc.flow_pipe(
-                    self.next.id,
-                    target_headloss,
-                    self.next.l,
-                    self.next.nu,
-                    self.next.pipe_rough,
-                    self.next.k_minor,
-                )
-            except AttributeError:
-                raise AttributeError(
-                    "Neither of the first two components in"
-                    "this pipeline are Pipe objects."
-                )
-        err = 1.0
-        headloss = self.headloss_pipeline
-
-        while abs(err) > 0.01:
-            err = (target_headloss - headloss) / (target_headloss + headloss)
-            flow = flow + err * flow
-            self.q = flow
-            self._set_next_components_q()
-            headloss = self.headloss_pipeline
-        return flow.to(u.L / u.s)
+        return self.compile().flow(target_headloss)
+
+    def compile(self):
+        """Flatten this pipeline component and its next components into a
+        :class:`CompiledPipeline`, whose head loss can be evaluated for many
+        flow rates at once.
+        """
+        return CompiledPipeline(self)
 
     @abstractmethod
     def format_print(self):
@@ -196,10 +225,7 @@ class PipelineComponent(Component, ABC):
         """The pretty-printed string representation of a pipeline component
         and its next components.
         """
-        if self.next is None:
-            return self.format_print()
-        else:
-            return self.format_print() + "\n" + self.next._pprint()
+        return "\n".join(component.format_print() for component in self._components())
 
     def __str__(self):
         return self._pprint()
@@ -221,6 +247,178 @@ class PipelineComponent(Component, ABC):
                 raise TypeError("Fittings must be followed by pipes.")
 
 
+class CompiledPipeline:
+    """A pipeline flattened into contiguous arrays, one entry per component.
+
+    The arrays hold magnitudes in SI units. As in the ``headloss`` of each
+    component, pipes contribute only their major loss and fittings only their
+    minor loss, so ``l`` is 0 for fittings and ``k_minor`` is 0 for pipes.
+    Every component carries the same flow rate.
+
+    Attributes:
+        - ``kinds (list of str)``: The class name of each component
+        - ``id (numpy.ndarray)``: Inner diameters (m)
+        - ``l (numpy.ndarray)``: Lengths of the pipes (m)
+        - ``pipe_rough (numpy.ndarray)``: Roughness of the pipes (m)
+        - ``k_minor (numpy.ndarray)``: Minor loss coefficients of the fittings
+        - ``nu (numpy.ndarray)``: Kinematic viscosities of the fluid (m²/s)
+        - ``q (float * u.L / u.s)``: Flow rate of the first component
+    """
+
+    def __init__(self, pipeline):
+        self.kinds = []
+        ids, lengths, roughs, k_minors, nus = [], [], [], [], []
+        # Components usually share their fluid, so look up each viscosity once.
+        fluid_nus = {}
+        for component in pipeline._components():
+            self.kinds.append(type(component).__name__)
+            ids.append(component.id.m_as(u.m))
+            fluid = (component.fluid_type, str(component.temp))
+            if fluid not in fluid_nus:
+                fluid_nus[fluid] = component.nu.m_as(u.m**2 / u.s)
+            nus.append(fluid_nus[fluid])
+            if isinstance(component, Pipe):
+                lengths.append(component.l.m_as(u.m))
+                roughs.append(component.pipe_rough.m_as(u.m))
+                k_minors.append(0)
+            else:
+                lengths.append(0)
+                roughs.append(0)
+                k_minors.append(component._k_minor_next())
+        self.id = np.array(ids, dtype=float)
+        self.l = np.array(lengths, dtype=float)  # noqa: E741
+        self.pipe_rough = np.array(roughs, dtype=float)
+        self.k_minor = np.array(k_minors, dtype=float)
+        self.nu = np.array(nus, dtype=float)
+        self.q = pipeline.q
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def _headloss_segments(self, q):
+        """Return the head loss (m) of every component for flow rates ``q``
+        (m³/s), with one row per flow rate.
+        """
+        q = np.asarray(q, dtype=float)[..., np.newaxis]
+        vel = q / (np.pi / 4 * self.id**2)
+        velocity_head = vel**2 / (2 * ch.GRAVITY)
+        re = np.maximum(vel * self.id / self.nu, 1e-12)
+        fric = ch._fric(re, self.id / 4, self.pipe_rough)
+        return (fric * self.l / self.id + self.k_minor) * velocity_head
+
+    def headloss_segments(self, q=None):
+        """Return the head loss of every component of the pipeline.
+
+        Args:
+            - ``q (float * u.L / u.s)``: Flow rate, or an array of flow rates
+              (optional, defaults to the flow rate of the first component)
+
+        Returns:
+            - The head loss of each component, with an extra leading dimension
+              for an array of flow rates (float * u.cm)
+        """
+        q = self.q if q is None else q
+        return (self._headloss_segments(q.m_as(u.m**3 / u.s)) * u.m).to(u.cm)
+
+    def headloss(self, q=None):
+        """Return the total head loss of the pipeline.
+
+        Args:
+            - ``q (float * u.L / u.s)``: Flow rate, or an array of flow rates
+              (optional, defaults to the flow rate of the first component)
+        """
+        q = self.q if q is None else q
+        headloss = self._headloss_segments(q.m_as(u.m**3 / u.s)).sum(axis=-1)
+        return (headloss * u.m).to(u.cm)
+
+    def flow(self, headloss, tol=1e-12, maxiter=50):
+        """Return the flow rate through the pipeline that produces a total
+        head loss.
+
+        Every head loss is solved at once with Newton's method on the
+        logarithms of flow rate and head loss, in which the head loss is
+        nearly linear. The first guess scales the head loss at 1 L/s with the
+        square of the flow rate. The friction factor jumps up at the
+        laminar-turbulent transition, so head losses inside that jump have no
+        exact solution and return the flow rate at the transition.
+
+        Args:
+            - ``headloss (float * u.m)``: Total head loss, or an array of head
+              losses
+            - ``tol (float)``: Relative tolerance of the flow rate (optional,
+              defaults to 1e-12)
+            - ``maxiter (int)``: Maximum number of Newton iterations
+              (optional, defaults to 50)
+
+        Returns:
+            - The flow rate for each head loss (float * u.L / u.s)
+
+        Raises:
+            - ``ValueError``: If ``maxiter`` is less than 1
+        """
+        if maxiter < 1:
+            raise ValueError("maxiter is {} but must be at least 1.".format(maxiter))
+        start = telemetry.start()
+        target = np.asarray(u.Quantity(headloss).m_as(u.m), dtype=float)
+        ch._check(target, ">=0", "Head loss")
+        positive = target > 0
+        log_target = np.log(np.where(positive, target, 1))
+
+        def log_headloss(log_q):
+            return np.log(self._headloss_segments(np.exp(log_q)).sum(axis=-1))
+
+        q_ref = 1e-3
+        log_q = (
+            np.log(q_ref)
+            + (log_target - log_headloss(np.full(target.shape, np.log(q_ref)))) / 2
+        )
+        # Bracket the solution. Head loss grows at least linearly with flow
+        # rate, so each expansion of the bracket is large enough.
+        low, high = log_q - 1, log_q + 1
+        for _ in range(maxiter):
+            too_high = log_headloss(low) > log_target
+            too_low = log_headloss(high) < log_target
+            if not (too_high | too_low).any():
+                break
+            low = np.where(too_high, low - 2, low)
+            high = np.where(too_low, high + 2, high)
+        # The friction factor jumps at the laminar-turbulent transition, so a
+        # Newton step that leaves the bracket, or that is not half as long as
+        # the step before it, is replaced by bisection.
+        step = high - low
+        for iterations in range(1, maxiter + 1):
+            residual = log_headloss(log_q) - log_target
+            low = np.where(residual < 0, log_q, low)
+            high = np.where(residual > 0, log_q, high)
+            converged = ~positive | (np.abs(residual) <= tol) | (high - low <= tol)
+            if converged.all():
+                break
+            slope = (log_headloss(log_q + 1e-7) - residual - log_target) / 1e-7
+            newton = residual / slope
+            bisect = (np.abs(newton) > np.abs(step) / 2) | ~(
+                (log_q - newton > low) & (log_q - newton < high)
+            )
+            step = np.where(bisect, log_q - (low + high) / 2, newton)
+            log_q = log_q - step
+        else:
+            warnings.warn(
+                "flow did not converge for {} of {} head losses.".format(
+                    np.count_nonzero(~converged), target.size
+                ),
+                UserWarning,
+            )
+        telemetry.record(
+            "CompiledPipeline.flow",
+            start,
+            iterations,
+            np.max(np.abs(np.where(positive, residual, 0)), initial=0),
+            converged.all(),
+            {"n": target.size},
+        )
+        flow = np.where(positive, np.exp(log_q), 0)
+        return (flow * u.m**3 / u.s).to(u.L / u.s)
+
+
 class Pipe(PipelineComponent):
     """Design class for a pipe
 
@@ -257,6 +455,8 @@ class Pipe(PipelineComponent):
 
     AVAILABLE_SPECS = ["sdr26", "sdr41", "sch40"]
 
+    OUTPUTS = ("od", "headloss")
+
     def __init__(self, **kwargs):
         self.id = 0.476 * u.inch
         self.spec = "sdr41"
@@ -412,6 +612,8 @@ class Elbow(PipelineComponent):
 
     AVAILABLE_ANGLES = [90 * u.deg, 45 * u.deg]
 
+    OUTPUTS = ("headloss",)
+
     def __init__(self, **kwargs):
         self.angle = 90 * u.deg
         self.id = 0.848 * u.inch
@@ -454,6 +656,10 @@ class Elbow(PipelineComponent):
         self.size = AVAILABLE_FITTING_SIZES[myindex]
         return AVAILABLE_FITTING_IDS[myindex]
 
+    def _k_minor_next(self):
+        """The minor loss coefficient along the flow path."""
+        return self.k_minor
+
     @property
     def headloss(self):
         """The headloss"""
@@ -520,6 +726,8 @@ class Tee(PipelineComponent):
 
     AVAILABLE_PATHS = ["branch", "run", "stopper"]
 
+    OUTPUTS = ("headloss",)
+
     def __init__(self, **kwargs):
         self.left = None
         self.left_type = "branch"
@@ -568,6 +776,17 @@ class Tee(PipelineComponent):
             self.next = self.left
             self.next_type = self.left_type
 
+    def _successors(self):
+        """The components after the outlets of this tee that are not
+        stoppered.
+        """
+        outlets = [(self.left, self.left_type), (self.right, self.right_type)]
+        return [
+            outlet
+            for outlet, outlet_type in outlets
+            if outlet is not None and outlet_type != "stopper"
+        ]
+
     def _headloss_left(self):
         """The headloss of the left outlet"""
         return pc.headloss_minor_elbow(self.q, self.id, self.left_k_minor).to(u.cm)
@@ -576,6 +795,13 @@ class Tee(PipelineComponent):
         """The headloss of the right outlet"""
         return pc.headloss_minor_elbow(self.q, self.id, self.right_k_minor).to(u.cm)
 
+    def _k_minor_next(self):
+        """The minor loss coefficient of the outlet that the flow takes."""
+        if self.left_type == "stopper":
+            return self.right_k_minor
+        else:
+            return self.left_k_minor
+
     @property
     def headloss(self):
         """The headloss"""
@@ -12,8 +12,10 @@ class Plant(Component):
         self.subcomponents = [self.etf, self.sed]
 
         super().__init__(**kwargs)
-        super().set_subcomponents()
+        self._design()
 
+    def _design(self):
+        super().set_subcomponents()
         self.design_floc()
 
     def design_floc(self):
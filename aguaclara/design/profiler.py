@@ -0,0 +1,267 @@
+"""Profile the properties and physchem functions that a design evaluates.
+
+Inside of a ``with profile() as p:`` block, every evaluation of a memoized
+property of a :class:`aguaclara.design.component.Component` and every call of
+a function of :mod:`aguaclara.core.physchem` is recorded in a call tree. Each
+node of the tree counts the calls of a property or function from the same
+chain of callers, and their total and self time. The self time excludes the
+time spent in the properties and functions that it called. Cached properties
+are not evaluated, so reading them again is not recorded. Only the thread
+that runs the ``with`` block is profiled.
+
+``Profile.report()`` lists the properties and functions by their self time,
+and ``Profile.folded()`` returns the tree in the folded stack format that
+flame graph tools, such as ``flamegraph.pl`` and speedscope, read.
+
+Example:
+    >>> from aguaclara.core.units import u
+    >>> from aguaclara.design.profiler import profile
+    >>> from aguaclara.design.floc import Flocculator
+    >>> with profile() as p:
+    ...     floc = Flocculator(q=30 * u.L / u.s)
+    >>> p.stats["Flocculator.chan_w"].calls
+    1
+    >>> p.folded().splitlines()[0].startswith("Flocculator.")
+    True
+"""
+
+import aguaclara.core.physchem as pc
+import aguaclara.design.component as component_module
+
+from collections import namedtuple
+import functools
+import inspect
+import time
+
+FunctionStats = namedtuple(
+    "FunctionStats", ["calls", "time", "self_time", "max_recursion"]
+)
+FunctionStats.__doc__ = """Statistics of a property or function over all of
+the chains of callers that called it.
+
+``time`` (s) counts the time of recursive calls once, and ``max_recursion``
+is the largest number of calls of the property or function that were
+running at once."""
+
+# The profile that is running, in any thread. Profiles replace the functions
+# of their modules, so only one can run at a time.
+_running = None
+
+_SORT_KEYS = {
+    "self_time": lambda stats: stats.self_time,
+    "time": lambda stats: stats.time,
+    "calls": lambda stats: stats.calls,
+}
+
+
+class ProfileNode:
+    """A property or function in the call tree of a profile.
+
+    Attributes:
+        - ``name (str)``: Name of the property, such as
+          ``Flocculator.chan_w``, or of the function, such as
+          ``physchem.viscosity_kinematic_water``
+        - ``calls (int)``: Number of calls from this chain of callers
+        - ``time (float)``: Total time of the calls (s)
+        - ``self_time (float)``: Time of the calls, excluding the properties
+          and functions that they called (s)
+        - ``children (dict)``: The nodes of the properties and functions that
+          the calls called, by name
+    """
+
+    __slots__ = ("name", "calls", "time", "self_time", "children")
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.time = 0.0
+        self.self_time = 0.0
+        self.children = {}
+
+    def walk(self, path=()):
+        """Yield the path of names to every node below this one, and the
+        node, depth first.
+        """
+        for child in self.children.values():
+            child_path = path + (child.name,)
+            yield child_path, child
+            yield from child.walk(child_path)
+
+
+class Profile:
+    """The call tree of the properties and physchem functions that were
+    evaluated inside of a ``with`` block. Use :func:`profile` to make one.
+
+    Attributes:
+        - ``root (ProfileNode)``: Root of the call tree. Its time is the wall
+          time of the ``with`` block, and its self time is the time spent
+          outside of any property or function.
+        - ``max_depth (int)``: Largest number of properties and functions
+          that were running at once
+    """
+
+    def __init__(self, modules=(pc,)):
+        self.modules = tuple(modules)
+        self.root = ProfileNode("<root>")
+        self.max_depth = 0
+        self._stack = []
+        self._running = {}
+        self._stats = {}
+        self._originals = []
+
+    def __enter__(self):
+        global _running
+        if _running is not None:
+            raise RuntimeError("Another profile is already running.")
+        _running = self
+        for module in self.modules:
+            for name, func in list(vars(module).items()):
+                if (
+                    inspect.isfunction(func)
+                    and not name.startswith("_")
+                    and func.__module__ == module.__name__
+                ):
+                    self._originals.append((module, name, func))
+                    setattr(module, name, self._wrap(func, module, name))
+        component_module._state.profiler = self
+        self._stack = [[self.root, time.perf_counter(), 0.0]]
+        return self
+
+    def __exit__(self, *exc_info):
+        global _running
+        _running = None
+        component_module._state.profiler = None
+        for module, name, func in self._originals:
+            setattr(module, name, func)
+        self._originals = []
+        # Close the calls that an error left running.
+        while len(self._stack) > 1:
+            self.exit()
+        node, start, child_time = self._stack.pop()
+        elapsed = time.perf_counter() - start
+        node.time += elapsed
+        node.self_time += elapsed - child_time
+        node.calls += 1
+
+    def _wrap(self, func, module, name):
+        """Return a function that records the calls of ``func``."""
+        qualified = "{}.{}".format(module.__name__.rpartition(".")[2], name)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # Leave out the calls made by other threads.
+            if component_module._state.profiler is not self:
+                return func(*args, **kwargs)
+            self.enter(qualified)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.exit()
+
+        return wrapper
+
+    def enter(self, name):
+        """Record the start of a call of a property or function."""
+        parent = self._stack[-1][0]
+        node = parent.children.get(name)
+        if node is None:
+            node = parent.children[name] = ProfileNode(name)
+        node.calls += 1
+        self._running[name] = self._running.get(name, 0) + 1
+        self._stack.append([node, time.perf_counter(), 0.0])
+        self.max_depth = max(self.max_depth, len(self._stack) - 1)
+        stats = self._stats.setdefault(name, [0, 0.0, 0.0, 0])
+        stats[0] += 1
+        stats[3] = max(stats[3], self._running[name])
+
+    def exit(self):
+        """Record the end of the latest call of a property or function."""
+        node, start, child_time = self._stack.pop()
+        elapsed = time.perf_counter() - start
+        node.time += elapsed
+        node.self_time += elapsed - child_time
+        self._stack[-1][2] += elapsed
+        stats = self._stats[node.name]
+        self._running[node.name] -= 1
+        # Count the time of recursive calls once, in the outermost call.
+        if not self._running[node.name]:
+            stats[1] += elapsed
+        stats[2] += elapsed - child_time
+
+    @property
+    def stats(self):
+        """The statistics of every property and function, by name, over all
+        of their chains of callers (dict of FunctionStats).
+        """
+        return {name: FunctionStats(*stats) for name, stats in self._stats.items()}
+
+    def report(self, sort="self_time", n=None):
+        """Return a table of the statistics of the properties and functions.
+
+        Args:
+            - ``sort (str)``: Statistic to sort by, largest first:
+              "self_time", "time" or "calls" (optional, defaults to
+              "self_time")
+            - ``n (int)``: Number of rows (optional, defaults to all of them)
+
+        Returns:
+            - The table (str)
+        """
+        if sort not in _SORT_KEYS:
+            raise ValueError(
+                "sort is {} but must be one of {}.".format(sort, list(_SORT_KEYS))
+            )
+        rows = sorted(
+            self.stats.items(), key=lambda item: _SORT_KEYS[sort](item[1]), reverse=True
+        )[:n]
+        lines = [
+            "Total time: {:.4g} s, max depth: {}".format(
+                self.root.time, self.max_depth
+            ),
+            "",
+            "{:>8} {:>12} {:>12} {:>9}  {}".format(
+                "calls", "time (s)", "self (s)", "max rec.", "name"
+            ),
+        ]
+        for name, stats in rows:
+            lines.append(
+                "{:>8} {:>12.6f} {:>12.6f} {:>9}  {}".format(
+                    stats.calls, stats.time, stats.self_time, stats.max_recursion, name
+                )
+            )
+        return "\n".join(lines)
+
+    def folded(self):
+        """Return the call tree in the folded stack format of flame graphs.
+
+        Each line is the chain of callers of a node, separated by
+        semicolons, and the self time of the node in microseconds.
+
+        Returns:
+            - The folded stacks, one per line (str)
+        """
+        lines = []
+        for path, node in self.root.walk():
+            microseconds = int(round(node.self_time * 1e6))
+            if microseconds > 0:
+                lines.append("{} {}".format(";".join(path), microseconds))
+        return "\n".join(lines)
+
+
+def profile(modules=None):
+    """Return a profile that records the properties and physchem functions
+    evaluated inside of a ``with`` block.
+
+    The functions are recorded by replacing them in their modules for the
+    duration of the block, so calls of functions that were imported by name
+    with ``from ... import`` are not recorded. Only one profile may run at a
+    time.
+
+    Args:
+        - ``modules (list of modules)``: Modules whose public functions to
+          record (optional, defaults to ``aguaclara.core.physchem``)
+
+    Returns:
+        - The profile (Profile), which is filled in as the block runs
+    """
+    return Profile((pc,) if modules is None else modules)
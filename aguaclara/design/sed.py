@@ -12,6 +12,7 @@ Example:
 from aguaclara.design.sed_chan import SedimentationChannel
 from aguaclara.design.sed_tank import SedimentationTank
 from aguaclara.design.component import Component
+from aguaclara.core.solvers import fixed_point
 from aguaclara.core.units import u
 
 import numpy as np
@@ -37,8 +38,15 @@ class Sedimentor(Component):
         - ``chan (SedimentationChannel)``: Sedimentation Channel
           (optional, see
           :class:`aguaclara.design.sed_chan.SedimentationChannel` for defaults)
+
+    Attributes:
+        - ``sed_convergence (FixedPointResult)``: How the designs of the
+          sedimentation channel and tank converged (see
+          :func:`aguaclara.core.solvers.fixed_point`)
     """
 
+    OUTPUTS = ("tank_n",)
+
     def __init__(self, **kwargs):
         self.wall_thickness = 15.0 * u.cm
 
@@ -47,10 +55,17 @@ class Sedimentor(Component):
         self.subcomponents = [self.tank, self.chan]
 
         super().__init__(**kwargs)
+        # The design converges to different dimensions from different
+        # guesses, so variants made by with_() start from the same guess.
+        self._chan_dims_guess = (
+            self.tank.sed_chan_w_outer,
+            self.tank.sed_chan_weir_thickness,
+        )
+        self._design()
+
+    def _design(self):
         super().set_subcomponents()
-
-        self._design_chan()
-        self._design_tank()
+        self._design_sed()
 
     @property
     def tank_n(self):
@@ -58,6 +73,44 @@ class Sedimentor(Component):
         tank_n = np.ceil(self.q / self.tank.q_tank)
         return int(tank_n)
 
+    @property
+    def sed_convergence(self):
+        """How the designs of the sedimentation channel and tank converged."""
+        return self._sed_convergence
+
+    def _design_sed(self):
+        """Design the sedimentation channel and tank in tandem.
+
+        The channel and tank are redesigned from each other until the outer
+        width and weir thickness of the channel that the tank was designed
+        with match the channel's. The iterations are recorded in
+        ``sed_convergence``.
+        """
+
+        def tank_chan_dims():
+            # The channel dimensions that the tank is designed with
+            return u.Quantity(
+                [
+                    self.tank.sed_chan_w_outer.m_as(u.cm),
+                    self.tank.sed_chan_weir_thickness.m_as(u.cm),
+                ],
+                u.cm,
+            )
+
+        def redesign(chan_dims):
+            self.tank.sed_chan_w_outer = chan_dims[0]
+            self.tank.sed_chan_weir_thickness = chan_dims[1]
+            self._design_chan()
+            self._design_tank()
+            return tank_chan_dims()
+
+        self.tank.sed_chan_w_outer, self.tank.sed_chan_weir_thickness = (
+            self._chan_dims_guess
+        )
+        self._sed_convergence = fixed_point(
+            redesign, tank_chan_dims(), name="Sedimentor._design_sed"
+        )
+
     def _design_chan(self):
         """Design the sedimentation channel based off of the tank."""
         self.chan.sed_tank_n = self.tank_n
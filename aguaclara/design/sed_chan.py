@@ -85,6 +85,35 @@ class SedimentationChannel(Component):
     WEIR_FREEBOARD_H = 2.0 * u.cm
     SED_DEPTH_EST = 2.0 * u.m
 
+    OUTPUTS = (
+        "l",
+        "outlet_weir_hl",
+        "inlet_hl_max",
+        "inlet_w_pre_weir",
+        "inlet_depth",
+        "inlet_weir_hl",
+        "inlet_h",
+        "inlet_weir_h",
+        "inlet_w_post_weir",
+        "inlet_w",
+        "inlet_drain_box_w",
+        "outlet_depth",
+        "outlet_weir_depth",
+        "outlet_w_pre_weir",
+        "outlet_pipe_k_minor",
+        "outlet_pipe_l",
+        "outlet_pipe_q_max",
+        "outlet_pipe_n",
+        "outlet_post_weir_w",
+        "outlet_w",
+        "outlet_drain_box_w",
+        "outlet_weir_h",
+        "w_outer",
+        "inlet_last_coupling_h",
+        "inlet_step_h",
+        "inlet_slope_l",
+    )
+
     def __init__(self, **kwargs):
         self.sed_tank_n = 4
         self.sed_tank_w_inner = 42.0 * u.inch
@@ -111,6 +140,9 @@ class SedimentationChannel(Component):
         self.subcomponents = [self.drain_pipe, self.outlet_pipe]
 
         super().__init__(**kwargs)
+        self._design()
+
+    def _design(self):
         self._set_drain_pipe()
         self._set_outlet_pipe()
         super().set_subcomponents()
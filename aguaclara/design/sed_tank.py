@@ -16,6 +16,7 @@ import aguaclara.core.utility as ut
 from aguaclara.design.component import Component
 import aguaclara.core.physchem as pc
 import aguaclara.core.head_loss as hl
+import aguaclara.core.manifold as manifold
 
 import numpy as np
 import math
@@ -109,6 +110,31 @@ class SedimentationTank(Component):
     WALL_THICKNESS = 0.15 * u.m
     DIFFUSER_L = 15.0 * u.cm
 
+    OUTPUTS = (
+        "q_tank",
+        "diffuser_hl",
+        "diffuser_vel",
+        "diffuser_w_inner",
+        "diffuser_a",
+        "inlet_man_v_max",
+        "inlet_man_nd",
+        "outlet_man_nd",
+        "outlet_man_orifice_d",
+        "plate_l",
+        "outlet_man_orifice_q",
+        "outlet_man_orifice_spacing",
+        "outlet_man_orifice_n",
+        "outlet_orifice_hl",
+        "inlet_man_port_q",
+        "inlet_man_q_ratio",
+        "outlet_man_port_q",
+        "outlet_man_q_ratio",
+        "side_slopes_w",
+        "side_slopes_h",
+        "inlet_man_h",
+        "floc_weir_h",
+    )
+
     def __init__(self, **kwargs):
         self.vel_upflow = 1.0 * u.mm / u.s
         self.l_inner = 5.8 * u.m
@@ -282,6 +308,68 @@ class SedimentationTank(Component):
         )
         return outlet_orifice_hl.to(u.mm)
 
+    @property
+    def inlet_man_flow(self):
+        """The flow distribution of the inlet manifold among the diffusers,
+        which discharge their full velocity head (ManifoldFlow).
+        """
+        return manifold.flow_distribution(
+            self.q_tank,
+            pipe.ID_SDR(self.inlet_man_nd, self.inlet_man_sdr),
+            self.l_inner,
+            self.diffuser_n,
+            self.diffuser_a,
+            pc.viscosity_kinematic_water(self.temp),
+            mat.PVC_PIPE_ROUGH,
+            RatioVCPort=1,
+            Collection=False,
+        )
+
+    @property
+    def outlet_man_flow(self):
+        """The flow distribution of the outlet manifold among its orifices
+        (ManifoldFlow).
+        """
+        return manifold.flow_distribution(
+            self.q_tank,
+            pipe.ID_SDR(self.outlet_man_nd, self.outlet_man_sdr),
+            self.l_inner,
+            self.outlet_man_orifice_n,
+            pc.area_circle(self.outlet_man_orifice_d),
+            pc.viscosity_kinematic_water(self.temp),
+            mat.PVC_PIPE_ROUGH,
+            RatioVCPort=con.VC_ORIFICE_RATIO,
+            Collection=True,
+        )
+
+    @property
+    def inlet_man_port_q(self):
+        """The flow rate through each diffuser of the inlet manifold, from the
+        inlet end of the manifold to its dead end.
+        """
+        return self.inlet_man_flow.port_flow.to(u.L / u.s)
+
+    @property
+    def inlet_man_q_ratio(self):
+        """The ratio of the smallest to the largest diffuser flow rate of the
+        inlet manifold.
+        """
+        return self.inlet_man_flow.uniformity
+
+    @property
+    def outlet_man_port_q(self):
+        """The flow rate through each orifice of the outlet manifold, from the
+        outlet end of the manifold to its dead end.
+        """
+        return self.outlet_man_flow.port_flow.to(u.L / u.s)
+
+    @property
+    def outlet_man_q_ratio(self):
+        """The ratio of the smallest to the largest orifice flow rate of the
+        outlet manifold.
+        """
+        return self.outlet_man_flow.uniformity
+
     @property
     def side_slopes_w(self):
         """The width of the side slopes."""
@@ -0,0 +1,179 @@
+"""Evaluate the design of a component over a grid of design inputs.
+
+:func:`sweep` designs a component once for every point of a grid of inputs,
+such as flow rates, temperatures and expert inputs, and collects the
+requested properties into a table. The points are split into chunks that are
+designed in parallel by a pool of worker processes. Quantities cross process
+boundaries as plain magnitudes and unit strings, since Pint quantities are
+slow to pickle and tied to the unit registry of the process that made them.
+
+Example:
+    >>> from aguaclara.core.units import u
+    >>> from aguaclara.design.floc import Flocculator
+    >>> from aguaclara.design.sweep import sweep
+    >>> table = sweep(
+    ...     Flocculator,
+    ...     {"q": [20, 60] * u.L / u.s, "hl": [40, 50] * u.cm},
+    ...     outputs=["chan_w", "chan_n"],
+    ...     workers=1,
+    ... )
+    >>> table["chan_w"].tolist()
+    [34, 27, 101, 81]
+    >>> table.attrs["units"]["chan_w"]
+    'centimeter'
+"""
+
+from aguaclara.core.units import u
+
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import itertools
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+_Encoded = namedtuple("_Encoded", ["magnitude", "units"])
+
+
+def encode(value):
+    """Replace a quantity with its magnitude and the string of its units, to
+    send it to another process. Other values are returned unchanged.
+    """
+    if isinstance(value, u.Quantity):
+        return _Encoded(value.magnitude, str(value.units))
+    return value
+
+
+def decode(value):
+    """Rebuild a quantity that was encoded with :func:`encode`."""
+    if isinstance(value, _Encoded):
+        return u.Quantity(value.magnitude, value.units)
+    return value
+
+
+def _get(component, output):
+    """Return an attribute of a component, following dotted paths into its
+    subcomponents.
+    """
+    for name in output.split("."):
+        component = getattr(component, name)
+    return component
+
+
+def _design_chunk(component_class, outputs, points):
+    """Design a component at each point and return the encoded outputs, or
+    the error that the design raised.
+    """
+    results = []
+    for point in points:
+        try:
+            component = component_class(
+                **{name: decode(value) for name, value in point.items()}
+            )
+            results.append(
+                ([encode(_get(component, output)) for output in outputs], None)
+            )
+        except Exception as error:
+            results.append((None, "{}: {}".format(type(error).__name__, error)))
+    return results
+
+
+def _grid_points(grid):
+    """Return the points of a grid as a list of dictionaries."""
+    if isinstance(grid, dict):
+        names = list(grid)
+        values = [
+            list(value) if np.ndim(getattr(value, "magnitude", value)) else [value]
+            for value in grid.values()
+        ]
+        return [dict(zip(names, point)) for point in itertools.product(*values)]
+    return [dict(point) for point in grid]
+
+
+def _column(values):
+    """Return the magnitudes and units of a column of encoded values.
+
+    Quantities are converted to the units of the first of them, and missing
+    values are NaN.
+    """
+    units = next((v.units for v in values if isinstance(v, _Encoded)), None)
+    if units is None:
+        return values, None
+    column = []
+    for value in values:
+        if isinstance(value, _Encoded):
+            if value.units != units:
+                value = _Encoded(
+                    u.Quantity(value.magnitude, value.units).m_as(units), units
+                )
+            column.append(value.magnitude)
+        else:
+            column.append(np.nan if value is None else value)
+    return column, units
+
+
+def sweep(component_class, grid, outputs, workers=None, chunksize=None):
+    """Design a component at every point of a grid of design inputs.
+
+    Args:
+        - ``component_class (Component subclass)``: The component to design,
+          such as ``Flocculator`` or ``Plant``
+        - ``grid (dict or list of dicts)``: Either a dictionary from the names
+          of design inputs to their values, whose every combination is
+          designed, or a list of dictionaries of design inputs, one per point
+        - ``outputs (list of str)``: Properties to record. Properties of
+          subcomponents are named by their path, such as ``"floc.chan_w"``.
+        - ``workers (int)``: Number of worker processes. 1 designs every point
+          in this process. (optional, defaults to the number of CPUs)
+        - ``chunksize (int)``: Number of points that each worker designs at a
+          time (optional, defaults to a quarter of the points per worker)
+
+    Returns:
+        - A ``pandas.DataFrame`` with one row per point, one column per design
+          input and output, and an ``error`` column with the error that the
+          design of the point raised, if any. Quantities are stored as
+          magnitudes, and ``DataFrame.attrs["units"]`` maps their columns to
+          their units.
+    """
+    points = _grid_points(grid)
+    outputs = list(outputs)
+    encoded = [{name: encode(v) for name, v in point.items()} for point in points]
+    workers = os.cpu_count() if workers is None else int(workers)
+    if workers < 1:
+        raise ValueError("workers is {} but must be at least 1.".format(workers))
+    if chunksize is None:
+        chunksize = max(1, math.ceil(len(points) / (4 * workers)))
+    chunks = [encoded[i : i + chunksize] for i in range(0, len(encoded), chunksize)]
+
+    if workers == 1 or len(chunks) == 1:
+        results = [_design_chunk(component_class, outputs, c) for c in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(
+                executor.map(
+                    _design_chunk,
+                    itertools.repeat(component_class),
+                    itertools.repeat(outputs),
+                    chunks,
+                )
+            )
+    results = list(itertools.chain.from_iterable(results))
+
+    columns = {}
+    units = {}
+    names = list(dict.fromkeys(name for point in encoded for name in point))
+    for name in names:
+        columns[name], units[name] = _column([point.get(name) for point in encoded])
+    for i, output in enumerate(outputs):
+        columns[output], units[output] = _column(
+            [None if values is None else values[i] for values, _ in results]
+        )
+    columns["error"] = [error for _, error in results]
+
+    table = pd.DataFrame(columns)
+    table.attrs["units"] = {
+        name: column_units for name, column_units in units.items() if column_units
+    }
+    return table
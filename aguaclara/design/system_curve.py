@@ -0,0 +1,246 @@
+"""System curves relate the flow rate through plant piping to the head loss
+that it causes.
+
+A ``SystemCurve`` samples a head loss function over a range of flow rates,
+once, and stores a monotone interpolant of the samples. It then answers both
+"what head loss does this flow rate cause?" and "what flow rate does this head
+loss drive?" for a flow rate or an array of them, without evaluating the head
+loss function again. The samples are refined where the interpolant is least
+accurate, which is where the curve bends the most, and can be saved to a file
+and loaded again.
+
+Example:
+    >>> from aguaclara.core.units import u
+    >>> from aguaclara.design.pipeline import Pipe, Elbow
+    >>> from aguaclara.design.system_curve import SystemCurve
+    >>> pipeline = Pipe(
+    ...     size=6 * u.inch, next=Elbow(size=6 * u.inch, next=Pipe(size=6 * u.inch))
+    ... )
+    >>> curve = SystemCurve.from_pipeline(pipeline, 60 * u.L / u.s)
+    >>> curve.flow(20 * u.cm).round(3)
+    <Quantity(37.402, 'liter / second')>
+    >>> curve.headloss([20, 40] * u.L / u.s).round(3)
+    <Quantity([ 5.798 22.849], 'centimeter')>
+"""
+
+from aguaclara.core.units import u
+
+import json
+
+import numpy as np
+from scipy.interpolate import PchipInterpolator
+
+# Unit conversions are looked up once per pair of units, since converting
+# with Pint takes much longer than interpolating.
+_FACTORS = {}
+
+
+def _magnitude(value, units):
+    """Return the magnitude of ``value`` in ``units`` as an array."""
+    if not isinstance(value, u.Quantity):
+        value = u.Quantity(value)
+    key = (value.units, units)
+    if key not in _FACTORS:
+        _FACTORS[key] = u.Quantity(1, value.units).m_as(units)
+    return np.asarray(value.magnitude, dtype=float) * _FACTORS[key]
+
+
+class SystemCurve:
+    """The head loss of plant piping as a function of flow rate.
+
+    A ``SystemCurve`` may be instantiated directly from samples of the curve,
+    or with ``from_function`` or ``from_pipeline``, which sample the curve
+    adaptively. Queries outside of the sampled range of flow rates or head
+    losses raise a ``ValueError`` rather than extrapolate.
+
+    Args:
+        - ``flow (float * u.L / u.s array)``: Flow rates, strictly increasing
+        - ``headloss (float * u.cm array)``: Head loss at each flow rate,
+          strictly increasing
+    """
+
+    def __init__(self, flow, headloss):
+        self._flow = np.asarray(u.Quantity(flow).m_as(u.m**3 / u.s), dtype=float)
+        self._headloss = np.asarray(u.Quantity(headloss).m_as(u.m), dtype=float)
+        if self._flow.ndim != 1 or self._flow.shape != self._headloss.shape:
+            raise ValueError("flow and headloss must be 1D arrays of the same length.")
+        if self._flow.size < 2:
+            raise ValueError("A system curve needs at least two samples.")
+        if np.any(np.diff(self._flow) <= 0) or np.any(np.diff(self._headloss) <= 0):
+            raise ValueError("flow and headloss must both be strictly increasing.")
+        self._forward = PchipInterpolator(self._flow, self._headloss)
+        self._inverse = PchipInterpolator(self._headloss, self._flow)
+
+    @classmethod
+    def from_function(
+        cls,
+        func,
+        flow_max,
+        flow_min=0 * u.L / u.s,
+        flow_arg="FlowRate",
+        rtol=1e-4,
+        num_points=17,
+        max_points=4097,
+        **known
+    ):
+        """Sample a head loss function and return its system curve.
+
+        The function is first evaluated at ``num_points`` evenly spaced flow
+        rates, all at once. Then, as long as the interpolant misses the
+        function at the midpoint of any interval by more than ``rtol``, in
+        either head loss or flow rate, those intervals are split in half and
+        their midpoints evaluated together. Intervals shorter than a millionth
+        of the range of flow rates are not split, so the curve remains coarse
+        across a jump in head loss, such as the one at the laminar-turbulent
+        transition.
+
+        Args:
+            - ``func (function)``: Head loss function, such as
+              ``physchem.headloss_pipe``, that accepts an array of flow rates
+            - ``flow_max (float * u.L / u.s)``: Largest flow rate of the curve
+            - ``flow_min (float * u.L / u.s)``: Smallest flow rate of the curve
+              (optional, defaults to 0)
+            - ``flow_arg (str)``: Name of the flow rate argument of ``func``
+              (optional, defaults to "FlowRate")
+            - ``rtol (float)``: Relative tolerance of the interpolant
+              (optional, defaults to 1e-4)
+            - ``num_points (int)``: Number of initial samples (optional,
+              defaults to 17)
+            - ``max_points (int)``: Largest number of samples (optional,
+              defaults to 4097)
+            - ``**known``: The other arguments of ``func``
+
+        Returns:
+            - The system curve of ``func`` (SystemCurve)
+        """
+        low = u.Quantity(flow_min).m_as(u.m**3 / u.s)
+        high = u.Quantity(flow_max).m_as(u.m**3 / u.s)
+        if not 0 <= low < high:
+            raise ValueError("flow_min must be at least 0 and less than flow_max.")
+
+        def headloss(q):
+            # No flow causes no head loss, and many physchem functions only
+            # accept positive flow rates.
+            values = np.zeros(q.shape)
+            positive = q > 0
+            result = func(**{flow_arg: q[positive] * u.m**3 / u.s}, **known)
+            values[positive] = u.Quantity(result).m_as(u.m)
+            return values
+
+        flow = np.linspace(low, high, int(num_points))
+        values = headloss(flow)
+        while flow.size < max_points:
+            curve = cls(flow * u.m**3 / u.s, values * u.m)
+            midpoints = (flow[:-1] + flow[1:]) / 2
+            true = headloss(midpoints)
+            bad = np.abs(curve._forward(midpoints) - true) > rtol * true
+            bad |= np.abs(curve._inverse(true) - midpoints) > rtol * midpoints
+            # A jump in the head loss, such as at the laminar-turbulent
+            # transition, can't be resolved by refining.
+            bad &= np.diff(flow) > 1e-6 * (high - low)
+            if not bad.any():
+                return curve
+            # Refine no further than max_points.
+            bad = np.flatnonzero(bad)[: max_points - flow.size]
+            flow = np.insert(flow, bad + 1, midpoints[bad])
+            values = np.insert(values, bad + 1, true[bad])
+        return cls(flow * u.m**3 / u.s, values * u.m)
+
+    @classmethod
+    def from_pipeline(cls, pipeline, flow_max, **kwargs):
+        """Return the system curve of a pipeline component and its next
+        components.
+
+        Args:
+            - ``pipeline (PipelineComponent)``: First component of the pipeline
+            - ``flow_max (float * u.L / u.s)``: Largest flow rate of the curve
+            - ``**kwargs``: Other arguments of ``from_function``
+
+        Returns:
+            - The system curve of the pipeline (SystemCurve)
+        """
+        compiled = pipeline.compile()
+        return cls.from_function(
+            lambda FlowRate: compiled.headloss(FlowRate), flow_max, **kwargs
+        )
+
+    @property
+    def flow_range(self):
+        """The smallest and largest flow rates of the curve."""
+        return (self._flow[[0, -1]] * u.m**3 / u.s).to(u.L / u.s)
+
+    @property
+    def headloss_range(self):
+        """The smallest and largest head losses of the curve."""
+        return (self._headloss[[0, -1]] * u.m).to(u.cm)
+
+    def __len__(self):
+        return self._flow.size
+
+    def _check_range(self, values, samples, name):
+        if np.any(values < samples[0]) or np.any(values > samples[-1]):
+            raise ValueError(
+                "{} is outside of the range of the system curve.".format(name)
+            )
+
+    def headloss(self, flow):
+        """Return the head loss at a flow rate.
+
+        Args:
+            - ``flow (float * u.L / u.s)``: Flow rate, or an array of flow
+              rates
+
+        Returns:
+            - Head loss (float * u.cm)
+        """
+        q = _magnitude(flow, u.m**3 / u.s)
+        self._check_range(q, self._flow, "Flow rate")
+        return u.Quantity(self._forward(q) * 100, u.cm)
+
+    def flow(self, headloss):
+        """Return the flow rate that a head loss drives.
+
+        Args:
+            - ``headloss (float * u.cm)``: Head loss, or an array of head
+              losses
+
+        Returns:
+            - Flow rate (float * u.L / u.s)
+        """
+        h = _magnitude(headloss, u.m)
+        self._check_range(h, self._headloss, "Head loss")
+        return u.Quantity(self._inverse(h) * 1000, u.L / u.s)
+
+    def save(self, path):
+        """Save the samples of the curve to a JSON file.
+
+        Args:
+            - ``path (str)``: Path of the file
+        """
+        with open(path, "w") as file:
+            json.dump(
+                {
+                    "flow": self._flow.tolist(),
+                    "flow_units": "m**3/s",
+                    "headloss": self._headloss.tolist(),
+                    "headloss_units": "m",
+                },
+                file,
+            )
+
+    @classmethod
+    def load(cls, path):
+        """Load a system curve that was saved with ``save``.
+
+        Args:
+            - ``path (str)``: Path of the file
+
+        Returns:
+            - The system curve (SystemCurve)
+        """
+        with open(path) as file:
+            data = json.load(file)
+        return cls(
+            np.array(data["flow"]) * u(data["flow_units"]),
+            np.array(data["headloss"]) * u(data["headloss_units"]),
+        )
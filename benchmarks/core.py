@@ -0,0 +1,263 @@
+"""Benchmarks of the hydraulics of :mod:`aguaclara.core` at scale.
+
+Every benchmark is run for a scalar input and for arrays of 1 000, 100 000 and
+1 000 000 elements. The functions of physchem, head_loss and pipes are wrapped
+with :func:`aguaclara.core.utility.list_handler`, which calls them once per
+element, at a cost of 0.1 to 100 ms per element. Their benchmarks skip the
+arrays larger than ``ELEMENTWISE_MAX`` elements, which would take hours, and
+are reported as ``n/a`` by asv. The array-native functions of
+:mod:`aguaclara.core.channels`, :func:`aguaclara.core.solvers.solve_for` and
+``CompiledPipeline`` are run at every scale, and show the gain of
+vectorization over their elementwise counterparts.
+"""
+
+from aguaclara.core.units import u
+from aguaclara.core import channels
+from aguaclara.core import head_loss as hl
+from aguaclara.core import kernels
+from aguaclara.core import physchem as pc
+from aguaclara.core import pipes as pipe
+from aguaclara.core.solvers import solve_for
+from aguaclara.design.pipeline import Elbow, Pipe, Tee
+
+import numpy as np
+
+#: The scales of the benchmarks: a scalar, or the number of elements
+SIZES = ["scalar", 1_000, 100_000, 1_000_000]
+
+#: Largest number of elements of the benchmarks of elementwise functions
+ELEMENTWISE_MAX = 1_000
+
+NU = 1e-6 * u.m**2 / u.s
+ROUGHNESS = 0.12 * u.mm
+
+
+def values(size, low, high, units):
+    """Return a scalar between ``low`` and ``high``, or an array of ``size``
+    values spread over that range, in ``units``.
+    """
+    if size == "scalar":
+        return np.sqrt(low * high) * units
+    return np.geomspace(low, high, size) * units
+
+
+def skip_elementwise(size):
+    """Skip a benchmark of an elementwise function at large sizes."""
+    if size != "scalar" and size > ELEMENTWISE_MAX:
+        # asv skips a benchmark whose setup raises NotImplementedError.
+        raise NotImplementedError
+
+
+def pipeline():
+    """Return a compiled pipeline of two pipes, an elbow and a tee."""
+    return Pipe(
+        q=20 * u.L / u.s,
+        size=6 * u.inch,
+        next=Elbow(
+            size=6 * u.inch,
+            next=Pipe(size=6 * u.inch, l=4 * u.m, next=Tee(size=6 * u.inch)),
+        ),
+    ).compile()
+
+
+# The arguments of each benchmarked function, as functions of the size. The
+# first argument varies; list_handler evaluates the outer product of every
+# array argument, so the others are scalars.
+PHYSCHEM = {
+    "viscosity_kinematic_water": lambda n: (values(n, 1, 30, u.degC),),
+    "re_pipe": lambda n: (values(n, 1, 200, u.L / u.s), 0.1 * u.m, NU),
+    "fric_pipe": lambda n: (values(n, 1, 200, u.L / u.s), 0.1 * u.m, NU, ROUGHNESS),
+    "headloss_major_pipe": lambda n: (
+        values(n, 1, 200, u.L / u.s), 0.1 * u.m, 10 * u.m, NU, ROUGHNESS
+    ),
+    "headloss_rect": lambda n: (
+        values(n, 1, 200, u.L / u.s), 20 * u.cm, 50 * u.cm, 10 * u.m, 2, NU,
+        ROUGHNESS, True,
+    ),
+    "flow_orifice": lambda n: (1 * u.cm, values(n, 1, 100, u.cm), 0.62),
+}
+
+CHANNELS = {
+    "headloss_rect": PHYSCHEM["headloss_rect"],
+    "hydraulics_rect": PHYSCHEM["headloss_rect"],
+}
+
+HEAD_LOSS = {
+    "k_value_expansion": lambda n: (
+        values(n, 2, 10, u.cm), 10 * u.cm, 10 * u.L / u.s
+    ),
+    "k_value_reduction": lambda n: (
+        values(n, 11, 20, u.cm), 10 * u.cm, 10 * u.L / u.s
+    ),
+    "k_value_orifice": lambda n: (
+        10 * u.cm, values(n, 2, 8, u.cm), 5 * u.mm, 10 * u.L / u.s
+    ),
+}
+
+PIPES = {
+    "OD": lambda n: (values(n, 0.5, 12, u.inch),),
+    "ID_SDR": lambda n: (values(n, 0.5, 12, u.inch), 26),
+    "ND_available": lambda n: (values(n, 0.5, 12, u.inch),),
+    "ND_SDR_available": lambda n: (values(n, 1, 30, u.cm), 26),
+}
+
+ITERATIVE = {
+    "flow_pipe": lambda n: (
+        values(n, 5, 50, u.cm), 0.4 * u.m, 20 * u.m, NU, ROUGHNESS, 2
+    ),
+    "diam_pipe": lambda n: (
+        values(n, 1, 200, u.L / u.s), 0.4 * u.m, 20 * u.m, NU, ROUGHNESS, 2
+    ),
+    "manifold_id": lambda n: (
+        values(n, 1, 200, u.L / u.s), 4 * u.cm, 5.8 * u.m, 0.8, NU, ROUGHNESS,
+        1, 58,
+    ),
+    "horiz_chan_w": lambda n: (
+        values(n, 1, 200, u.L / u.s), 50 * u.cm, 1 * u.mm, 5 * u.m, NU,
+        2 * u.mm, False, 0,
+    ),
+    "horiz_chan_h": lambda n: (
+        values(n, 1, 200, u.L / u.s), 40 * u.cm, 1 * u.mm, 5 * u.m, NU,
+        2 * u.mm, False,
+    ),
+}
+
+
+class PhysChem:
+    """Elementwise physchem functions."""
+
+    params = [list(PHYSCHEM), SIZES]
+    param_names = ["function", "size"]
+    timeout = 600
+
+    def setup(self, function, size):
+        skip_elementwise(size)
+        self.function = getattr(pc, function)
+        self.args = PHYSCHEM[function](size)
+
+    def time_physchem(self, function, size):
+        self.function(*self.args)
+
+
+class Channels:
+    """Array-native counterparts of the rectangular channel functions of
+    physchem.
+    """
+
+    params = [list(CHANNELS), SIZES]
+    param_names = ["function", "size"]
+
+    def setup(self, function, size):
+        self.function = getattr(channels, function)
+        self.args = CHANNELS[function](size)
+
+    def time_channels(self, function, size):
+        self.function(*self.args)
+
+
+class HeadLoss:
+    """Minor loss coefficients of fittings and orifices."""
+
+    params = [list(HEAD_LOSS), SIZES]
+    param_names = ["function", "size"]
+    timeout = 600
+
+    def setup(self, function, size):
+        skip_elementwise(size)
+        self.function = getattr(hl, function)
+        self.args = HEAD_LOSS[function](size)
+
+    def time_k_value(self, function, size):
+        self.function(*self.args)
+
+
+class Pipes:
+    """Lookups of pipe sizes."""
+
+    params = [list(PIPES), SIZES]
+    param_names = ["function", "size"]
+    timeout = 600
+
+    def setup(self, function, size):
+        skip_elementwise(size)
+        self.function = getattr(pipe, function)
+        self.args = PIPES[function](size)
+
+    def time_lookup(self, function, size):
+        self.function(*self.args)
+
+
+class IterativeSolvers:
+    """The iterative solvers of physchem, with each backend of
+    :mod:`aguaclara.core.kernels`.
+    """
+
+    params = [list(ITERATIVE), SIZES, ["pint", "numpy", "numba"]]
+    param_names = ["solver", "size", "backend"]
+    timeout = 600
+
+    def setup(self, solver, size, backend):
+        skip_elementwise(size)
+        if backend == "numba" and not kernels.numba_available():
+            raise NotImplementedError
+        self.backend = kernels.get_backend()
+        kernels.set_backend(backend)
+        self.function = getattr(pc, solver)
+        self.args = ITERATIVE[solver](size)
+        # Compile the Numba kernels before timing.
+        self.function(*ITERATIVE[solver]("scalar"))
+
+    def teardown(self, solver, size, backend):
+        kernels.set_backend(self.backend)
+
+    def time_solver(self, solver, size, backend):
+        self.function(*self.args)
+
+
+class VectorizedSolvers:
+    """Solvers that solve every element of an array at once: the channel
+    width of a head loss with :func:`aguaclara.core.solvers.solve_for`, and
+    the flow rate of a head loss through a compiled pipeline.
+    """
+
+    params = [["solve_for", "CompiledPipeline.flow"], SIZES]
+    param_names = ["solver", "size"]
+    timeout = 600
+
+    def setup(self, solver, size):
+        self.headloss = values(size, 0.5, 20, u.cm)
+        self.pipeline = pipeline()
+
+    def time_solver(self, solver, size):
+        if solver == "solve_for":
+            solve_for(
+                channels.headloss_rect,
+                self.headloss,
+                unknown="Width",
+                bounds=(1 * u.cm, 1 * u.m),
+                FlowRate=20 * u.L / u.s,
+                Depth=0.5 * u.m,
+                Length=10 * u.m,
+                KMinor=2,
+                Nu=NU,
+                Roughness=ROUGHNESS,
+                OpenChannel=True,
+            )
+        else:
+            self.pipeline.flow(self.headloss)
+
+
+class PipelineHeadLoss:
+    """The head loss of a compiled pipeline at many flow rates, which every
+    iteration of ``CompiledPipeline.flow`` evaluates.
+    """
+
+    params = [SIZES]
+    param_names = ["size"]
+
+    def setup(self, size):
+        self.q = values(size, 1, 200, u.L / u.s)
+        self.pipeline = pipeline()
+
+    def time_headloss(self, size):
+        self.pipeline.headloss(self.q)
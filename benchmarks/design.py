@@ -0,0 +1,96 @@
+"""End-to-end benchmarks of the design of AguaClara components.
+
+Each benchmark designs a component for a flow rate from 1 to 200 L/s and
+serializes every one of its properties with ``serialize_properties()``, as
+the Onshape integration does, which evaluates every declared output of the
+component and its subcomponents. Each component and flow rate reports:
+
+- ``time_design``: The wall time of the design (s)
+- ``track_peak_memory``: The largest memory that the design allocated at once
+  (bytes), as measured by :mod:`tracemalloc`
+- ``track_physchem_calls``: The number of calls of physchem functions, as
+  counted by :func:`aguaclara.design.profiler.profile`, including calls of
+  physchem functions from other physchem functions
+
+Caches that live longer than a component, such as those of pipe sizes, are
+filled by a design in the setup, so the benchmarks measure designs in a
+long-running batch. ``asv compare`` reports the change of each of them between
+two commits. The CDC's stock tanks are too small for flow rates above about
+40 L/s, so its benchmarks of those flow rates are reported as ``n/a``.
+"""
+
+from aguaclara.core.units import u
+from aguaclara.design.cdc import CDC
+from aguaclara.design.ent import EntranceTank
+from aguaclara.design.ent_floc import EntTankFloc
+from aguaclara.design.floc import Flocculator
+from aguaclara.design.lfom import LFOM
+from aguaclara.design.plant import Plant
+from aguaclara.design.profiler import profile
+from aguaclara.design.sed import Sedimentor
+from aguaclara.design.sed_chan import SedimentationChannel
+from aguaclara.design.sed_tank import SedimentationTank
+
+import tracemalloc
+
+COMPONENTS = {
+    cls.__name__: cls
+    for cls in (
+        Flocculator,
+        EntranceTank,
+        EntTankFloc,
+        LFOM,
+        SedimentationTank,
+        SedimentationChannel,
+        Sedimentor,
+        CDC,
+        Plant,
+    )
+}
+
+#: The flow rates of the designs (L/s)
+FLOWS = [1, 5, 20, 50, 100, 200]
+
+
+def design(component, q):
+    """Design a component for a flow rate (L/s) and serialize it."""
+    return COMPONENTS[component](q=q * u.L / u.s).serialize_properties()
+
+
+class Design:
+    """Design and serialize each component for each flow rate."""
+
+    params = [list(COMPONENTS), FLOWS]
+    param_names = ["component", "q"]
+    timeout = 300
+
+    def setup(self, component, q):
+        try:
+            design(component, q)
+        except ValueError:
+            # asv skips a benchmark whose setup raises NotImplementedError.
+            raise NotImplementedError
+
+    def time_design(self, component, q):
+        design(component, q)
+
+    def track_peak_memory(self, component, q):
+        tracemalloc.start()
+        try:
+            design(component, q)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    track_peak_memory.unit = "bytes"
+
+    def track_physchem_calls(self, component, q):
+        with profile() as p:
+            design(component, q)
+        return sum(
+            stats.calls
+            for name, stats in p.stats.items()
+            if name.startswith("physchem.")
+        )
+
+    track_physchem_calls.unit = "calls"
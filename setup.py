@@ -21,7 +21,8 @@ dev_requirements = [
     "sphinx-rtd-theme",
     "tox",
     "matplotlib",
-    "ipykernel"
+    "ipykernel",
+    "asv",
 ]
 
 requirements = [
@@ -34,13 +35,31 @@ requirements = [
     "numpy",
 ]
 
+fast_requirements = [
+    "numba",
+]
+
+msgpack_requirements = [
+    "msgpack",
+]
+
+arrow_requirements = [
+    "pyarrow",
+]
+
 extra_requirements = {
     "setup": setup_requirements,
     "test": test_requirements,
     "dev": dev_requirements,
+    "fast": fast_requirements,
+    "msgpack": msgpack_requirements,
+    "arrow": arrow_requirements,
     "all": [
         *requirements,
         *dev_requirements,
+        *fast_requirements,
+        *msgpack_requirements,
+        *arrow_requirements,
     ],
 }
 
@@ -0,0 +1,111 @@
+from aguaclara.core.units import u
+from aguaclara.core import physchem as pc
+from aguaclara.core import channels as ch
+import numpy as np
+import unittest
+
+NU = 1e-6 * u.m**2 / u.s
+ROUGHNESS = 0.1 * u.mm
+
+
+class RectParityTest(unittest.TestCase):
+    """Compare the array functions with the scalar physchem functions over a
+    grid of laminar and turbulent, open and closed channels.
+    """
+
+    def setUp(self):
+        self.q = np.array([1e-5, 1e-3, 0.05])[:, None, None] * u.m**3 / u.s
+        self.w = np.array([0.05, 0.2, 1.0])[None, :, None] * u.m
+        self.d = np.array([0.1, 0.5, 2])[None, None, :] * u.m
+
+    def assertMatches(self, actual, func, *args, **kwargs):
+        self.assertEqual(actual.shape, (3, 3, 3))
+        for i, j, k in np.ndindex(3, 3, 3):
+            expected = u.Quantity(
+                func(self.q[i, 0, 0], self.w[0, j, 0], self.d[0, 0, k], *args, **kwargs)
+            )
+            self.assertAlmostEqual(
+                actual[i, j, k].to(expected.units).magnitude / expected.magnitude, 1
+            )
+
+    def test_hydraulics_rect(self):
+        for open_channel in (True, False):
+            h = ch.hydraulics_rect(
+                self.q, self.w, self.d, 3 * u.m, 1.5, NU, ROUGHNESS, open_channel
+            )
+            self.assertMatches(h.re, pc.re_rect, NU, open_channel)
+            self.assertMatches(h.fric, pc.fric_rect, NU, ROUGHNESS, open_channel)
+            self.assertMatches(
+                h.headloss_major, pc.headloss_major_rect, 3 * u.m, NU, ROUGHNESS,
+                open_channel
+            )
+            self.assertMatches(h.headloss_minor, pc.headloss_minor_rect, 1.5)
+            self.assertMatches(
+                h.headloss, pc.headloss_rect, 3 * u.m, 1.5, NU, ROUGHNESS, open_channel
+            )
+
+    def test_functions(self):
+        self.assertMatches(
+            ch.headloss_rect(self.q, self.w, self.d, 3 * u.m, 1.5, NU, ROUGHNESS, True),
+            pc.headloss_rect, 3 * u.m, 1.5, NU, ROUGHNESS, True
+        )
+        self.assertMatches(
+            ch.fric_rect(self.q, self.w, self.d, NU, ROUGHNESS, False),
+            pc.fric_rect, NU, ROUGHNESS, False
+        )
+        self.assertMatches(
+            ch.re_rect(self.q, self.w, self.d, NU, True), pc.re_rect, NU, True
+        )
+
+
+class RectTest(unittest.TestCase):
+
+    def test_open_channel_mask(self):
+        width = np.array([0.2, 0.4]) * u.m
+        radius = ch.radius_hydraulic_rect(width, 0.1 * u.m, np.array([True, False]))
+        self.assertAlmostEqual(
+            radius[0].magnitude,
+            pc.radius_hydraulic_rect(0.2 * u.m, 0.1 * u.m, True).magnitude,
+        )
+        self.assertAlmostEqual(
+            radius[1].magnitude,
+            pc.radius_hydraulic_rect(0.4 * u.m, 0.1 * u.m, False).magnitude,
+        )
+
+    def test_scalar(self):
+        h = ch.headloss_minor_rect(20 * u.L / u.s, 20 * u.cm, 0.5 * u.m, 2)
+        self.assertEqual(h.shape, ())
+        self.assertAlmostEqual(
+            h.magnitude,
+            pc.headloss_minor_rect(20 * u.L / u.s, 20 * u.cm, 0.5 * u.m, 2).magnitude,
+        )
+
+    def test_range_checks(self):
+        width = np.array([0.2, -0.4]) * u.m
+        with self.assertRaises(ValueError):
+            ch.headloss_rect(
+                20 * u.L / u.s, width, 0.5 * u.m, 3 * u.m, 1, NU, ROUGHNESS, True
+            )
+        with self.assertRaises(ValueError):
+            ch.headloss_minor_rect(20 * u.L / u.s, 0.2 * u.m, 0.5 * u.m, -1)
+
+
+class ChannelTest(unittest.TestCase):
+
+    def test_hydraulics_channel(self):
+        vel = np.array([0.001, 0.2, 1]) * u.m / u.s
+        h = ch.hydraulics_channel(
+            0.1 * u.m**2, vel, 1 * u.m, 5 * u.m, 1, NU, ROUGHNESS
+        )
+        for v, headloss in zip(vel, h.headloss):
+            self.assertAlmostEqual(
+                headloss.to(u.m).magnitude,
+                pc.headloss_channel(
+                    0.1 * u.m**2, v, 1 * u.m, 5 * u.m, 1, NU, ROUGHNESS
+                ).to(u.m).magnitude,
+            )
+        np.testing.assert_allclose(
+            ch.headloss_channel(0.1 * u.m**2, vel, 1 * u.m, 5 * u.m, 1, NU, ROUGHNESS)
+            .magnitude,
+            h.headloss.magnitude,
+        )
@@ -0,0 +1,76 @@
+from aguaclara.core.units import u
+from aguaclara.core import physchem as pc
+from aguaclara.core import gvf
+import numpy as np
+import unittest
+
+NU = 1e-6 * u.m**2 / u.s
+ROUGHNESS = 0.1 * u.mm
+
+
+class ProfileRectTest(unittest.TestCase):
+
+    def test_uniform_flow_headloss(self):
+        profile = gvf.profile_rect(
+            20 * u.L / u.s, 0.3 * u.m, 20 * u.m, 0.5 * u.m, NU, ROUGHNESS
+        )
+        headloss = pc.headloss_major_rect(
+            20 * u.L / u.s, 0.3 * u.m, 0.5 * u.m, 20 * u.m, NU, ROUGHNESS, True
+        )
+        self.assertAlmostEqual(
+            (profile.head[0] - profile.head[-1]) / headloss, 1, places=2
+        )
+        self.assertEqual(profile.depth.shape, (101,))
+        np.testing.assert_allclose(profile.flow.to(u.L / u.s).magnitude, 20)
+
+    def test_normal_depth(self):
+        # Far upstream of the control, the friction slope matches the bed.
+        profile = gvf.profile_rect(
+            20 * u.L / u.s, 0.3 * u.m, 2000 * u.m, 0.5 * u.m, NU, ROUGHNESS,
+            BedSlope=1e-3, NumStations=201,
+        )
+        self.assertAlmostEqual(profile.fric_slope[0].magnitude / 1e-3, 1, places=4)
+
+    def test_many_flows(self):
+        flows = np.linspace(5, 60, 50) * u.L / u.s
+        profiles = gvf.profile_rect(
+            flows, 0.3 * u.m, 6 * u.m, 0.5 * u.m, NU, ROUGHNESS,
+            FlowRateEnd=0 * u.L / u.s,
+        )
+        self.assertEqual(profiles.depth.shape, (50, 101))
+        for i in (0, 25, 49):
+            profile = gvf.profile_rect(
+                flows[i], 0.3 * u.m, 6 * u.m, 0.5 * u.m, NU, ROUGHNESS,
+                FlowRateEnd=0 * u.L / u.s,
+            )
+            np.testing.assert_allclose(
+                profiles.depth[i].magnitude, profile.depth.magnitude, rtol=1e-10
+            )
+
+    def test_lateral_flow(self):
+        args = (40 * u.L / u.s, 0.3 * u.m, 6 * u.m, 0.5 * u.m, NU, ROUGHNESS)
+        uniform = gvf.profile_rect(*args)
+        withdrawal = gvf.profile_rect(*args, FlowRateEnd=0 * u.L / u.s)
+        inflow = gvf.profile_rect(*args, FlowRateEnd=80 * u.L / u.s)
+        # Withdrawal converts velocity head into depth along the channel.
+        self.assertLess(withdrawal.depth[0], withdrawal.depth[-1])
+        self.assertGreater(uniform.depth[0], uniform.depth[-1])
+        # Accelerating the inflow costs more head than friction alone.
+        self.assertGreater(
+            inflow.head[0] - inflow.head[-1], uniform.head[0] - uniform.head[-1]
+        )
+        self.assertAlmostEqual(withdrawal.flow[50].to(u.L / u.s).magnitude, 20)
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            gvf.profile_rect(200 * u.L / u.s, 0.1 * u.m, 5 * u.m, 0.3 * u.m, NU, ROUGHNESS)
+        with self.assertRaises(ValueError):
+            gvf.profile_rect(
+                20 * u.L / u.s, 0.3 * u.m, 5 * u.m, 0.5 * u.m, NU, ROUGHNESS,
+                NumStations=1,
+            )
+        with self.assertWarns(UserWarning):
+            gvf.profile_rect(
+                60 * u.L / u.s, 0.1 * u.m, 50 * u.m, 0.5 * u.m, NU, ROUGHNESS,
+                BedSlope=0.05,
+            )
@@ -0,0 +1,91 @@
+from aguaclara.core.units import u
+from aguaclara.core import physchem as pc
+from aguaclara.core import kernels
+import unittest
+
+
+CASES = [
+    (pc.flow_pipe, (0.25 * u.m, 0.4 * u.m, 2 * u.m, 0.58 * u.m**2 / u.s, 0.029 * u.m, 0.35)),
+    (pc.flow_pipe, (0.1 * u.m, 0.4 * u.m, 20 * u.m, 1e-6 * u.m**2 / u.s, 0.12 * u.mm, 2)),
+    (pc.flow_pipe, (0.1 * u.m, 0.4 * u.m, 20 * u.m, 1e-6 * u.m**2 / u.s, 0.12 * u.mm, 0)),
+    (pc.diam_pipe, (0.007 * u.m**3 / u.s, 0.04 * u.m, 0.75 * u.m, 0.16 * u.m**2 / u.s, 0.0079 * u.m, 0.8)),
+    (pc.diam_pipe, (20 * u.L / u.s, 0.4 * u.m, 20 * u.m, 1e-6 * u.m**2 / u.s, 0.12 * u.mm, 2)),
+    (pc.diam_pipe, (20 * u.L / u.s, 0.4 * u.m, 20 * u.m, 1e-6 * u.m**2 / u.s, 0.12 * u.mm, 0)),
+    (pc.manifold_id, (20 * u.L / u.s, 4 * u.cm, 5.8 * u.m, 0.8, 1e-6 * u.m**2 / u.s, 0.12 * u.mm, 1, 58)),
+    (pc.horiz_chan_w, (20 * u.L / u.s, 50 * u.cm, 1 * u.mm, 5 * u.m, 1e-6 * u.m**2 / u.s, 2 * u.mm, False, 0)),
+    (pc.horiz_chan_w, (20 * u.L / u.s, 50 * u.cm, 1 * u.mm, 5 * u.m, 1e-6 * u.m**2 / u.s, 2 * u.mm, True, 1.5)),
+    (pc.horiz_chan_h, (20 * u.L / u.s, 40 * u.cm, 1 * u.mm, 5 * u.m, 1e-6 * u.m**2 / u.s, 2 * u.mm, False)),
+    (pc.horiz_chan_h, (20 * u.L / u.s, 40 * u.cm, 1 * u.mm, 5 * u.m, 1e-6 * u.m**2 / u.s, 2 * u.mm, True)),
+]
+
+
+class KernelParityTest(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = kernels.get_backend()
+
+    def tearDown(self):
+        kernels.set_backend(self.backend)
+
+    def assertParity(self, backend):
+        for func, args in CASES:
+            with self.subTest(func=func.__name__, args=args):
+                kernels.set_backend("pint")
+                expected = func(*args)
+                kernels.set_backend(backend)
+                actual = func(*args)
+                self.assertAlmostEqual(
+                    actual.to(expected.units).magnitude / expected.magnitude, 1, places=12
+                )
+
+    def test_numpy_parity(self):
+        self.assertParity("numpy")
+
+    @unittest.skipUnless(kernels.numba_available(), "Numba is not installed")
+    def test_numba_parity(self):
+        self.assertParity("numba")
+
+    def test_range_checks(self):
+        kernels.set_backend("numpy")
+        with self.assertRaises(ValueError):
+            pc.flow_pipe(-1 * u.m, 0.4 * u.m, 2 * u.m, 1e-6 * u.m**2 / u.s, 0.1 * u.mm, 0)
+        with self.assertRaises(ValueError):
+            pc.diam_pipe(20 * u.L / u.s, 0.4 * u.m, 20 * u.m, 1e-6 * u.m**2 / u.s, 0.12 * u.mm, -1)
+
+
+class BackendTest(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = kernels.get_backend()
+
+    def tearDown(self):
+        kernels.set_backend(self.backend)
+
+    def test_set_backend(self):
+        kernels.set_backend("pint")
+        self.assertEqual(kernels.get_backend(), "pint")
+        self.assertIsNone(kernels.get("flow_pipe"))
+        kernels.set_backend("numpy")
+        self.assertIs(kernels.get("flow_pipe"), kernels.flow_pipe)
+
+    def test_invalid_backend(self):
+        self.assertRaises(ValueError, kernels.set_backend, "fortran")
+        self.assertRaises(ValueError, kernels.set_backend, "auto")
+
+    @unittest.skipIf(kernels.numba_available(), "Numba is installed")
+    def test_numba_missing(self):
+        self.assertRaises(ImportError, kernels.set_backend, "numba")
+
+    def test_friction_kernels(self):
+        self.assertAlmostEqual(
+            kernels.fric_pipe(0.01, 0.1, 1e-6, 1e-4),
+            pc.fric_pipe(
+                0.01 * u.m**3 / u.s, 0.1 * u.m, 1e-6 * u.m**2 / u.s, 1e-4 * u.m
+            ).magnitude,
+        )
+        self.assertAlmostEqual(
+            kernels.fric_rect(0.01, 0.3, 0.2, 1e-6, 1e-4, True),
+            pc.fric_rect(
+                0.01 * u.m**3 / u.s, 0.3 * u.m, 0.2 * u.m, 1e-6 * u.m**2 / u.s, 1e-4 * u.m, True
+            ).magnitude,
+        )
@@ -0,0 +1,73 @@
+from aguaclara.core.units import u
+from aguaclara.core import physchem as pc
+from aguaclara.core import manifold
+import numpy as np
+import unittest
+
+NU = 1e-6 * u.m**2 / u.s
+ROUGHNESS = 0.12 * u.mm
+
+
+class FlowDistributionTest(unittest.TestCase):
+
+    def distribution(self, flow, **kwargs):
+        args = {
+            "Diam": 6 * u.inch,
+            "Length": 5.8 * u.m,
+            "NumPorts": 55,
+            "AreaPort": 2 * u.cm**2,
+            "Nu": NU,
+            "Roughness": ROUGHNESS,
+        }
+        args.update(kwargs)
+        return manifold.flow_distribution(flow, **args)
+
+    def test_mass_balance(self):
+        flows = np.array([1, 3, 6, 10]) * u.L / u.s
+        for collection in (True, False):
+            d = self.distribution(flows, Collection=collection)
+            self.assertEqual(d.port_flow.shape, (4, 55))
+            np.testing.assert_allclose(
+                d.port_flow.sum(axis=1).to(u.L / u.s).magnitude,
+                flows.magnitude,
+                rtol=1e-9,
+            )
+
+    def test_single_port(self):
+        d = self.distribution(2 * u.L / u.s, NumPorts=1, AreaPort=pc.area_circle(3 * u.cm))
+        self.assertAlmostEqual(d.port_flow[0].to(u.L / u.s).magnitude, 2)
+        self.assertAlmostEqual(d.uniformity.magnitude, 1)
+        self.assertAlmostEqual(
+            d.port_head[0].to(u.m).magnitude,
+            pc.head_orifice(3 * u.cm, 0.63, 2 * u.L / u.s).to(u.m).magnitude,
+        )
+
+    def test_wide_manifold_is_uniform(self):
+        d = self.distribution(3 * u.L / u.s, Diam=1 * u.m)
+        self.assertAlmostEqual(d.uniformity.magnitude, 1, places=4)
+
+    def test_direction(self):
+        # A collection manifold draws the most flow near its outlet, while a
+        # distribution manifold recovers pressure toward its dead end.
+        collection = self.distribution(6 * u.L / u.s, Collection=True)
+        self.assertGreater(collection.port_flow[0], collection.port_flow[-1])
+        distribution = self.distribution(6 * u.L / u.s, Collection=False)
+        self.assertLess(distribution.port_flow[0], distribution.port_flow[-1])
+        self.assertLess(collection.uniformity, 1)
+        self.assertLess(distribution.uniformity, 1)
+
+    def test_many_flows(self):
+        flows = np.linspace(1, 10, 20) * u.L / u.s
+        d = self.distribution(flows, NumPorts=300, Collection=True)
+        single = self.distribution(flows[7], NumPorts=300, Collection=True)
+        np.testing.assert_allclose(
+            d.port_flow[7].magnitude, single.port_flow.magnitude, rtol=1e-9
+        )
+        self.assertAlmostEqual(d.uniformity[7], single.uniformity)
+
+    def test_errors(self):
+        self.assertRaises(ValueError, self.distribution, -1 * u.L / u.s)
+        self.assertRaises(ValueError, self.distribution, 1 * u.L / u.s, NumPorts=0)
+        self.assertRaises(
+            ValueError, self.distribution, 1 * u.L / u.s, RatioVCPort=1.2
+        )
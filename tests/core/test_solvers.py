@@ -0,0 +1,186 @@
+from aguaclara.core.units import u
+from aguaclara.core import channels
+from aguaclara.core import physchem as pc
+from aguaclara.core.solvers import fixed_point, solve_for
+import numpy as np
+import unittest
+
+
+CHANNEL = {
+    "FlowRate": 20 * u.L / u.s,
+    "Depth": 0.5 * u.m,
+    "Length": 10 * u.m,
+    "KMinor": 2,
+    "Nu": 1e-6 * u.m**2 / u.s,
+    "Roughness": 0.1 * u.mm,
+    "OpenChannel": True,
+}
+
+
+class SolveForTest(unittest.TestCase):
+
+    def test_scalar_target(self):
+        width = solve_for(
+            pc.headloss_rect, 2 * u.cm, unknown="Width", bounds=(1 * u.cm, 1 * u.m),
+            **CHANNEL
+        )
+        self.assertEqual(np.ndim(width.magnitude), 0)
+        self.assertEqual(width.units, u.cm)
+        self.assertAlmostEqual(
+            pc.headloss_rect(Width=width, **CHANNEL).to(u.cm).magnitude, 2
+        )
+
+    def test_array_target(self):
+        targets = np.linspace(1, 10, 10) * u.cm
+        width = solve_for(
+            pc.headloss_rect, targets, unknown="Width", bounds=(1 * u.cm, 1 * u.m),
+            **CHANNEL
+        )
+        self.assertEqual(width.shape, (10,))
+        np.testing.assert_allclose(
+            pc.headloss_rect(Width=width, **CHANNEL).to(u.cm).magnitude,
+            targets.magnitude,
+            rtol=1e-8,
+        )
+        # Wider channels lose less head.
+        self.assertTrue(np.all(np.diff(width.magnitude) < 0))
+
+    def test_array_known(self):
+        flows = np.array([5, 10, 20]) * u.L / u.s
+        diam = solve_for(
+            pc.headloss_pipe, 10 * u.cm, bounds=(1 * u.cm, 50 * u.cm),
+            FlowRate=flows, Length=100 * u.m, Nu=1e-6 * u.m**2 / u.s,
+            Roughness=0.1 * u.mm, KMinor=2,
+        )
+        self.assertEqual(diam.shape, (3,))
+        for flow, d in zip(flows, diam):
+            self.assertAlmostEqual(
+                pc.headloss_pipe(
+                    flow, d, 100 * u.m, 1e-6 * u.m**2 / u.s, 0.1 * u.mm, 2
+                ).to(u.cm).magnitude,
+                10,
+            )
+
+    def test_vectorized(self):
+        flows = np.linspace(5, 50, 200) * u.L / u.s
+        known = {**CHANNEL, "FlowRate": flows}
+        calls = []
+
+        def headloss_rect(**kwargs):
+            calls.append(kwargs)
+            return channels.headloss_rect(**kwargs)
+
+        width = solve_for(
+            headloss_rect, 2 * u.cm, unknown="Width", bounds=(1 * u.cm, 1 * u.m),
+            vectorized=True, **known
+        )
+        # Every iteration evaluates all of the unconverged targets in one call.
+        self.assertLess(len(calls), 50)
+        np.testing.assert_allclose(
+            channels.headloss_rect(Width=width, **known).to(u.cm).magnitude,
+            2,
+            rtol=1e-8,
+        )
+        expected = solve_for(
+            pc.headloss_rect, 2 * u.cm, unknown="Width",
+            bounds=(1 * u.cm, 1 * u.m), **{**known, "FlowRate": flows[[0, -1]]}
+        )
+        np.testing.assert_allclose(
+            width[[0, -1]].m_as(u.cm), expected.m_as(u.cm), rtol=1e-8
+        )
+        # The functions of channels are detected as vectorized.
+        self.assertEqual(
+            solve_for(
+                channels.headloss_rect, 2 * u.cm, unknown="Width",
+                bounds=(1 * u.cm, 1 * u.m), **known
+            ).shape,
+            (200,),
+        )
+
+    def test_analytic_inverse(self):
+        flows = np.array([0.5, 1, 2]) * u.L / u.s
+        heights = solve_for(
+            pc.flow_orifice, flows, unknown="Height", bounds=(1 * u.cm, 1 * u.m),
+            Diam=2 * u.cm, RatioVCOrifice=0.62,
+        )
+        for flow, height in zip(flows, heights):
+            self.assertAlmostEqual(
+                height.to(u.m).magnitude,
+                pc.head_orifice(2 * u.cm, 0.62, flow).to(u.m).magnitude,
+            )
+
+    def test_bracket_expansion(self):
+        width = solve_for(
+            pc.headloss_rect, 2 * u.cm, unknown="Width", bounds=(50 * u.cm, 1 * u.m),
+            **CHANNEL
+        )
+        self.assertAlmostEqual(
+            pc.headloss_rect(Width=width, **CHANNEL).to(u.cm).magnitude, 2
+        )
+
+    def test_errors(self):
+        self.assertRaises(
+            TypeError, solve_for, pc.headloss_rect, 2 * u.cm, unknown="Width",
+            **CHANNEL
+        )
+        self.assertRaises(
+            ValueError, solve_for, pc.headloss_rect, 2 * u.cm, unknown="Width",
+            bounds=(1 * u.m, 1 * u.cm), **CHANNEL
+        )
+        self.assertRaises(
+            ValueError, solve_for, pc.headloss_rect, 2 * u.cm, unknown="Width",
+            bounds=(1 * u.cm, 1 * u.m), expand=0, **{**CHANNEL, "Depth": 1 * u.mm}
+        )
+
+    def test_no_convergence(self):
+        with self.assertWarns(UserWarning):
+            solve_for(
+                pc.headloss_rect, 2 * u.cm, unknown="Width",
+                bounds=(1 * u.cm, 1 * u.m), maxiter=2, **CHANNEL
+            )
+
+
+class FixedPointTest(unittest.TestCase):
+
+    def test_plain_iteration(self):
+        # A fast contraction is iterated without acceleration.
+        result = fixed_point(lambda x: x / 10 + 9 * u.m, 1 * u.m, rtol=1e-12)
+        self.assertTrue(result.converged)
+        self.assertAlmostEqual(result.x.to(u.m).magnitude, 10)
+        np.testing.assert_allclose(
+            result.trace[1:].magnitude, (result.trace[:-1] / 10 + 9 * u.m).magnitude
+        )
+        self.assertEqual(result.residuals.shape, (result.iterations,))
+
+    def test_acceleration(self):
+        # x = cos(x) contracts slowly; the secant steps converge much faster.
+        result = fixed_point(lambda x: np.cos(x), 1.0, rtol=1e-12)
+        self.assertTrue(result.converged)
+        self.assertAlmostEqual(result.x.magnitude, 0.7390851332151607, places=10)
+        self.assertLess(result.iterations, 15)
+
+    def test_vector(self):
+        matrix = np.array([[0.5, 0.4], [0.3, 0.6]])
+        result = fixed_point(
+            lambda x: matrix @ x + [1, 1] * u.cm, [0, 0] * u.cm, rtol=1e-12
+        )
+        expected = np.linalg.solve(np.eye(2) - matrix, [1, 1])
+        np.testing.assert_allclose(result.x.to(u.cm).magnitude, expected)
+        self.assertEqual(result.trace.shape[1:], (2,))
+
+    def test_alternating(self):
+        # A step function that alternates between two values is settled
+        # between them.
+        def step(x):
+            return 2 * u.m if x < 1.5 * u.m else 1 * u.m
+
+        result = fixed_point(step, 1 * u.m, rtol=0.5)
+        self.assertTrue(result.converged)
+        self.assertLess(result.iterations, 5)
+
+    def test_no_convergence(self):
+        with self.assertWarns(UserWarning):
+            result = fixed_point(lambda x: np.cos(x), 1.0, rtol=1e-12, maxiter=3)
+        self.assertFalse(result.converged)
+        self.assertEqual(result.iterations, 3)
+        self.assertRaises(ValueError, fixed_point, np.cos, 1.0, maxiter=0)
@@ -0,0 +1,96 @@
+from aguaclara.core.units import u
+from aguaclara.core import physchem as pc
+from aguaclara.core import kernels
+from aguaclara.core import telemetry
+from aguaclara.core.solvers import fixed_point
+import io
+import json
+import os
+import tempfile
+import unittest
+import warnings
+
+PIPE = (0.1 * u.m, 0.4 * u.m, 20 * u.m, 1e-6 * u.m**2 / u.s, 0.12 * u.mm, 2)
+CHANNEL = (20 * u.L / u.s, 50 * u.cm, 1 * u.mm, 5 * u.m, 1e-6 * u.m**2 / u.s,
+           2 * u.mm, False, 0)
+
+
+class TelemetryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = kernels.get_backend()
+
+    def tearDown(self):
+        kernels.set_backend(self.backend)
+
+    def test_nothing_recorded_outside(self):
+        self.assertIsNone(telemetry.start())
+        pc.flow_pipe(*PIPE)
+        with telemetry.collect() as t:
+            pass
+        pc.flow_pipe(*PIPE)
+        self.assertEqual(t.summary(), {})
+
+    def test_backends_agree(self):
+        calls = {}
+        for backend in ("pint", "numpy"):
+            kernels.set_backend(backend)
+            with telemetry.collect() as t:
+                flow = pc.flow_pipe(*PIPE)
+                pc.horiz_chan_w(*CHANNEL)
+            calls[backend] = {call.solver: call for call in t.slowest}
+            self.assertEqual(flow, pc.flow_pipe(*PIPE))
+        for solver in ("flow_pipe", "horiz_chan_w"):
+            pint_call, numpy_call = calls["pint"][solver], calls["numpy"][solver]
+            self.assertEqual(pint_call.iterations, numpy_call.iterations)
+            self.assertAlmostEqual(pint_call.residual, numpy_call.residual)
+            self.assertTrue(numpy_call.converged)
+            self.assertEqual(pint_call.inputs, numpy_call.inputs)
+        self.assertEqual(calls["numpy"]["flow_pipe"].inputs["Length"], 20)
+
+    def test_summary(self):
+        with telemetry.collect(keep=2) as t:
+            for hl in [0.1, 0.2, 0.4] * u.m:
+                pc.diam_pipe(20 * u.L / u.s, hl, 20 * u.m, 1e-6 * u.m**2 / u.s,
+                             0.12 * u.mm, 2)
+        summary = t.summary()["diam_pipe"]
+        self.assertEqual(summary.calls, 3)
+        self.assertEqual(summary.failures, 0)
+        self.assertEqual(sum(summary.iterations.values()), 3)
+        self.assertEqual(summary.time_histogram.sum(), 3)
+        self.assertLessEqual(summary.residual_max, 0.001)
+        self.assertEqual(len(t.slowest), 2)
+        self.assertGreaterEqual(t.slowest[0].time, t.slowest[1].time)
+        self.assertIn("diam_pipe", t.report())
+
+    def test_failures_and_nesting(self):
+        with telemetry.collect() as outer:
+            with telemetry.collect() as inner:
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore")
+                    fixed_point(
+                        lambda x: x + 1 * u.m, 1 * u.m, maxiter=3, name="shift"
+                    )
+            fixed_point(lambda x: (x + 2 * u.m**2 / x) / 2, 1 * u.m)
+        self.assertEqual(list(inner.summary()), ["shift"])
+        self.assertEqual(outer.summary()["shift"].failures, 1)
+        self.assertEqual(outer.summary()["fixed_point"].iterations, {5: 1})
+        self.assertEqual(inner.failures[0].iterations, 3)
+        self.assertFalse(inner.failures[0].converged)
+
+    def test_json_lines(self):
+        stream = io.StringIO()
+        with telemetry.collect(stream):
+            pc.horiz_chan_w(*CHANNEL)
+            pc.flow_pipe(*PIPE)
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual([line["solver"] for line in lines],
+                         ["horiz_chan_w", "flow_pipe"])
+        self.assertEqual(lines[1]["inputs"]["KMinor"], 2)
+
+        path = os.path.join(tempfile.mkdtemp(), "calls.jsonl")
+        for _ in range(2):
+            with telemetry.collect(path):
+                pc.flow_pipe(*PIPE)
+        with open(path) as file:
+            self.assertEqual(len(file.readlines()), 2)
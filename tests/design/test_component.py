@@ -0,0 +1,309 @@
+from aguaclara.design.component import Component, _memo
+from aguaclara.design.cdc import CDC
+from aguaclara.design.ent_floc import EntTankFloc
+from aguaclara.design.floc import Flocculator, FlocculatorBatch
+from aguaclara.design.plant import Plant
+from aguaclara.design.sed import Sedimentor
+from aguaclara.core.units import u
+from concurrent.futures import ThreadPoolExecutor
+import io
+import json
+import warnings
+import pytest
+
+
+class Child(Component):
+    OUTPUTS = ("vol",)
+
+    @property
+    def vol(self):
+        return (self.q * 10 * u.s).to(u.L)
+
+
+class Parent(Component):
+    OUTPUTS = ("vol",)
+
+    def __init__(self, **kwargs):
+        self.child = Child()
+        self.subcomponents = [self.child]
+        super().__init__(**kwargs)
+        self.set_subcomponents()
+
+    @property
+    def vol(self):
+        return 2 * self.child.vol
+
+
+def test_cache_hits():
+    floc = Flocculator()
+    chan_w = floc.chan_w
+    info = floc.cache_info()
+    assert info.currsize > 0
+    assert floc.chan_w is chan_w
+    assert floc.cache_info().hits == info.hits + 1
+    assert floc.cache_info().misses == info.misses
+
+
+@pytest.mark.parametrize(
+    "name, value",
+    [
+        ("hl", 50 * u.cm),
+        ("q", 60 * u.L / u.s),
+        ("temp", 10 * u.degC),
+        ("chan_n_parity", "any"),
+    ],
+)
+def test_invalidation(name, value):
+    floc = Flocculator()
+    floc.chan_w, floc.baffle_s
+    setattr(floc, name, value)
+    fresh = Flocculator(**{name: value})
+    assert floc.chan_w == fresh.chan_w
+    assert floc.baffle_s == fresh.baffle_s
+
+
+def test_unaffected_properties_stay_cached():
+    floc = Flocculator()
+    floc.chan_w, floc.vel_grad_avg
+    floc.chan_n_parity = "any"
+    # The velocity gradient does not depend on the channel parity.
+    misses = floc.cache_info().misses
+    floc.vel_grad_avg
+    assert floc.cache_info().misses == misses
+    floc.chan_w
+    assert floc.cache_info().misses > misses
+
+
+def test_equal_value_keeps_cache():
+    floc = Flocculator()
+    chan_w = floc.chan_w
+    floc.hl = 40.0 * u.cm
+    assert floc.chan_w is chan_w
+    floc.hl = 0.4 * u.m
+    assert floc.chan_w is not chan_w
+    assert floc.chan_w == chan_w
+
+
+def test_subcomponent_invalidation():
+    parent = Parent(q=2 * u.L / u.s)
+    assert parent.vol == 40 * u.L
+    parent.child.q = 3 * u.L / u.s
+    assert parent.vol == 60 * u.L
+
+
+def test_delete_invalidates():
+    child = Child(q=2 * u.L / u.s)
+    assert child.vol == 20 * u.L
+    del child.q
+    with pytest.raises(AttributeError):
+        child.vol
+
+
+def test_threads():
+    def design(q):
+        floc = Flocculator(q=q * u.L / u.s)
+        return floc.chan_w, floc.dependency_graph().edges
+
+    flows = [20, 30, 40, 50] * 4
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(design, flows))
+    for q, (chan_w, edges) in zip(flows, results):
+        expected_chan_w, expected_edges = design(q)
+        assert chan_w == expected_chan_w
+        assert edges == expected_edges
+
+
+def test_cache_clear():
+    parent = Parent()
+    parent.vol
+    parent.cache_clear()
+    assert parent.cache_info().currsize == 0
+    assert parent.child.cache_info().currsize == 0
+
+
+def test_dependency_graph():
+    floc = Flocculator()
+    floc.chan_w
+    graph = floc.dependency_graph()
+    assert graph.nodes["hl"]["kind"] == "input"
+    assert graph.nodes["chan_w"]["kind"] == "property"
+    assert graph.nodes["chan_w"]["evaluations"] == 1
+    assert graph.nodes["chan_w"]["time"] >= graph.nodes["chan_w"]["self_time"]
+    assert ("vel_grad_avg", "retention_time") in graph.edges
+    assert {"vel_grad_avg", "vol", "chan_w"} <= graph.dependents("hl")
+    assert "vel_grad_avg" not in graph.dependents("chan_n_parity")
+    assert len(graph.costliest(3)) == 3
+    dot = graph.to_dot()
+    assert dot.startswith("digraph")
+    assert '"hl" -> "vel_grad_avg";' in dot
+
+    # Invalidated properties leave the graph until they are read again.
+    floc.hl = 50 * u.cm
+    assert "chan_w" not in floc.dependency_graph().nodes
+
+
+def test_subcomponent_dependency_graph():
+    parent = Parent()
+    parent.vol
+    graph = parent.dependency_graph()
+    assert ("child.vol", "vol") in graph.edges
+    assert ("child.q", "child.vol") in graph.edges
+    assert graph.dependents("child.q") == {"child.vol", "vol"}
+
+
+def test_outputs_registry():
+    assert "chan_w" in Flocculator._outputs
+    assert FlocculatorBatch._outputs[: len(Flocculator._outputs)] == (
+        Flocculator._outputs
+    )
+    assert "drain_id" in FlocculatorBatch._outputs
+    assert "coag_q_max_est" not in CDC._outputs
+
+    with pytest.raises(TypeError):
+
+        class Broken(Component):
+            OUTPUTS = ("q",)
+
+
+def test_to_dict():
+    parent = Parent(q=2 * u.L / u.s)
+    parent.label = "tank"
+    assert parent.to_dict() == {
+        "type": "Parent",
+        "outputs": {"vol": {"magnitude": 40.0, "units": "liter"}},
+        "inputs": {
+            "child": {
+                "type": "Child",
+                "outputs": {"vol": {"magnitude": 20.0, "units": "liter"}},
+                "inputs": {
+                    "q": {"magnitude": 2.0, "units": "liter / second"},
+                    "temp": {"magnitude": 20, "units": "degree_Celsius"},
+                },
+            },
+            "q": {"magnitude": 2.0, "units": "liter / second"},
+            "temp": {"magnitude": 20, "units": "degree_Celsius"},
+            "label": "tank",
+        },
+    }
+
+
+def _components(component):
+    """Return a component and every component that it contains."""
+    components = [component]
+    for value in vars(component).values():
+        if isinstance(value, Component):
+            components.extend(_components(value))
+    return components
+
+
+def test_dump_plant():
+    plant = Plant()
+    components = _components(plant)
+    before = [
+        {name: cost[0] for name, cost in _memo(c).costs.items()} for c in components
+    ]
+    file = io.StringIO()
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        assert plant.dump(file) is None
+    data = json.loads(file.getvalue())
+    floc = data["inputs"]["etf"]["inputs"]["floc"]
+    assert floc["type"] == "Flocculator"
+    assert floc["outputs"]["chan_w"] == {
+        "magnitude": plant.etf.floc.chan_w.magnitude,
+        "units": "centimeter",
+    }
+
+    # Dumping evaluated every property at most once.
+    for component, counts in zip(components, before):
+        for name, cost in _memo(component).costs.items():
+            assert cost[0] - counts.get(name, 0) <= 1
+    assert plant.to_dict() == data
+
+
+def test_dump_deprecated_outputs():
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        CDC().dump()
+
+
+def test_dump_msgpack():
+    msgpack = pytest.importorskip("msgpack")
+    parent = Parent()
+    assert msgpack.unpackb(parent.dump(format="msgpack")) == parent.to_dict()
+
+
+def test_dump_cycle():
+    parent = Parent()
+    parent.child.parent = parent
+    with pytest.raises(ValueError):
+        parent.dump()
+    with pytest.raises(ValueError):
+        parent.to_dict()
+
+
+def test_serialize_properties():
+    properties = Plant().serialize_properties()
+    assert properties["q"] == str(20 * u.L / u.s)
+    assert isinstance(properties["etf"], str)
+
+
+@pytest.mark.parametrize(
+    "cls, name, value",
+    [
+        (Flocculator, "hl", 50 * u.cm),
+        (Flocculator, "q", 60 * u.L / u.s),
+        (Flocculator, "temp", 10 * u.degC),
+        (Flocculator, "chan_n_parity", "any"),
+        # The iterative design converges to another channel count from the
+        # entrance tank length of the parent.
+        (EntTankFloc, "q", 64.5 * u.L / u.s),
+        (EntTankFloc, "temp", 10 * u.degC),
+        (Sedimentor, "q", 64.5 * u.L / u.s),
+        (Plant, "q", 64.5 * u.L / u.s),
+    ],
+)
+def test_with_matches_design(cls, name, value):
+    component = cls()
+    component.to_dict()
+    variant = component.with_(**{name: value})
+    assert variant.to_dict() == cls(**{name: value}).to_dict()
+    # The parent is unchanged.
+    assert component.to_dict() == cls().to_dict()
+
+
+def test_with_copies_subcomponents():
+    floc = Flocculator()
+    variant = floc.with_(hl=50 * u.cm)
+    assert variant.drain_pipe is not floc.drain_pipe
+
+
+def test_with_shares_inputs_and_cache():
+    floc = Flocculator()
+    vel_grad_avg = floc.vel_grad_avg
+    floc.chan_w
+    variant = floc.with_(chan_n_parity="any")
+    assert variant.hl is floc.hl
+    misses = variant.cache_info().misses
+    assert variant.vel_grad_avg is vel_grad_avg
+    assert variant.cache_info().misses == misses
+
+    # Setting the variant afterwards leaves the parent's cache alone.
+    variant.hl = 50 * u.cm
+    assert floc.vel_grad_avg is vel_grad_avg
+
+
+def test_with_propagates_to_subcomponents():
+    parent = Parent(q=2 * u.L / u.s)
+    parent.vol
+    variant = parent.with_(q=3 * u.L / u.s)
+    assert variant.child is not parent.child
+    assert variant.child.q == 3 * u.L / u.s
+    assert variant.vol == 60 * u.L
+    assert parent.vol == 40 * u.L
+
+    sed = Sedimentor()
+    variant = sed.with_(q=40 * u.L / u.s)
+    assert variant.tank.q == variant.chan.q == 40 * u.L / u.s
+    assert variant.tank_n == Sedimentor(q=40 * u.L / u.s).tank_n
+    assert sed.tank.q == 20 * u.L / u.s
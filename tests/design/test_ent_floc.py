@@ -33,3 +33,17 @@ def test_etf(actual, expected):
         assert actual.magnitude == pytest.approx(expected.magnitude)
     else:
         assert actual == pytest.approx(expected)
+
+
+def test_etf_convergence():
+    assert etf_20.ent_floc_convergence.converged
+    assert etf_20.ent_floc_convergence.iterations == 2
+    assert etf_20.floc.ent_l == etf_20.ent_floc_convergence.x
+    assert "ent_floc_convergence" not in etf_20.to_dict()["inputs"]
+
+
+def test_etf_alternating_designs():
+    # Plain iteration alternates between two entrance tank lengths.
+    etf = EntTankFloc(q=19.333333333333336 * u.L / u.s)
+    assert etf.ent_floc_convergence.converged
+    assert abs(etf.ent.l - etf.floc.ent_l) <= 0.01 * etf.ent.l
@@ -0,0 +1,81 @@
+from aguaclara.design.export import export, flatten, read_designs
+from aguaclara.design.component import Component
+from aguaclara.design.floc import Flocculator
+from aguaclara.core.units import u
+import os
+import pytest
+
+flows = [20, 40, 60] * u.L / u.s
+
+
+class Tank(Component):
+    OUTPUTS = ("vol",)
+
+    @property
+    def vol(self):
+        return (self.q * 10 * u.s).to(u.L)
+
+
+def test_flatten():
+    row = flatten(Flocculator())
+    assert row["type"] == ("Flocculator", None)
+    assert row["chan_w"] == (34, "centimeter")
+    assert row["drain_pipe.type"] == ("Pipe", None)
+    assert row["drain_pipe.size"][1] == "inch"
+
+
+@pytest.mark.parametrize("chunksize", [1, 2, 1000])
+def test_csv_matches_designs(tmp_path, chunksize):
+    path = tmp_path / "flocs.csv"
+    count = export((Flocculator(q=q) for q in flows), path, chunksize=chunksize)
+    assert count == 3
+    table = read_designs(path)
+    assert len(table) == 3
+    assert table.attrs["units"]["chan_w"] == "centimeter"
+    assert table.attrs["units"]["drain_pipe.size"] == "inch"
+    assert "chan_n" not in table.attrs["units"]
+    for row, q in zip(table.itertuples(), flows):
+        floc = Flocculator(q=q)
+        assert row.chan_w == floc.chan_w.m_as(u.cm)
+        assert row.baffle_s == pytest.approx(floc.baffle_s.m_as(u.cm))
+        assert row.q == pytest.approx(q.m_as(u.L / u.s))
+    assert (table["drain_pipe.type"] == "Pipe").all()
+
+
+def test_units_conversion_and_columns(tmp_path):
+    path = tmp_path / "tanks.csv"
+    tanks = [Tank(q=2 * u.L / u.s), Tank(q=0.003 * u.m**3 / u.s)]
+    export(tanks, path, chunksize=1, columns=["q", "vol"])
+    table = read_designs(path)
+    assert list(table.columns) == ["q", "vol"]
+    assert table["q"].tolist() == pytest.approx([2, 3])
+    assert table["vol"].tolist() == pytest.approx([20, 30])
+
+
+def test_later_columns_are_dropped(tmp_path):
+    tanks = [Tank(), Tank(label="second")]
+    with pytest.warns(UserWarning, match="label"):
+        export(tanks, tmp_path / "tanks.csv", chunksize=1)
+    assert "label" not in read_designs(tmp_path / "tanks.csv").columns
+
+
+def test_empty_and_invalid(tmp_path):
+    assert export([], tmp_path / "none.csv") == 0
+    assert not os.path.exists(tmp_path / "none.csv")
+    with pytest.raises(ValueError):
+        export([Tank()], tmp_path / "tanks.csv", format="xlsx")
+    with pytest.raises(ValueError):
+        export([Tank()], tmp_path / "tanks.csv", chunksize=0)
+
+
+@pytest.mark.parametrize("extension", [".parquet", ".feather"])
+def test_arrow_formats(tmp_path, extension):
+    pytest.importorskip("pyarrow")
+    path = tmp_path / ("flocs" + extension)
+    export((Flocculator(q=q) for q in flows), path, chunksize=2)
+    table = read_designs(path)
+    csv = tmp_path / "flocs.csv"
+    export((Flocculator(q=q) for q in flows), csv)
+    expected = read_designs(csv)
+    assert table.attrs["units"] == expected.attrs["units"]
+    assert table["chan_w"].tolist() == expected["chan_w"].tolist()
@@ -1,7 +1,8 @@
-from aguaclara.design.floc import Flocculator
+from aguaclara.design.floc import Flocculator, FlocculatorBatch
 from aguaclara.core.units import u
 
 import aguaclara as ac
+import numpy as np
 import pytest
 
 floc_20 = Flocculator(q=20 * u.L / u.s)
@@ -59,3 +60,57 @@ def test_floc(actual, expected):
         assert actual.magnitude == pytest.approx(expected.magnitude)
     else:
         assert actual == pytest.approx(expected)
+
+
+floc_batch = FlocculatorBatch(
+    q=np.array([[10], [20], [60], [140]]) * u.L / u.s,
+    temp=np.array([5, 20, 30]) * u.degC,
+    hl=40 * u.cm,
+)
+
+
+@pytest.mark.parametrize(
+    "name",
+    [
+        "vel_grad_avg",
+        "vol",
+        "chan_w_min",
+        "chan_n",
+        "chan_w",
+        "chan_l",
+        "expansion_h",
+        "baffle_s",
+        "obstacle_n",
+        "contraction_s",
+        "obstacle_pipe_od",
+    ],
+)
+def test_floc_batch(name):
+    assert floc_batch.shape == (4, 3)
+    batch = getattr(floc_batch, name)
+    for index in np.ndindex(floc_batch.shape):
+        expected = getattr(floc_batch.flocculator(index), name)
+        if type(expected) == u.Quantity:
+            assert batch[index].to(expected.units).magnitude == pytest.approx(
+                expected.magnitude, rel=1e-12
+            )
+        else:
+            assert batch[index] == expected
+
+
+@pytest.mark.parametrize("parity", ["even", "odd", "any"])
+def test_floc_batch_chan_n_parity(parity):
+    q = np.array([20, 60, 140]) * u.L / u.s
+    batch = FlocculatorBatch(q=q, chan_n_parity=parity)
+    expected = [Flocculator(q=q_i, chan_n_parity=parity).chan_n for q_i in q]
+    assert batch.chan_n.tolist() == expected
+
+
+def test_floc_batch_drain_id():
+    floc = floc_batch.flocculator((1, 1))
+    drain_id = floc_batch.drain_id[1, 1]
+    assert drain_id.to(u.inch).magnitude == pytest.approx(
+        floc._drain_id().to(u.inch).magnitude
+    )
+    assert floc.drain_pipe.id >= drain_id
+    assert floc_batch.drain_pipe is None
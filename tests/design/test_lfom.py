@@ -75,3 +75,74 @@ def test_error_per_row():
         / 0.32716087383055126
         < 0.01
     )
+
+
+def test_q_submerged_matrix():
+    import aguaclara.core.constants as con
+    import aguaclara.core.physchem as pc
+
+    matrix = lfom_20.q_submerged_matrix
+    assert matrix.shape == (lfom_20.row_n + 1, lfom_20.row_n)
+    assert np.all(np.triu(matrix.magnitude) == 0)
+    expected = pc.flow_orifice_vert(
+        lfom_20.orifice_d,
+        lfom_20.row_b * 4 - lfom_20.orifice_h_per_row[1],
+        con.VC_ORIFICE_RATIO,
+    )
+    assert matrix[3, 1].to(u.L / u.s).magnitude == pytest.approx(
+        expected.to(u.L / u.s).magnitude
+    )
+    with pytest.raises(ValueError):
+        lfom_20.q_submerged(lfom_20.row_n + 1, lfom_20.orifice_n_per_row)
+
+
+def test_many_rows():
+    lfom = LFOM(q=60 * u.L / u.s, min_row_n=30, max_row_n=30)
+    n = lfom.orifice_n_per_row
+    assert n.shape == (30,)
+    assert np.all(n <= lfom.orifice_n_max_per_row)
+    for i in (0, 10, 29):
+        error = lfom.q_submerged(i, n) / lfom.q_per_row[i] - 1
+        assert lfom.error_per_row[i] == pytest.approx(error.magnitude)
+    assert abs(lfom.error_per_row[-1]) < 0.01
+
+
+def test_rating_curve():
+    import aguaclara.core.constants as con
+    import aguaclara.core.physchem as pc
+
+    curve = lfom_20.rating_curve(num_points=11)
+    assert curve.h.units == u.cm and curve.q.units == u.L / u.s
+    assert curve.h[-1].magnitude == pytest.approx(20)
+    assert curve.q[0].magnitude == 0
+    assert np.all(np.diff(curve.q.magnitude) > 0)
+    # At the top of each row, every orifice of the rows below and of that
+    # row flows.
+    n = lfom_20.orifice_n_per_row
+    flow_per_orifice = pc.flow_orifice_vert(
+        lfom_20.orifice_d, lfom_20.row_b - 0.5 * lfom_20.orifice_d,
+        con.VC_ORIFICE_RATIO
+    )
+    for i in range(lfom_20.row_n):
+        h = lfom_20.row_b * (i + 1)
+        expected = lfom_20.q_submerged(i, n) + n[i] * flow_per_orifice
+        actual = lfom_20.rating_curve(h_max=h, num_points=2).q[-1]
+        assert actual.to(u.L / u.s).magnitude == pytest.approx(
+            expected.to(u.L / u.s).magnitude, rel=1e-4
+        )
+
+
+def test_level_to_flow():
+    curve = lfom_60.rating_curve()
+    flow = lfom_60.level_to_flow(curve.h)
+    np.testing.assert_allclose(flow.magnitude, curve.q.magnitude, rtol=1e-12)
+    heights = np.linspace(-5, 25, 10001) * u.cm
+    flow = lfom_60.level_to_flow(heights)
+    assert flow.units == u.L / u.s
+    assert np.all(flow[heights < 0].magnitude == 0)
+    assert np.all(np.isnan(flow[heights > lfom_60.hl].magnitude))
+    inside = (heights >= 0) & (heights <= lfom_60.hl)
+    assert np.all(np.diff(flow[inside].magnitude) >= 0)
+    assert lfom_60.level_to_flow(lfom_60.hl).to(u.L / u.s).magnitude == (
+        pytest.approx(60, rel=0.02)
+    )
@@ -0,0 +1,44 @@
+from aguaclara.design.lfom import LFOM
+from aguaclara.design.lfom_search import best_layouts, search_layouts
+from aguaclara.core.units import u
+import numpy as np
+import pytest
+
+
+@pytest.mark.parametrize("q", [20, 60])
+def test_search_includes_design(q):
+    lfom = LFOM(q=q * u.L / u.s)
+    layouts = search_layouts(lfom)
+    design = layouts[
+        (layouts["row_n"] == lfom.row_n)
+        & np.isclose(layouts["orifice_d"], lfom.orifice_d.to(u.inch).magnitude)
+        & (layouts["pipe_nd"] == lfom.pipe_nd.to(u.inch).magnitude)
+    ]
+    assert len(design) == 1
+    design = design.iloc[0]
+    assert design["orifice_n_per_row"] == lfom.orifice_n_per_row.tolist()
+    assert design["orifice_n_max_per_row"] == lfom.orifice_n_max_per_row
+    error = lfom.error_per_row[1:]
+    assert design["error_mean"] == pytest.approx(np.mean(error), rel=1e-4)
+    assert design["error_max_abs"] == pytest.approx(np.max(np.abs(error)), rel=1e-4)
+
+
+def test_search_ranking():
+    layouts = search_layouts(LFOM(q=40 * u.L / u.s), pipe_nd_n=2)
+    assert np.all(np.diff(layouts["error_max_abs"]) >= 0)
+    assert set(layouts["row_n"]) <= set(range(4, 11))
+    assert layouts.groupby(["row_n", "orifice_d"]).size().max() == 2
+    assert layouts.attrs["units"]["orifice_d"] == "inch"
+
+
+def test_best_layouts():
+    flows = [20, 60, 100] * u.L / u.s
+    serial = best_layouts(flows, workers=1, hl=25 * u.cm)
+    parallel = best_layouts(flows, workers=2, chunksize=1, hl=25 * u.cm)
+    assert serial.equals(parallel)
+    np.testing.assert_allclose(serial["q"], [20, 60, 100])
+    best = search_layouts(LFOM(q=60 * u.L / u.s, hl=25 * u.cm)).iloc[0]
+    assert serial.iloc[1]["error_max_abs"] == best["error_max_abs"]
+    assert serial.attrs["units"]["q"] == "liter / second"
+    with pytest.raises(ValueError):
+        best_layouts(flows, workers=0)
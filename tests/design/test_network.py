@@ -0,0 +1,99 @@
+from aguaclara.design.network import PipeNetwork
+from aguaclara.design.pipeline import Pipe, Elbow
+from aguaclara.core.units import unit_registry as u
+import numpy as np
+import pytest
+
+
+def parallel_network(demand):
+    network = PipeNetwork()
+    network.add_node("tank", head=2 * u.m)
+    network.add_node("outlet", demand=demand)
+    pipelines = [
+        Pipe(size=4 * u.inch, l=50 * u.m),
+        Pipe(size=2 * u.inch, l=20 * u.m, next=Elbow(size=2 * u.inch)),
+    ]
+    for pipeline in pipelines:
+        network.add_link("tank", "outlet", pipeline)
+    return network, pipelines
+
+
+def test_parallel_pipelines():
+    network, pipelines = parallel_network(10 * u.L / u.s)
+    solution = network.solve()
+    assert solution.flow.units == u.L / u.s
+    assert solution.flow.sum().magnitude == pytest.approx(10)
+    headloss = 2 * u.m - solution.head[1]
+    for flow, pipeline in zip(solution.flow, pipelines):
+        assert flow.magnitude == pytest.approx(
+            pipeline.flow_pipeline(headloss).magnitude
+        )
+    np.testing.assert_allclose(
+        solution.headloss.to(u.m).magnitude, headloss.magnitude
+    )
+
+
+def test_reservoirs():
+    # Flow runs from the higher tank to the lower one, against the direction
+    # of the link.
+    network = PipeNetwork()
+    network.add_node("low", head=1 * u.m)
+    network.add_node("high", head=1.5 * u.m)
+    pipeline = Pipe(size=3 * u.inch, l=30 * u.m)
+    network.add_link("low", "high", pipeline)
+    solution = network.solve()
+    assert solution.flow[0].magnitude == pytest.approx(
+        -pipeline.flow_pipeline(50 * u.cm).magnitude
+    )
+
+
+def test_looped_grid():
+    n = 30
+    network = PipeNetwork()
+    network.add_node("tank", head=10 * u.m)
+    for i in range(n):
+        for j in range(n):
+            network.add_node((i, j), demand=0.01 * u.L / u.s)
+    network.add_link("tank", (0, 0), Pipe(size=8 * u.inch, l=10 * u.m))
+    pipe = Pipe(size=2 * u.inch, l=10 * u.m)
+    for i in range(n):
+        for j in range(n):
+            if i + 1 < n:
+                network.add_link((i, j), (i + 1, j), pipe)
+            if j + 1 < n:
+                network.add_link((i, j), (i, j + 1), pipe)
+    solution = network.solve()
+    assert solution.flow.shape == (1 + 2 * n * (n - 1),)
+    assert solution.flow[0].magnitude == pytest.approx(9)
+    # By symmetry, the first two pipes of the grid share the flow equally.
+    assert solution.flow[1].magnitude == pytest.approx(4.495)
+    assert solution.flow[2].magnitude == pytest.approx(4.495)
+    assert solution.head[-1] < solution.head[1] < solution.head[0]
+
+
+def test_errors():
+    network = PipeNetwork()
+    network.add_node("a", demand=1 * u.L / u.s)
+    network.add_node("b")
+    with pytest.raises(ValueError):
+        network.solve()
+    with pytest.raises(ValueError):
+        network.add_node("a")
+    with pytest.raises(ValueError):
+        network.add_link("a", "c", Pipe())
+    with pytest.raises(ValueError):
+        network.add_link("a", "a", Pipe())
+    with pytest.raises(TypeError):
+        network.add_link("a", "b", 1 * u.m)
+    network.add_link("a", "b", Pipe())
+    with pytest.raises(ValueError):
+        network.solve()
+    network.add_node("tank", head=1 * u.m)
+    network.add_node("c")
+    network.add_link("tank", "c", Pipe())
+    with pytest.raises(ValueError):
+        network.solve()
+    network.add_link("c", "a", Pipe())
+    network.add_link("c", "b", Pipe())
+    with pytest.raises(ValueError):
+        network.solve(maxiter=0)
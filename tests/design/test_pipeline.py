@@ -1,5 +1,6 @@
 from aguaclara.design.pipeline import *
 from aguaclara.core.units import unit_registry as u
+import numpy as np
 import pytest
 
 pipe_20 = Pipe(q=20.0 * u.L / u.s, size=6 * u.inch)
@@ -49,8 +50,8 @@ pipeline_fp = Pipe(
         (tee_60.headloss, 65.91845052663014 * u.cm),
         (pipeline_20.headloss, 1.0678779116069842 * u.cm),
         (pipeline_60.headloss, 9.078557133328923 * u.cm),
-        (pipeline_fp.flow_pipeline(20 * u.cm), 22.162471566281223 * u.L / u.s),
-        (pipeline_fp.flow_pipeline(40 * u.cm), 31.45057786475188 * u.L / u.s),
+        (pipeline_fp.flow_pipeline(20 * u.cm), 22.16299037047374 * u.L / u.s),
+        (pipeline_fp.flow_pipeline(40 * u.cm), 31.452643969644143 * u.L / u.s),
     ],
 )
 def test_pipeline(actual, expected):
@@ -59,3 +60,105 @@ def test_pipeline(actual, expected):
         assert actual.magnitude == pytest.approx(expected.magnitude)
     else:
         assert actual == pytest.approx(expected)
+
+
+pipeline_compiled = Pipe(
+    q=20.0 * u.L / u.s,
+    size=6 * u.inch,
+    next=Elbow(
+        size=6 * u.inch,
+        next=Pipe(
+            size=6 * u.inch,
+            l=4 * u.m,
+            next=Tee(size=6 * u.inch, left_type="stopper", right_type="run"),
+        ),
+    ),
+)
+
+
+def test_compile():
+    compiled = pipeline_compiled.compile()
+    assert compiled.kinds == ["Pipe", "Elbow", "Pipe", "Tee"]
+    assert len(compiled) == 4
+    assert compiled.l[1] == 0 and compiled.k_minor[0] == 0
+    assert compiled.headloss().units == u.cm
+
+
+@pytest.mark.parametrize("q", [0.01, 2.0, 20.0, 60.0])
+def test_compiled_headloss(q):
+    pipeline_compiled.q = q * u.L / u.s
+    pipeline_compiled._set_next_components_q()
+    compiled = pipeline_compiled.compile()
+    expected = pipeline_compiled.headloss_pipeline
+    assert compiled.headloss().magnitude == pytest.approx(expected.magnitude)
+
+    # Every flow rate of an array matches the scalar evaluation.
+    flows = np.array([q, 2 * q]) * u.L / u.s
+    segments = compiled.headloss_segments(flows)
+    assert segments.shape == (2, 4)
+    component = pipeline_compiled
+    for i in range(4):
+        assert segments[0, i].magnitude == pytest.approx(component.headloss.magnitude)
+        component = component.next
+    assert compiled.headloss(flows)[1].magnitude == pytest.approx(
+        segments[1].sum().magnitude
+    )
+
+
+def test_long_pipeline():
+    # Deeper than Python's default recursion limit of 1000 frames.
+    pipeline = None
+    for _ in range(600):
+        pipeline = Pipe(size=6 * u.inch, next=Elbow(size=6 * u.inch, next=pipeline))
+    pipeline.q = 5 * u.L / u.s
+    pipeline._set_next_components_q()
+    assert len(str(pipeline).splitlines()) == 1200
+    assert pipeline.headloss_pipeline.magnitude == pytest.approx(
+        pipeline.compile().headloss().magnitude
+    )
+
+
+def test_traversal_order_cache():
+    last = Pipe(size=6 * u.inch)
+    pipeline = Pipe(
+        size=6 * u.inch, next=Elbow(size=6 * u.inch, next=Pipe(size=6 * u.inch))
+    )
+    assert len(pipeline._components()) == 3
+    assert pipeline._components() is pipeline._components()
+
+    # Reconnecting any component invalidates the cached order.
+    pipeline.next.next.next = Tee(size=6 * u.inch, left=last)
+    assert len(pipeline._components()) == 5
+    assert pipeline._components()[-1] is last
+
+
+def test_flow_pipeline():
+    q = pipeline_compiled.q
+    targets = np.array([0, 1e-4, 0.05, 20, 40, 500]) * u.cm
+    flows = pipeline_compiled.flow_pipeline(targets)
+    assert flows.units == u.L / u.s
+    assert flows.shape == (6,)
+    assert flows[0].magnitude == 0
+    compiled = pipeline_compiled.compile()
+    assert compiled.headloss(flows[1:]).magnitude == pytest.approx(
+        targets[1:].magnitude, rel=1e-9
+    )
+    assert flows[3].magnitude == pytest.approx(
+        pipeline_compiled.flow_pipeline(20 * u.cm).magnitude
+    )
+    # The flow rates of the pipeline are left unchanged.
+    assert pipeline_compiled.q is q
+    assert pipeline_compiled.next.q == q
+
+    with pytest.raises(ValueError):
+        compiled.flow(-1 * u.cm)
+    with pytest.raises(ValueError):
+        compiled.flow(10 * u.cm, maxiter=0)
+
+
+def test_flow_rating_curve():
+    # Head losses spanning laminar and turbulent flow, including the jump in
+    # the friction factor, give monotonically increasing flow rates.
+    targets = np.logspace(-6, 1, 2000) * u.m
+    flows = pipeline_compiled.compile().flow(targets)
+    assert np.all(np.diff(flows.magnitude) >= -1e-12)
@@ -0,0 +1,84 @@
+import aguaclara
+from aguaclara.design.profiler import profile
+from aguaclara.design.floc import Flocculator
+from aguaclara.core.units import u
+import aguaclara.core.physchem as pc
+import pytest
+import threading
+import types
+
+
+def test_call_tree():
+    with aguaclara.profile() as p:
+        floc = Flocculator()
+        floc.chan_w
+    stats = p.stats
+    # Cached properties are only evaluated once.
+    assert stats["Flocculator.chan_w"].calls == 1
+    assert stats["physchem.viscosity_kinematic_water"].calls >= 1
+    assert all(s.self_time <= s.time + 1e-9 for s in stats.values())
+    assert p.max_depth >= 2
+    assert p.root.time >= sum(node.time for node in p.root.children.values())
+
+    paths = {path for path, _ in p.root.walk()}
+    assert any(
+        path[-2:] == ("Flocculator.vel_grad_avg", "physchem.viscosity_kinematic_water")
+        for path in paths
+    )
+    for line in p.folded().splitlines():
+        stack, microseconds = line.rsplit(" ", 1)
+        assert tuple(stack.split(";")) in paths
+        assert int(microseconds) > 0
+
+
+def test_report():
+    with profile() as p:
+        Flocculator(q=40 * u.L / u.s)
+    lines = p.report(sort="calls", n=3).splitlines()
+    assert lines[0].startswith("Total time")
+    assert len(lines) == 6
+    calls = [int(line.split()[0]) for line in lines[3:]]
+    assert calls == sorted(calls, reverse=True)
+    with pytest.raises(ValueError):
+        p.report(sort="name")
+
+
+def test_recursion():
+    def factorial(n):
+        return 1 if n <= 1 else n * module.factorial(n - 1)
+
+    module = types.ModuleType("tests.fake")
+    module.factorial = factorial
+    factorial.__module__ = module.__name__
+    with profile(modules=[module]) as p:
+        assert module.factorial(4) == 24
+    assert p.stats["fake.factorial"] == (
+        4,
+        p.root.children["fake.factorial"].time,
+        pytest.approx(p.root.children["fake.factorial"].time),
+        4,
+    )
+    assert module.factorial is factorial
+
+
+def test_restores_functions():
+    original = pc.viscosity_kinematic_water
+    with pytest.raises(ZeroDivisionError):
+        with profile() as p:
+            pc.viscosity_kinematic_water(20 * u.degC)
+            1 / 0
+    assert pc.viscosity_kinematic_water is original
+    assert p.stats["physchem.viscosity_kinematic_water"].calls == 1
+
+    with profile():
+        with pytest.raises(RuntimeError):
+            with profile():
+                pass
+
+
+def test_other_threads():
+    with profile() as p:
+        thread = threading.Thread(target=lambda: Flocculator().chan_w)
+        thread.start()
+        thread.join()
+    assert p.stats == {}
@@ -17,3 +17,8 @@ sed_60 = Sedimentor(q=60.0 * u.L / u.s)
 )
 def test_sed(actual, expected):
     assert actual == expected
+
+
+def test_sed_convergence():
+    assert sed_20.sed_convergence.converged
+    assert "sed_convergence" not in sed_20.to_dict()["inputs"]
@@ -1,4 +1,6 @@
+from aguaclara.design.profiler import profile
 from aguaclara.design.sed_tank import SedimentationTank
+from aguaclara.core import manifold
 from aguaclara.core.units import u
 
 import pytest
@@ -45,6 +47,10 @@ sed_tank_60 = SedimentationTank(q=60.0 * u.L / u.s)
         (sed_tank_60.outlet_man_orifice_q, 0.11205446937244101 * u.L / u.s),
         (sed_tank_20.outlet_man_orifice_spacing, 0.1048062404520667 * u.m),
         (sed_tank_60.outlet_man_orifice_spacing, 0.1048062404520667 * u.m),
+        (sed_tank_20.inlet_man_q_ratio, 0.870991575 * u.dimensionless),
+        (sed_tank_20.outlet_man_q_ratio, 0.929604646 * u.dimensionless),
+        (sed_tank_20.inlet_man_port_q.sum(), 6.18744 * u.L / u.s),
+        (sed_tank_20.outlet_man_port_q.sum(), 6.18744 * u.L / u.s),
     ],
 )
 def test_sed_tank(actual, expected):
@@ -53,3 +59,10 @@ def test_sed_tank(actual, expected):
         assert actual.magnitude == pytest.approx(expected.magnitude)
     else:
         assert actual == pytest.approx(expected)
+
+
+def test_manifold_solved_once():
+    with profile(modules=[manifold]) as p:
+        SedimentationTank(q=20.0 * u.L / u.s).to_dict()
+    # One solve for the inlet manifold and one for the outlet manifold
+    assert p.stats["manifold.flow_distribution"].calls == 2
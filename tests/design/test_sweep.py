@@ -0,0 +1,68 @@
+from aguaclara.design.sweep import decode, encode, sweep
+from aguaclara.design.floc import Flocculator
+from aguaclara.core.units import u
+import numpy as np
+import pandas as pd
+import pytest
+
+grid = {"q": [20, 40, 60] * u.L / u.s, "hl": [40, 50] * u.cm}
+outputs = ["chan_w", "chan_n", "baffle_s", "drain_pipe.size"]
+
+
+def test_sweep_matches_designs():
+    table = sweep(Flocculator, grid, outputs, workers=1)
+    assert len(table) == 6
+    assert list(table.columns) == ["q", "hl", *outputs, "error"]
+    assert table["error"].isna().all()
+    assert table.attrs["units"]["baffle_s"] == "centimeter"
+    assert table.attrs["units"]["drain_pipe.size"] == "inch"
+    assert "chan_n" not in table.attrs["units"]
+    for row in table.itertuples():
+        floc = Flocculator(q=row.q * u.L / u.s, hl=row.hl * u.cm)
+        assert row.chan_w == floc.chan_w.to(u.cm).magnitude
+        assert row.baffle_s == pytest.approx(floc.baffle_s.to(u.cm).magnitude)
+
+
+def test_parallel_sweep():
+    serial = sweep(Flocculator, grid, outputs, workers=1)
+    parallel = sweep(Flocculator, grid, outputs, workers=2, chunksize=2)
+    assert serial.drop(columns="error").equals(parallel.drop(columns="error"))
+
+
+def test_point_list_and_units():
+    table = sweep(
+        Flocculator,
+        [{"q": 20 * u.L / u.s}, {"q": 0.06 * u.m**3 / u.s, "chan_n_parity": "any"}],
+        ["vol"],
+        workers=1,
+    )
+    np.testing.assert_allclose(table["q"], [20, 60])
+    assert table.attrs["units"]["q"] == "liter / second"
+    assert table["chan_n_parity"][1] == "any"
+
+
+def test_failures():
+    # The second point is colder than absolute zero.
+    table = sweep(
+        Flocculator,
+        [
+            {"q": 20 * u.L / u.s},
+            {"q": 20 * u.L / u.s, "temp": -300 * u.degC},
+        ],
+        ["chan_w"],
+        workers=1,
+    )
+    assert pd.isna(table["error"][0])
+    assert table["error"][1].startswith("ValueError")
+    assert table["chan_w"][0] == 34
+    assert np.isnan(table["chan_w"][1])
+
+    with pytest.raises(ValueError):
+        sweep(Flocculator, grid, outputs, workers=0)
+
+
+def test_encode():
+    encoded = encode(20 * u.L / u.s)
+    assert not isinstance(encoded, u.Quantity)
+    assert decode(encoded) == 20 * u.L / u.s
+    assert encode("even") == decode("even") == "even"
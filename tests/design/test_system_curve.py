@@ -0,0 +1,79 @@
+from aguaclara.design.system_curve import SystemCurve
+from aguaclara.design.pipeline import Pipe, Elbow, Tee
+from aguaclara.core.units import unit_registry as u
+import aguaclara.core.physchem as pc
+import numpy as np
+import pytest
+
+pipeline = Pipe(
+    size=6 * u.inch,
+    next=Elbow(
+        size=6 * u.inch,
+        next=Pipe(size=6 * u.inch, l=4 * u.m, next=Tee(size=6 * u.inch)),
+    ),
+)
+curve = SystemCurve.from_pipeline(pipeline, 60 * u.L / u.s)
+
+
+def test_pipeline_curve():
+    assert curve.flow(20 * u.cm).magnitude == pytest.approx(
+        pipeline.flow_pipeline(20 * u.cm).magnitude, rel=1e-4
+    )
+    flows = np.linspace(1, 60, 200) * u.L / u.s
+    expected = pipeline.compile().headloss(flows)
+    assert curve.headloss(flows).units == u.cm
+    np.testing.assert_allclose(
+        curve.headloss(flows).magnitude, expected.magnitude, rtol=2e-4
+    )
+    np.testing.assert_allclose(
+        curve.flow(expected).magnitude, flows.magnitude, rtol=2e-4
+    )
+    assert curve.flow_range[1].magnitude == pytest.approx(60)
+    assert curve.headloss_range[0].magnitude == 0
+
+
+def test_function_curve():
+    known = dict(
+        Diam=10 * u.cm,
+        Length=100 * u.m,
+        Nu=1e-6 * u.m**2 / u.s,
+        Roughness=0.1 * u.mm,
+        KMinor=2,
+    )
+    function_curve = SystemCurve.from_function(
+        pc.headloss_pipe, 30 * u.L / u.s, flow_min=5 * u.L / u.s, **known
+    )
+    flow = function_curve.flow(1 * u.m)
+    assert pc.headloss_pipe(flow, **known).to(u.m).magnitude == pytest.approx(
+        1, rel=1e-4
+    )
+
+
+def test_refinement():
+    # A tighter tolerance takes more samples, up to max_points.
+    assert len(curve) > 17
+    coarse = SystemCurve.from_pipeline(pipeline, 60 * u.L / u.s, rtol=1e-2)
+    assert len(coarse) < len(curve)
+    capped = SystemCurve.from_pipeline(pipeline, 60 * u.L / u.s, max_points=30)
+    assert len(capped) == 30
+
+
+def test_save_load(tmp_path):
+    path = str(tmp_path / "curve.json")
+    curve.save(path)
+    loaded = SystemCurve.load(path)
+    heads = [1, 10, 50] * u.cm
+    np.testing.assert_array_equal(
+        loaded.flow(heads).magnitude, curve.flow(heads).magnitude
+    )
+
+
+def test_errors():
+    with pytest.raises(ValueError):
+        curve.flow(1 * u.km)
+    with pytest.raises(ValueError):
+        curve.headloss([10, 100] * u.L / u.s)
+    with pytest.raises(ValueError):
+        SystemCurve([1, 2, 2] * u.L / u.s, [1, 2, 3] * u.cm)
+    with pytest.raises(ValueError):
+        SystemCurve.from_pipeline(pipeline, 0 * u.L / u.s)